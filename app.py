@@ -1,33 +1,61 @@
 import asyncio
+import contextlib
+import csv
+import io
+import json
 import logging
 import os
 import threading
 import time
-from copy import deepcopy
 
 import schedule
 import traceback
-from collections import defaultdict, deque
+from collections import defaultdict
 
+from itsdangerous import BadSignature
+from psycopg.errors import UndefinedTable
 from psycopg.rows import dict_row
 # psycopg3 async usage
 from psycopg_pool import AsyncConnectionPool
-from quart import Quart, render_template, jsonify, request
+from quart import Quart, render_template, jsonify, request, Response
 
 from com.gwngames.client.general.GeneralDetailOverview import GeneralDetailOverview
-from com.gwngames.client.general.GeneralTableCache import get_query_builder, get_row_methods
+from com.gwngames.client.general.GeneralTableCache import get_query_builder, get_row_methods, store_query_builder, \
+    configure_table_cache, table_cache_stats, page_cache_stats, get_cached_page, store_pages, reserve_pages, \
+    release_pages, get_cached_count, store_count, get_facets, get_cached_facets, store_facets
 from com.gwngames.client.general.GeneralTableOverview import GeneralTableOverview
+from com.gwngames.client.general.TableSpec import register_table, build_table, load_table_spec
 from com.gwngames.config.Context import Context
+from com.gwngames.config.SigningKey import signing_key
 from com.gwngames.server.entity.base.Author import Author
+from com.gwngames.server.entity.base.AuthorReachSketch import AuthorReachSketch
 from com.gwngames.server.entity.variant.scholar.GoogleScholarAuthor import GoogleScholarAuthor
 from com.gwngames.server.entity.variant.scholar.GoogleScholarPublication import GoogleScholarPublication
+from com.gwngames.server.graph.GraphAssembler import build_adjacency, classify_edges, prune_links, build_edge_object, \
+    finalize_graph
+from com.gwngames.server.graph.GraphCache import GraphCache, LINKS_REGION, NEIGHBORS_REGION, PAIRS_REGION, \
+    LAYOUTS_REGION, CLUSTERS_REGION
+from com.gwngames.server.graph.GraphClustering import build_clustered_payload, build_clusters
+from com.gwngames.server.graph.GraphEncoder import build_graph_payload, COLUMNAR_FORMAT
+from com.gwngames.server.graph.GraphExecutor import GraphExecutor, GraphExecutorBusy, GraphJobTimeout
+from com.gwngames.server.graph.GraphFilters import GraphFilters
+from com.gwngames.server.graph.GraphLayout import compute_layout
+from com.gwngames.server.graph.GraphSpec import sign_graph_spec, load_graph_spec
+from com.gwngames.server.graph.ReachSketch import merge, estimate
+from com.gwngames.server.graph.PathFinder import find_shortest_paths
+from com.gwngames.server.query.AuthorDetailUpdater import drain_author_detail_queue
+from com.gwngames.server.query.CentralityUpdater import ensure_centrality_table, update_author_centrality
 from com.gwngames.server.query.ColumnUpdater import update_authors_column
+from com.gwngames.server.query.ReachSketchUpdater import update_reach_sketches
+from com.gwngames.server.query.SuggestUpdater import update_suggest_indexes
 from com.gwngames.server.query.OrderFunctions import handle_order_by
 from com.gwngames.server.query.QueryBuilder import QueryBuilder
 from com.gwngames.server.query.queries.AuthorQuery import AuthorQuery
 from com.gwngames.server.query.queries.ConferenceQuery import ConferenceQuery
 from com.gwngames.server.query.queries.JournalQuery import JournalQuery
 from com.gwngames.server.query.queries.PublicationQuery import PublicationQuery
+from com.gwngames.server.search.SuggestIndex import SuggestIndex, KINDS as SUGGEST_KINDS, AUTHORS_KIND, \
+    CONFERENCES_KIND, JOURNALS_KIND, INTERESTS_KIND
 from com.gwngames.utils.JsonReader import JsonReader
 
 
@@ -57,15 +85,36 @@ app = Quart(__name__)
 app.logger.setLevel(logging.DEBUG)
 
 pool: AsyncConnectionPool
+graph_executor: GraphExecutor = GraphExecutor()
+graph_cache: GraphCache = GraphCache()
+suggest_index: SuggestIndex = SuggestIndex()
+background_tasks = set()
+export_slots: asyncio.Semaphore
 
 # --------------- REGION STARTUP --------------------
 
+def run_in_background(loop, coro):
+    """
+    Start a job on the server loop without waiting for it, keeping a reference until it is done.
+    """
+    task = loop.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
 @app.before_serving
 async def setup_pool():
     """
     Initialize the async connection pool before the first request.
     """
-    global pool
+    global pool, export_slots
+    # Table and graph tokens signed with the public placeholder key could be forged by anyone
+    try:
+        signing_key()
+    except RuntimeError as e:
+        logger.error(f"Refusing to start: {e}")
+        raise
+
     try:
         config: JsonReader = ctx.get_config()
 
@@ -91,8 +140,57 @@ async def setup_pool():
         ctx.set_pool(pool)
         logger.info("Async connection pool created successfully.")
 
+        graph_executor.start(
+            max_workers=config.get_value("graph_executor_workers"),
+            max_queue=config.get_value("graph_executor_queue_size"),
+            timeout=config.get_value("graph_job_timeout")
+        )
+        graph_cache.configure(
+            maxsize=config.get_value("graph_cache_size"),
+            ttl=config.get_value("graph_cache_ttl"),
+            network_maxsize=config.get_value("graph_network_cache_size")
+        )
+        export_slots = asyncio.Semaphore(int(config.get_value("max_concurrent_exports")))
+        configure_table_cache(
+            max_bytes=config.get_value("table_cache_max_bytes"),
+            ttl=config.get_value("table_cache_ttl"),
+            page_max_bytes=config.get_value("table_page_cache_max_bytes"),
+            page_ttl=config.get_value("table_page_cache_ttl")
+        )
+
         schedule.every(10).minutes.do(update_authors_column, pool)
 
+        # The scheduler runs in its own thread, the centrality job runs on the server loop
+        loop = asyncio.get_running_loop()
+        # The overview, graph and suggest queries join author_centrality, it exists before serving.
+        # Scores are computed once at startup, serving does not wait for it
+        await ensure_centrality_table(pool)
+        run_in_background(loop, update_author_centrality(pool))
+        schedule.every(int(config.get_value("centrality_update_hours"))).hours.do(
+            lambda: asyncio.run_coroutine_threadsafe(update_author_centrality(pool), loop)
+        )
+
+        # Until the first sketches are built, networks are generated without the reach policy
+        run_in_background(loop, update_reach_sketches(pool, int(config.get_value("max_generative_depth"))))
+        schedule.every(int(config.get_value("reach_sketch_update_hours"))).hours.do(
+            lambda: asyncio.run_coroutine_threadsafe(
+                update_reach_sketches(pool, int(config.get_value("max_generative_depth"))), loop
+            )
+        )
+
+        # Documents of the authors changed since the last drain, queued by triggers
+        schedule.every(int(config.get_value("author_detail_drain_minutes"))).minutes.do(
+            lambda: asyncio.run_coroutine_threadsafe(
+                drain_author_detail_queue(pool, int(config.get_value("author_detail_batch_size"))), loop
+            )
+        )
+
+        # Suggestions are empty until the first build is done, serving does not wait for it
+        run_in_background(loop, update_suggest_indexes(pool))
+        schedule.every(int(config.get_value("suggest_update_hours"))).hours.do(
+            lambda: asyncio.run_coroutine_threadsafe(update_suggest_indexes(pool), loop)
+        )
+
         print("Starting the query scheduler...")
 
         def run_schedule():
@@ -111,6 +209,7 @@ async def close_pool():
     """
     Close the async connection pool after the server stops.
     """
+    graph_executor.shutdown()
     try:
         if pool:
             await pool.close()
@@ -158,90 +257,56 @@ async def about():
     )
 
 
+async def render_table_page(view_name: str):
+    """
+    Build the table of a view from the request arguments and render it in the page template.
+    """
+    table_component = await build_table(view_name, request.args.to_dict())
+    return await render_template(
+        "template.html",
+        content=await table_component.render(),
+        popup=await render_template("popup.html")
+    )
+
+
 @app.get('/publications')
 async def publications():
+    return await render_table_page("publications")
+
+
+@register_table("publications")
+async def publications_table(args) -> GeneralTableOverview:
     """
-    Example: This route continues to rely on the same logic,
-    but internally you must ensure your QueryBuilder calls use async psycopg,
-    not synchronous SQLAlchemy.
+    Publications table, optionally restricted to the publications of some authors, conferences or journals.
     """
     journal = None
     conference = None
-    author = request.args.get('Author ID', None)
+    author = args.get('Author ID', None)
     if author is None:
-        author = request.args.get('value', None)
+        author = args.get('value', None)
     if author is None:
-        journal = request.args.get("Journal ID", None)
+        journal = args.get("Journal ID", None)
     if author is None and journal is None:
-        conference = request.args.get("Conf ID", None)
+        conference = args.get("Conf ID", None)
 
     query_builder: QueryBuilder = PublicationQuery.build_overview_publication_query(ctx.get_pool())
     table_component = GeneralTableOverview(query_builder, "Publications Overview", limit=ctx.get_config().get_value("max_overview_rows"), enable_checkboxes=True)
 
     if author is not None:
-        author_values = ','.join([val.strip() for val in author.split(',') if val.strip()])
-        author_values = await (QueryBuilder(ctx.get_pool(), Author.__tablename__, "a")
-                               .and_condition("", f"a.id IN ({author_values})", custom=True)
-                               .select("a.name").execute())
-
-        # Build conditions for each author value.
-        # Each condition is a tuple of (parameter, operator, value, custom),
-        conditions = []
-        for val in author_values:
-            like_val = f"%{val['name']}%"
-            conditions.append(
-                ("p.authors", "ILIKE", like_val, False)
-            )
-
-        # Add them as a nested condition in the HAVING clause:
-        # AND( param LIKE %val1% OR param LIKE %val2% OR ...)
-        query_builder.add_nested_conditions(
-            conditions=conditions,
-            operator_between_conditions="OR",
-            condition_type="AND",
-            is_having=True
-        )
+        author_ids = [int(val.strip()) for val in author.split(',') if val.strip().isdigit()]
+        PublicationQuery.add_author_condition(query_builder, author_ids)
 
         query_builder.offset(0).limit(ctx.get_config().get_value("max_overview_rows"))
 
     if conference is not None:
-        conference = ','.join([val.strip() for val in conference.split(',') if val.strip()])
-        pubs_ids = await ConferenceQuery.build_publications_from_conferences_query(pool, conference).execute()
-        conditions = []
-        if len(pubs_ids) == 0:
-            conditions.append(("p.ID", "=", "0", False))
-        for val in pubs_ids:
-            conditions.append(
-                ("p.ID", "=", val['id'], False)
-            )
-
-        query_builder.add_nested_conditions(
-            conditions=conditions,
-            operator_between_conditions="OR",
-            condition_type="AND",
-            is_having=True
-        )
+        conference_ids = [int(val.strip()) for val in conference.split(',') if val.strip().isdigit()]
+        PublicationQuery.add_venue_condition(query_builder, "p.conference_id", conference_ids)
 
         query_builder.offset(0).limit(ctx.get_config().get_value("max_overview_rows"))
 
     if journal is not None:
-        journal = ','.join([val.strip() for val in journal.split(',') if val.strip()])
-        pubs_ids = await JournalQuery.build_publications_from_journals_query(pool, journal).execute()
-
-        conditions = []
-        if len(pubs_ids) == 0:
-            conditions.append(("p.id", "=", "0", False))
-        for val in pubs_ids:
-            conditions.append(
-                ("p.ID", "=", val['id'], False)
-            )
-
-        query_builder.add_nested_conditions(
-            conditions=conditions,
-            operator_between_conditions="OR",
-            condition_type="AND",
-            is_having=True
-        )
+        journal_ids = [int(val.strip()) for val in journal.split(',') if val.strip().isdigit()]
+        PublicationQuery.add_venue_condition(query_builder, "p.journal_id", journal_ids)
 
         query_builder.offset(0).limit(ctx.get_config().get_value("max_overview_rows"))
 
@@ -263,19 +328,20 @@ async def publications():
         "string",
         "Author (AND)",
         is_aggregated=False,
-        or_split=False
+        or_split=False,
+        suggest=AUTHORS_KIND,
+        condition=PublicationQuery.add_author_filter
     )
+    table_component.add_facet("Conference Rank", "c.rank")
+    table_component.add_facet("Journal Rank", "j.q_rank")
+    table_component.add_facet("Year", "p.publication_year")
 
     table_component.add_row_method("View Publication Details", "publication_details")
     table_component.add_row_method("View Authors", "researchers")
 
     table_component.add_page_method("View Combined Authors", "researchers")
 
-    return await render_template(
-        "template.html",
-        content=await table_component.render(),
-        popup=await render_template("popup.html")
-    )
+    return table_component
 
 
 @app.get('/publication_details')
@@ -304,109 +370,64 @@ async def publication_details():
 
 @app.get('/researchers')
 async def researchers():
+    return await render_table_page("researchers")
+
+
+@register_table("researchers")
+async def researchers_table(args) -> GeneralTableOverview:
     journal = None
     conference = None
     pubs = None
-    author_id = request.args.get('Author ID')
+    author_id = args.get('Author ID')
     if author_id is None:
-        pubs = request.args.get('ID', None)
+        pubs = args.get('ID', None)
     if pubs is None:
-        pubs = request.args.get('value', None)
+        pubs = args.get('value', None)
     if pubs is None:
-        journal = request.args.get('Journal ID', None)
-
-    conference = request.args.get('Conf ID', None)
-
+        journal = args.get('Journal ID', None)
 
-    query_builder: QueryBuilder = AuthorQuery.build_author_overview_query(ctx.get_pool())
-
-    table_component = GeneralTableOverview(query_builder, "Researchers Overview",
-                                           limit=ctx.get_config().get_value("max_overview_rows"),
-                                           image_field="Image url",
-                                           enable_checkboxes=True
-                                           )
+    conference = args.get('Conf ID', None)
 
+    # Drill-downs restrict the authors by id inside the author_base CTE
+    author_conditions = []
     if pubs is not None:
-        pub_ids = ','.join([val.strip() for val in pubs.split(',') if val.strip()])
-
-        author_names = await AuthorQuery.build_authors_from_pub_query(pool, pub_ids).execute()
-        conditions = []
-        if len(author_names) == 0:
-            conditions.append(("ab.Name", "=", "0", False))
-        for val in author_names:
-            conditions.append(
-                ("ab.Name", "=", val['name'], False)
-            )
-
-        query_builder.add_nested_conditions(
-            conditions=conditions,
-            operator_between_conditions="OR",
-            condition_type="AND",
-            is_having=False
-        )
-
-        query_builder.offset(0).limit(ctx.get_config().get_value("max_overview_rows"))
+        pub_ids = [int(val.strip()) for val in pubs.split(',') if val.strip().isdigit()]
+        author_conditions.append(AuthorQuery.authors_of_publications_condition(pub_ids))
 
     if conference is not None:
-        conference = ','.join([val.strip() for val in conference.split(',') if val.strip()])
-        author_names = await ConferenceQuery.build_authors_from_conferences_query(pool, conference).execute()
-        conditions = []
-        if len(author_names) == 0:
-            conditions.append(("ab.Name", "=", "0", False))
-        for val in author_names:
-            conditions.append(
-                ("ab.Name", "=", val['name'], False)
-            )
-
-        query_builder.add_nested_conditions(
-            conditions=conditions,
-            operator_between_conditions="OR",
-            condition_type="AND",
-            is_having=False
-        )
-
-        query_builder.offset(0).limit(ctx.get_config().get_value("max_overview_rows"))
+        conference_ids = [int(val.strip()) for val in conference.split(',') if val.strip().isdigit()]
+        author_conditions.append(AuthorQuery.authors_of_venues_condition("conference_id", conference_ids))
 
     if journal is not None:
-        journal = ','.join([val.strip() for val in journal.split(',') if val.strip()])
-        author_names = await JournalQuery.build_authors_from_journals_query(pool, journal).execute()
-
-        conditions = []
-        if len(author_names) == 0:
-            conditions.append(("ab.Name", "=", "0", False))
-        for val in author_names:
-            conditions.append(
-                ("ab.Name", "=", val['name'], False)
-            )
+        journal_ids = [int(val.strip()) for val in journal.split(',') if val.strip().isdigit()]
+        author_conditions.append(AuthorQuery.authors_of_venues_condition("journal_id", journal_ids))
 
-        query_builder.add_nested_conditions(
-            conditions=conditions,
-            operator_between_conditions="OR",
-            condition_type="AND",
-            is_having=False
-        )
+    query_builder: QueryBuilder = AuthorQuery.build_author_overview_query(ctx.get_pool(), author_conditions)
 
-        query_builder.offset(0).limit(ctx.get_config().get_value("max_overview_rows"))
+    table_component = GeneralTableOverview(query_builder, "Researchers Overview",
+                                           limit=ctx.get_config().get_value("max_overview_rows"),
+                                           image_field="Image url",
+                                           enable_checkboxes=True
+                                           )
 
     if author_id is not None:
-        author_id = request.args.get('Author ID')
+        author_id = args.get('Author ID')
         coauthors = await AuthorQuery.build_co_authors_query(ctx.get_pool(), author_id).execute()
-        coauthor_ids = []
-        for val in coauthors:
-            coauthor_ids.append(str(val['id']))
-        coauthor_ids = ','.join(coauthor_ids)
-        numbers = coauthor_ids.split(',')
-        coauthor_ids = ','.join(f"({num})" for num in numbers)
-        query_builder.join("INNER", f"(VALUES {coauthor_ids})", "co(id)", on_condition="co.id = ab.id")
+        coauthor_ids = ','.join(f"({int(val['id'])})" for val in coauthors)
+        # A condition on ab only, evaluated inside author_base; casts would clash with the :name parameters
+        query_builder.and_condition(
+            "", f"ab.id IN (VALUES {coauthor_ids})" if coauthor_ids else "FALSE", custom=True
+        )
 
     table_component.query_builder = query_builder
     table_component.alias = query_builder.alias
     table_component.entity_class = query_builder.table_name
-    table_component.add_filter("ab.id", filter_type="string", label="Author ID (OR)", or_split=True, equal=True, int_like=True)
-    table_component.add_filter("ab.Name", filter_type="string", label="Name (OR)", or_split=True)
+    table_component.add_filter("ab.id", filter_type="string", label="Author ID (OR)", or_split=True, equal=True, int_like=True,
+                               suggest=AUTHORS_KIND)
+    table_component.add_filter("ab.Name", filter_type="string", label="Name (OR)", or_split=True, suggest=AUTHORS_KIND)
     table_component.add_filter(
         "i.interests",
-        filter_type="string", label="Interest (AND)", is_aggregated=False, or_split=False
+        filter_type="string", label="Interest (AND)", is_aggregated=False, or_split=False, suggest=INTERESTS_KIND
     )
     table_component.add_filter(
         "fc.freq_conf_rank",
@@ -416,17 +437,15 @@ async def researchers():
         "fj.freq_journal_rank",
         filter_type="string", label="Frequent Journ. Rank (OR)", is_aggregated=False, or_split=True
     )
+    table_component.add_facet("Frequent Conf. Rank", "fc.freq_conf_rank")
+    table_component.add_facet("Frequent Journal Rank", "fj.freq_journal_rank")
     table_component.add_row_method("View Author Details", "researcher_detail")
     table_component.add_row_method("View Publications", "publications")
     table_component.add_row_method("View Co-Authors", "researchers")
     table_component.add_page_method("View Combined Network", "author_network")
     table_component.add_page_method("View Combined Publications", "publications")
 
-    return await render_template(
-        "template.html",
-        content=await table_component.render(),
-        popup=await render_template("popup.html")
-    )
+    return table_component
 
 
 @app.get('/researcher_detail')
@@ -434,14 +453,18 @@ async def researcher_detail():
     row_name = request.args.get('Author ID')
     if row_name is None:
         row_name = request.args.get('value')
-    query_builder = AuthorQuery.build_author_query_with_filter(ctx.get_pool(), author_id=int(row_name))
+    author_id = int(row_name)
 
+    # One primary key lookup, the full aggregation only runs for an author whose document is not built yet
     data_viewer = GeneralDetailOverview(
-        query_builder,
+        AuthorQuery.build_author_document_query(ctx.get_pool(), [author_id]),
         title_field="Name",
         description_field="Homepage",
         image_field="Image url",
-        url_fields=["Scholar Profile", "Homepage"]
+        url_fields=["Scholar Profile", "Homepage"],
+        document_field="document",
+        field_order=AuthorQuery.DETAIL_FIELDS,
+        fallback_query_builder=AuthorQuery.build_author_query_with_filter(ctx.get_pool(), author_id=author_id)
     )
 
     data_viewer.add_row_method("View Publications", "publications", "Author ID")
@@ -455,7 +478,12 @@ async def researcher_detail():
 
 @app.get('/conferences')
 async def conferences():
-    acronym = request.args.get('value', None)
+    return await render_table_page("conferences")
+
+
+@register_table("conferences")
+async def conferences_table(args) -> GeneralTableOverview:
+    acronym = args.get('value', None)
 
     query_builder: QueryBuilder = ConferenceQuery.get_conferences(ctx.get_pool())
     table_component = GeneralTableOverview(query_builder, "Conferences Overview", limit=ctx.get_config().get_value("max_overview_rows"),
@@ -469,45 +497,47 @@ async def conferences():
 
     table_component.entity_class = query_builder.table_name
     table_component.alias = query_builder.alias
-    table_component.add_filter("c.id", filter_type="string", label="ID (OR)", or_split=True, equal=True, int_like=True)
+    table_component.add_filter("c.id", filter_type="string", label="ID (OR)", or_split=True, equal=True, int_like=True,
+                               suggest=CONFERENCES_KIND)
     table_component.add_filter("c.title", "string", "Title (OR)", or_split=True)
-    table_component.add_filter("c.acronym", "string", "Acronym (OR)", or_split=True)
+    table_component.add_filter("c.acronym", "string", "Acronym (OR)", or_split=True, suggest=CONFERENCES_KIND)
     table_component.add_filter("c.rank", "string", "Rank (OR)", or_split=True, equal=True)
     table_component.add_filter("c.publisher", "string", "Publisher")
+    table_component.add_facet("Conference Rank", "c.rank")
 
     table_component.add_row_method("View Publications", "publications")
     table_component.add_row_method("View Authors", "researchers")
     table_component.add_page_method("View Conferences Network", "conference_network")
 
-    return await render_template(
-        "template.html",
-        content=await table_component.render(),
-        popup=await render_template("popup.html")
-    )
+    return table_component
 
 
 @app.get('/journals')
 async def journals():
+    return await render_table_page("journals")
+
+
+@register_table("journals")
+async def journals_table(args) -> GeneralTableOverview:
     query_builder: QueryBuilder = JournalQuery.get_journals(ctx.get_pool())
 
     table_component = GeneralTableOverview(query_builder, "Journals Overview", limit=ctx.get_config().get_value("max_overview_rows"),
                                            enable_checkboxes=True, url_fields=["Journal Page"])
     table_component.entity_class = query_builder.table_name
     table_component.alias = query_builder.alias
-    table_component.add_filter("j.id", filter_type="string", label="ID (OR)", or_split=True, equal=True, int_like=True)
-    table_component.add_filter("j.title", "string", "Title (OR)", or_split=True)
+    table_component.add_filter("j.id", filter_type="string", label="ID (OR)", or_split=True, equal=True, int_like=True,
+                               suggest=JOURNALS_KIND)
+    table_component.add_filter("j.title", "string", "Title (OR)", or_split=True, suggest=JOURNALS_KIND)
     table_component.add_filter("j.q_rank", "string", "Rank (OR)", or_split=True, equal=True)
     table_component.add_filter("j.year", "integer", "Year")
+    table_component.add_facet("Journal Rank", "j.q_rank")
+    table_component.add_facet("Year", "j.year")
 
     table_component.add_row_method("View Publications", "publications")
     table_component.add_row_method("View Authors", "researchers")
     table_component.add_page_method("View Journals Network", "journal_network")
 
-    return await render_template(
-        "template.html",
-        content=await table_component.render(),
-        popup=await render_template("popup.html")
-    )
+    return table_component
 
 
 @app.get('/author_network')
@@ -549,7 +579,7 @@ async def journal_network():
     if not start_author_ids:
         return "No authors found for the selected journal(s)", 200
 
-    return await render_network(start_author_ids)
+    return await render_network(start_author_ids, cluster=True)
 
 
 @app.get('/conference_network')
@@ -572,9 +602,12 @@ async def conference_network():
 
     start_author_ids = ','.join(f"({num})" for num in numbers)
 
-    return await render_network(start_author_ids)
+    return await render_network(start_author_ids, cluster=True)
 
-async def render_network(start_author_ids):
+async def render_network(start_author_ids, cluster: bool = False):
+    """
+    :param cluster: Ask for networks collapsed into communities, for pages seeded by many roots.
+    """
     try:
         author_data: QueryBuilder = QueryBuilder(ctx.get_pool(), Author.__tablename__, 'a')
         author_data.select("a.name")
@@ -595,7 +628,8 @@ async def render_network(start_author_ids):
                 "graph_component.html",
                 start_id=start_author_ids,
                 start_label=start_author_labels,
-                max_depth=max_depth
+                max_depth=max_depth,
+                cluster_network=cluster
             ),
             popup=await render_template("popup.html")
         )
@@ -609,6 +643,40 @@ async def render_network(start_author_ids):
 
 # --------------- REGION API CALLS --------------------
 
+def author_popup_data(author):
+    """
+    Graph popup fields of the details of an author, see load_author_details.
+    """
+    return {
+        "Organization": f"{author['Organization']}",
+        "hIndex": author["H Index"],
+        "i10Index": author["I10 Index"],
+        "citesTotal": author["Total Cites"],
+        "pubTotal": author["Publications Found"],
+        "avg_conference_rank": author["Frequent Conf. Rank"],
+        "avg_journal_rank": author["Frequent Journal Rank"]
+    }
+
+
+async def load_author_details(author_ids):
+    """
+    Details of some authors by id: their precomputed documents,
+    computed with AuthorQuery.build_author_details_query_batch for the ones not built yet.
+    Everything is computed while author_detail_document.sql is not applied.
+    """
+    try:
+        documents = await AuthorQuery.build_author_document_query(pool, author_ids).execute()
+    except UndefinedTable as e:
+        app.logger.warning(f"Author detail documents unavailable, computing the details: {e}")
+        documents = []
+    authors = {row["author_id"]: row["document"] for row in documents}
+    missing = [author_id for author_id in author_ids if author_id not in authors]
+    if missing:
+        for author in await AuthorQuery.build_author_details_query_batch(pool, missing).execute():
+            authors[author["Author ID"]] = author
+    return authors
+
+
 @app.post("/fetch-author-detail")
 async def fetch_author_detail():
     data = await request.get_json()
@@ -616,76 +684,83 @@ async def fetch_author_detail():
     if not author_id:
         return jsonify({"error": "Error: Author ID is required"})
 
-    qb = AuthorQuery.build_author_query_with_filter(pool, int(author_id))
-    author = await qb.execute()
-    author = author[0] if author else None
+    author = (await load_author_details([int(author_id)])).get(int(author_id))
     if not author:
         return jsonify({"error": "Error: Author ID is not found"})
 
     app.logger.info("Fetched author detail: %s", author)
+    return jsonify({"author_data": author_popup_data(author)})
 
-    org = author["Organization"]
-    return jsonify( {"author_data":
-        {
-            "Organization": f"{org}",
-            "hIndex": author["H Index"],
-            "i10Index": author["I10 Index"],
-            "citesTotal": author["Total Cites"],
-            "pubTotal": author["Publications Found"],
-            "avg_conference_rank": author["Frequent Conf. Rank"],
-            "avg_journal_rank": author["Frequent Journal Rank"]
-        }}
-    )
+
+@app.post("/fetch-author-details")
+async def fetch_author_details():
+    """
+    Popup details of many authors, keyed by author id, see load_author_details. Unknown ids are left out.
+    """
+    data = await request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Error: The body must be a JSON object"}), 400
+    try:
+        author_ids = sorted({int(author_id) for author_id in data.get("author_ids", [])})
+    except (TypeError, ValueError):
+        return jsonify({"error": "Error: Author IDs must be integers"}), 400
+    if not author_ids:
+        return jsonify({"error": "Error: Author IDs are required"}), 400
+
+    max_batch = ctx.get_config().get_value("max_author_details_batch")
+    if len(author_ids) > max_batch:
+        return jsonify({"error": f"Error: At most {max_batch} authors per request"}), 400
+
+    authors = await load_author_details(author_ids)
+    return jsonify({"authors": {str(author_id): author_popup_data(author) for author_id, author in authors.items()}})
 
 @app.post("/fetch_data")
 async def fetch_data():
     """
-    We retrieve the same QueryBuilder from the table_id cookie,
-    reapply offset, limit, filters, then return rows in JSON.
+    The table_id is a signed table spec: the QueryBuilder is taken from this worker cache,
+    or rebuilt from the spec when another worker rendered the table.
+    The cached builder is cloned, then offset, limit and order are applied and rows returned in JSON.
     """
     table_id = request.args.get("table_id")
     if not table_id:
         return jsonify({"error": "No table_id found"}), 400
 
-    qb = get_query_builder(table_id)
-    if not qb:
-        return jsonify({"error": "Invalid or expired table_id"}), 404
+    try:
+        qb, row_methods, _ = await resolve_table(table_id)
+    except BadSignature:
+        return jsonify({"error": "Invalid table_id"}), 400
 
-    row_methods = get_row_methods(table_id)
-    if not row_methods:
-        return jsonify({"error": "Invalid or expired table_id"}), 404
-
-    order_type = request.args.get("order_type")
-    order_column = request.args.get("order_column")
-
-    if order_column != "" and order_type != "":
-        qb.offset_value = None
-        qb.limit_value = None
-        params = qb.parameters
-        qb = QueryBuilder(ctx.get_pool(), f"({qb.build_query_string()})", "ordered")
-        qb.select("*")
-        qb.parameters = params
-        qb.and_condition("", f"\"{order_column}\" IS NOT NULL", custom=True)
-        qb.and_condition("", f"\"{order_column}\" != ''", custom=True)
-        handle_order_by(qb, order_column, order_type)
+    order_column = request.args.get("order_column") or ""
+    order_type = request.args.get("order_type") or ""
+    try:
+        qb = await order_table_query(qb, order_column, order_type)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     form = await request.form
     offset = int(form.get("offset", 0))
     limit = int(form.get("limit", 100))
 
-    qb.offset(offset).limit(limit)
-
-    rows = await qb.execute()
+    rows = get_cached_page((table_id, order_column, order_type, offset, limit))
+    if rows is None:
+        rows = await qb.clone().offset(offset).limit(limit).execute()
+        store_pages({(table_id, order_column, order_type, offset, limit): rows})
 
     # Count total rows
-    count_query = qb.clone(no_limit=True, no_offset=True)
-    count_query = QueryBuilder(count_query.pool, f"({count_query.build_query_string()})", "count")
-    count_query.select(f"COUNT(*) AS count")
-    count_query.parameters = qb.parameters
-    count_query.order_by_fields = []
-    app.logger.info("params: " + str(count_query.parameters))
-    count_data = await count_query.execute()
-    total_count = sum(row["count"] for row in count_data)
+    total_count = get_cached_count((table_id, order_column, order_type))
+    if total_count is None:
+        count_data = await qb.build_count_query().execute()
+        total_count = sum(row["count"] for row in count_data)
+        store_count((table_id, order_column, order_type), total_count)
+
+    # Sequential browsing: warm the next pages while the user reads this one
+    next_offsets = [offset + limit * step for step in range(1, ctx.get_config().get_value("table_prefetch_pages") + 1)]
+    next_offsets = [next_offset for next_offset in next_offsets if next_offset < total_count]
+    if next_offsets:
+        task = asyncio.create_task(prefetch_pages(qb, table_id, order_column, order_type, next_offsets, limit))
+        # The loop only keeps weak references to tasks
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
 
     return jsonify({
         "rows": rows,
@@ -696,93 +771,247 @@ async def fetch_data():
     })
 
 
-@app.post("/generate-graph")
-async def generate_graph():
+@app.get("/facets")
+async def table_facets():
+    """
+    Row counts per value of every facet of a table, with its current filters, computed in one GROUPING SETS query.
+    """
+    table_id = request.args.get("table_id")
+    if not table_id:
+        return jsonify({"error": "No table_id found"}), 400
+
+    facet_counts = get_cached_facets(table_id)
+    if facet_counts is None:
+        try:
+            qb, _, facets = await resolve_table(table_id)
+        except BadSignature:
+            return jsonify({"error": "Invalid table_id"}), 400
+
+        facet_counts = {facet["column"]: [] for facet in facets}
+        if facets:
+            for row in await build_facet_query(qb, facets).execute():
+                # GROUPING() is 0 for the column the row is grouped by
+                index = next(idx for idx in range(len(facets)) if row[f"g{idx}"] == 0)
+                column = facets[index]["column"]
+                facet_counts[column].append({"value": row[column], "count": row["count"]})
+        store_facets(table_id, facet_counts)
+
+    return jsonify({"facets": facet_counts})
+
+
+def build_facet_query(qb: QueryBuilder, facets) -> QueryBuilder:
+    """
+    Count the rows of a table query per value of each facet column, one grouping set per facet.
+    """
+    base = qb.clone(no_offset=True, no_limit=True)
+    facet_query = QueryBuilder(ctx.get_pool(), f"({base.build_query_string()})", "f", cache_results=False)
+    facet_query.parameters = base.parameters
+    columns = [f'f."{facet["column"]}"' for facet in facets]
+    facet_query.select(", ".join(
+        [f'{column} AS "{facet["column"]}"' for column, facet in zip(columns, facets)]
+        + [f"GROUPING({column}) AS g{idx}" for idx, column in enumerate(columns)]
+        + ["COUNT(*) AS count"]
+    ))
+    facet_query.group_by(f"GROUPING SETS ({', '.join(f'({column})' for column in columns)})")
+    return facet_query
+
+
+@app.get("/export")
+async def export_table():
+    """
+    Stream every row of a table, with its filters and order, as CSV or JSON lines.
+    Rows come from a server-side cursor and are written as they arrive, nothing is buffered.
+    """
+    table_id = request.args.get("table_id")
+    export_format = request.args.get("format", "csv")
+    if not table_id:
+        return jsonify({"error": "No table_id found"}), 400
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unknown export format: {export_format}"}), 400
+
     try:
-        data = await request.get_json()
-        start_author_id = str(data["start_author_id"])
-        max_depth = int(data["depth"])
-        max_tuple_per_query = int(conf_reader.get_value("max_tuple_per_query"))
+        view_name, _ = load_table_spec(table_id)
+        qb, _, _ = await resolve_table(table_id)
+    except BadSignature:
+        return jsonify({"error": "Invalid table_id"}), 400
 
-        # BFS variables
-        start_depth = 0
-        authors_seen = set()
-        authors_to_query = start_author_id.split(',')
-        edges = []
+    try:
+        qb = await order_table_query(qb, request.args.get("order_column"), request.args.get("order_type"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    qb.limit(ctx.get_config().get_value("max_export_rows"))
+
+    # Each export holds a pool connection until its last row, their number is bounded.
+    # The slot is taken here, acquire does not suspend while one is free, and released by the stream
+    if export_slots.locked():
+        return jsonify({"error": "Too many exports running, please retry shortly"}), 503
+    await export_slots.acquire()
+    deadline = asyncio.get_running_loop().time() + ctx.get_config().get_value("export_timeout")
+
+    extension, mimetype, encode_rows = EXPORT_FORMATS[export_format]
+    response = Response(bounded_export(qb, view_name, encode_rows, deadline), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{view_name}.{extension}"'
+    # Large exports outlive the default response timeout, export_timeout bounds them instead
+    response.timeout = None
+    return response
+
+
+async def bounded_export(qb: QueryBuilder, view_name: str, encode_rows, deadline: float):
+    """
+    Encoded rows of an export, releasing the export slot taken by the handler when the stream ends.
+    The stream stops at the deadline, so a slow query or client releases its connection.
+    """
+    try:
+        async for chunk in encode_rows(rows_until(qb.stream(), deadline)):
+            yield chunk
+    except TimeoutError:
+        app.logger.warning(f"Export of {view_name} stopped at its deadline, the file is truncated")
+    finally:
+        export_slots.release()
 
-        # 0 - Starting authors info (in case of no results)
 
-        numbers = start_author_id.split(',')
-        start_author_id = ','.join(f"({num})" for num in numbers)
-        sql_authors = await (QueryBuilder(ctx.get_pool(), Author.__tablename__, 'a').select('a.id, to_camel_case(a.name) as "name", a.image_url')
-                             #.and_condition("", f"a.id IN ({start_author_id})", custom=True)
-                            .join("INNER", f"(VALUES {start_author_id})", "id_author(id)", on_condition="a.id = id_author.id")
-                             .execute())
+async def rows_until(rows, deadline: float):
+    """
+    Rows of an async iterator until the loop time reaches the deadline.
+    The iterator is closed on exit, which returns the connection of a streamed query.
 
-        # ---------------------------
-        # 1) BFS expansion in N sub-batches
-        # ---------------------------
-        while start_depth < max_depth:
-            current_authors = list(set(authors_to_query) - authors_seen)
-            authors_to_query.clear()
-            if not current_authors:
-                break
-
-            authors_seen.update(current_authors)
-
-            # Divide authors into up to 8 chunks, fetch in parallel
-            results_this_depth = []
-            chunk_size = max_tuple_per_query
-            tasks = []
-            for i in range(0, len(current_authors), chunk_size):
-                chunk = current_authors[i : i + chunk_size]
-                tasks.append(asyncio.create_task(fetch_author_links_batch(chunk)))
-            sub_results_list = await asyncio.gather(*tasks)
-
-            # Combine sub-results
-            for sub_results in sub_results_list:
-                results_this_depth.extend(sub_results)
-
-            # Process BFS expansions
-            for row in results_this_depth:
-                s_id = row["start_author_id"]
-                e_id = row["end_author_id"]
-                edges.append(
-                    (
-                        s_id,
-                        row["start_author_label"],
-                        row["start_author_image_url"],
-                        e_id,
-                        row["end_author_label"],
-                        row["end_author_image_url"]
-                    )
-                )
-                if e_id not in authors_seen:
-                    authors_to_query.append(e_id)
+    :raises TimeoutError: If the deadline passes first.
+    """
+    async with contextlib.aclosing(rows):
+        while True:
+            # Only the fetch is timed, the deadline never fires while a chunk is being sent
+            async with asyncio.timeout_at(deadline):
+                try:
+                    row = await anext(rows)
+                except StopAsyncIteration:
+                    return
+            yield row
+
+
+async def encode_csv(rows, chunk_size: int = 65536):
+    buffer = io.StringIO()
+    writer = None
+    async for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_ndjson(rows, chunk_size: int = 65536):
+    lines = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(row, default=str) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+# Export format -> (file extension, mimetype, row encoder)
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv", encode_csv),
+    "ndjson": ("ndjson", "application/x-ndjson", encode_ndjson),
+}
+
+
+class NetworkRejected(Exception):
+    """
+    The reach policy refused a network request, reach holds the estimate.
+    """
+
+    def __init__(self, message, reach):
+        super().__init__(message)
+        self.reach = reach
 
-            start_depth += 1
 
-        # Additional step - Find connections for authors at final depth, but keep edges only for seen nodes
-        # ---------------------
-        weak_edges = []
+async def compute_network(data):
+    """
+    Expand, prune and classify the network of a graph request, everything but its serialization.
+    The result only depends on the request and the database, so any worker can compute it again.
+
+    :raises NetworkRejected: If the reach policy refuses the request.
+    """
+    start_author_id = str(data["start_author_id"])
+    max_depth = int(data["depth"])
+    max_tuple_per_query = int(conf_reader.get_value("max_tuple_per_query"))
+    node_budget, edge_budget, top_k = read_graph_budget(data)
+    filters = GraphFilters.from_request(data)
+
+    # BFS variables
+    start_depth = 0
+    authors_seen = set()
+    authors_to_query = [int(num) for num in start_author_id.split(',') if num.strip()]
+    graph_nodes = set(authors_to_query)
+    edges = []
+    truncation = {"top_k": top_k, "node_budget": node_budget, "edge_budget": edge_budget,
+                  "neighbors_pruned": 0, "nodes_dropped": 0, "edges_dropped": 0}
+
+    # Pre-flight: estimate the network size from the reach sketches before any expansion
+    cluster_requested = bool(data.get("cluster"))
+    reach_limit = int(conf_reader.get_value("graph_reach_limit"))
+    estimates = await estimate_reach(authors_to_query, max_depth)
+    reach = {"estimate": estimates.get(max_depth), "limit": reach_limit, "depth": max_depth, "action": None}
+    if reach["estimate"] is not None and reach["estimate"] > reach_limit:
+        policy = conf_reader.get_value("graph_reach_policy")
+        app.logger.info(f"Network estimated at {reach['estimate']} authors, applying policy '{policy}'")
+        if policy == "reject":
+            raise NetworkRejected(
+                f"The network would reach about {reach['estimate']} authors, "
+                f"please select fewer authors or a lower depth", reach
+            )
+        if policy == "reduce":
+            max_depth = max((hop for hop, size in estimates.items() if size <= reach_limit), default=1)
+            reach["depth"] = max_depth
+        else:
+            cluster_requested = True
+        reach["action"] = policy
+
+    # Pair statistics are fetched per depth, so the frontier can be pruned by weight
+    pair_to_ranks_freq = {}
+    pair_to_years_freq = {}
+
+    # 0 - Starting authors info (in case of no results)
+
+    start_author_id = ','.join(f"({num})" for num in authors_to_query)
+    sql_authors = await (QueryBuilder(ctx.get_pool(), Author.__tablename__, 'a').select('a.id, to_camel_case(a.name) as "name", a.image_url')
+                         #.and_condition("", f"a.id IN ({start_author_id})", custom=True)
+                        .join("INNER", f"(VALUES {start_author_id})", "id_author(id)", on_condition="a.id = id_author.id")
+                         .execute())
+
+    # ---------------------------
+    # 1) BFS expansion in N sub-batches, keeping only the strongest links within budget
+    # ---------------------------
+    while start_depth < max_depth:
         current_authors = list(set(authors_to_query) - authors_seen)
-        results_this_depth = []
-        chunk_size = max_tuple_per_query
-        tasks = []
-        for i in range(0, len(current_authors), chunk_size):
-            chunk = current_authors[i: i + chunk_size]
-            tasks.append(asyncio.create_task(fetch_author_links_batch(chunk)))
-        sub_results_list = await asyncio.gather(*tasks)
-
-        # Combine sub-results
-        for sub_results in sub_results_list:
-            results_this_depth.extend(sub_results)
+        authors_to_query.clear()
+        if not current_authors:
+            break
+
+        authors_seen.update(current_authors)
+
+        results_this_depth = await fetch_author_links(current_authors, max_tuple_per_query, filters)
+        results_this_depth = await prune_author_links(
+            results_this_depth, graph_nodes, pair_to_ranks_freq, pair_to_years_freq, top_k,
+            node_budget - len(graph_nodes), edge_budget - len(edges), truncation, max_tuple_per_query, filters
+        )
 
         # Process BFS expansions
         for row in results_this_depth:
             s_id = row["start_author_id"]
             e_id = row["end_author_id"]
-            weak_edges.append(
+            edges.append(
                 (
                     s_id,
                     row["start_author_label"],
@@ -792,274 +1021,592 @@ async def generate_graph():
                     row["end_author_image_url"]
                 )
             )
+            graph_nodes.add(e_id)
+            if e_id not in authors_seen:
+                authors_to_query.append(e_id)
+
+        start_depth += 1
+
+    # Additional step - Find connections for authors at final depth, but keep edges only for seen nodes
+    # ---------------------
+    weak_edges = []
+    current_authors = list(set(authors_to_query) - authors_seen)
+    results_this_depth = [
+        row for row in await fetch_author_links(current_authors, max_tuple_per_query, filters)
+        if row["end_author_id"] in graph_nodes
+    ]
+    results_this_depth = await prune_author_links(
+        results_this_depth, graph_nodes, pair_to_ranks_freq, pair_to_years_freq, top_k,
+        0, edge_budget - len(edges), truncation, max_tuple_per_query, filters
+    )
 
-        # ---------------------------------------------------
-        # 2) Minimal node info + adjacency + edge data maps
-        # ---------------------------------------------------
-        nodes = {}
-        for author in sql_authors:
-            if author["id"] not in nodes:
-                nodes[author["id"]] = {
-                    "id": author["id"],
-                    "label": author["name"],
-                    "image": author["image_url"],
-                    "is_root": True
-                }
-
-        # adjacency list
-        adj_list = defaultdict(list)
-
-        # We'll store all edge data in a dictionary keyed by a sorted tuple
-        # For instance pair_key = (min_id, max_id)
-        edge_data_map = {}
-
-        # Ingest strong edges
-        for (s_id, s_label, s_img, e_id, e_label, e_img) in edges:
-            adj_list[s_id].append(e_id)
-            adj_list[e_id].append(s_id)
-
-            # If a node is missing, add minimal info
-            if s_id not in nodes:
-                nodes[s_id] = {"id": s_id, "label": s_label, "image": s_img or ""}
-            if e_id not in nodes:
-                nodes[e_id] = {"id": e_id, "label": e_label, "image": e_img or ""}
-
-            pair_key = tuple(sorted((s_id, e_id)))
-            edge_data_map[pair_key] = (s_id, s_label, s_img, e_id, e_label, e_img)
-
-        # Ingest weak edges
-        for (s_id, s_label, s_img, e_id, e_label, e_img) in weak_edges:
-            if s_id in nodes and e_id in nodes:
-                adj_list[s_id].append(e_id)
-                adj_list[e_id].append(s_id)
-
-                pair_key = tuple(sorted((s_id, e_id)))
-                edge_data_map[pair_key] = (s_id, s_label, s_img, e_id, e_label, e_img)
-
-        # ------------------------------------------
-        # 3) Fetch publication info (ranks, years)
-        # ------------------------------------------
-        all_edges = deepcopy(edges)
-        all_edges.extend(weak_edges)
-        unique_pairs = set(
-            tuple(sorted((s_id, e_id))) for (s_id, _, _, e_id, _, _) in all_edges
+    # Process BFS expansions
+    for row in results_this_depth:
+        s_id = row["start_author_id"]
+        e_id = row["end_author_id"]
+        weak_edges.append(
+            (
+                s_id,
+                row["start_author_label"],
+                row["start_author_image_url"],
+                e_id,
+                row["end_author_label"],
+                row["end_author_image_url"]
+            )
         )
 
-        pair_to_ranks_freq = {}
-        pair_to_years_freq = {}
+    # From here on, CPU-heavy steps run in the graph executor and only DB I/O stays on the loop
+    # ---------------------------------------------------
+    # 2) Minimal node info + adjacency + edge data maps
+    # ---------------------------------------------------
+    nodes, adj_list, edge_data_map = await graph_executor.run(
+        build_adjacency, sql_authors, edges, weak_edges
+    )
 
-        pairs_list = list(unique_pairs)
-        if pairs_list:
-            chunk_size = max_tuple_per_query
-            tasks = []
-            for i in range(0, len(pairs_list), chunk_size):
-                sub_batch = pairs_list[i: i + chunk_size]
-                tasks.append(asyncio.create_task(fetch_pub_info_subbatch(sub_batch)))
-            results = await asyncio.gather(*tasks)
-
-            # Merge partial dictionaries
-            for (ranks_dict, years_dict) in results:
-                for p, freq_map in ranks_dict.items():
-                    pair_to_ranks_freq[p] = freq_map
-                for p, y_map in years_dict.items():
-                    pair_to_years_freq[p] = y_map
-
-        # --------------------------------------------------------
-        # 4) Build BFS trees separately for each root in sql_authors
-        # --------------------------------------------------------
-        root_ids = [a["id"] for a in sql_authors]
-
-        # This will store "tree edges" discovered by BFS from each root
-        # Key: root_id => set of discovered edges (as sorted tuple)
-        per_root_tree_edges = defaultdict(set)
-
-        # Track how many BFS runs discovered each node
-        node_discovery_count = defaultdict(int)
-        global_discovered = set()
-
-        # For BFS from each author:
-        for root_id in root_ids:
-            # BFS queue and discovered set
-            discovered = set()
-            queue = deque()
-
-            discovered.add(root_id)
-            global_discovered.add(root_id)
-            queue.append(root_id)
-            node_discovery_count[root_id] += 1  # discovered by BFS from root_id
-
-            while queue:
-                current_id = queue.popleft()
-
-                for neighbor_id in adj_list[current_id]:
-                    # Special rule: If neighbor is also a root author
-                    # do NOT build a BFS tree edge here => that link
-                    # should end up in weak_links only.
-                    if neighbor_id in root_ids and neighbor_id != current_id:
-                        continue
-
-                    if neighbor_id not in discovered:
-                        discovered.add(neighbor_id)
-                        global_discovered.add(neighbor_id)
-                        queue.append(neighbor_id)
-                        node_discovery_count[neighbor_id] += 1
-
-                        # We have discovered an edge from current_id => neighbor_id
-                        pair_key = tuple(sorted((current_id, neighbor_id)))
-                        per_root_tree_edges[root_id].add(pair_key)
-
-        # --------------------------------------------------------
-        # 5) Combine BFS-discovered edges and classify them
-        # --------------------------------------------------------
-        # All BFS edges across all roots
-        all_tree_edges = set()
-        for root_id, edge_set in per_root_tree_edges.items():
-            all_tree_edges.update(edge_set)
-
-        # We now want:
-        #   links, semi_weak_links, weak_links
-        links = []
-        semi_weak_links = []
-        weak_links = []
-
-        # --------------------------------------------------------
-        # 5a) Function to build the final edge object with pubs info
-        # --------------------------------------------------------
-        def build_edge_object(edge_pair_key):
-            (s_id_f, s_label_f, s_img_f, e_id_f, e_label_f, e_img_f) = edge_data_map[edge_pair_key]
-            rank_counts = pair_to_ranks_freq.get(edge_pair_key, {})
-            years_map = pair_to_years_freq.get(edge_pair_key, {})
-
-            conf_freq = {}
-            jour_freq = {}
-            unranked = 0
-            for rank_str, cnt in rank_counts.items():
-                if rank_str in ["A*", "A", "B", "C"]:
-                    conf_freq[rank_str] = conf_freq.get(rank_str, 0) + cnt
-                elif rank_str in ["Q1", "Q2", "Q3", "Q4"]:
-                    jour_freq[rank_str] = jour_freq.get(rank_str, 0) + cnt
-                else:
-                    unranked += cnt
-
-            best_conf = max(conf_freq, key=conf_freq.get) if conf_freq else "Unranked"
-            best_jour = max(jour_freq, key=jour_freq.get) if jour_freq else "Unranked"
-
-            link_obj = {
-                "source": s_id_f,
-                "target": e_id_f,
-                "avg_conf_rank": best_conf,
-                "avg_journal_rank": best_jour,
-                "Unranked": unranked,
-            }
-            # Add year counts, etc.
-            for yr, val in years_map.items():
-                link_obj[str(yr)] = val
-            for rank, val in conf_freq.items():
-                link_obj[str(rank)] = val
-            for rank, val in jour_freq.items():
-                link_obj[str(rank)] = val
-
-            return link_obj
-
-        # --------------------------------------------------------
-        # 5b) Classify edges
-        # --------------------------------------------------------
-        # 5b.1) Edges that are between two roots => always in weak_links
-        root_id_set = set(root_ids)
-
-        # Helper to check if an edge is between two root authors
-        def is_between_roots(between_pair_key):
-            s_id_b, e_id_b = between_pair_key
-            return (s_id_b in root_id_set) and (e_id_b in root_id_set)
-
-        # We'll go through *every* known edge pair_key in edge_data_map
-        # and decide where it belongs.
-        for pair_key in edge_data_map.keys():
-            # 5b.2) If it's between two sql_authors => weak_links
-            if is_between_roots(pair_key):
-                edge_obj = build_edge_object(pair_key)
-                weak_links.append(edge_obj)
-                continue
-
-            # 5b.3) If the pair_key was discovered in BFS => it's a tree edge
-            if pair_key in all_tree_edges:
-                # Check if it is "semi_weak" or normal "link"
-                s_id, e_id = pair_key
-                c1 = node_discovery_count[s_id]
-                c2 = node_discovery_count[e_id]
-
-                if c1 > 1 or c2 > 1:
-                    # => semi_weak
-                    edge_obj = build_edge_object(pair_key)
-                    # set root_counts = max( #roots that discovered s_id , #roots that discovered e_id )
-                    edge_obj["root_counts"] = max(c1, c2)
-                    semi_weak_links.append(edge_obj)
-                else:
-                    # => normal BFS link
-                    edge_obj = build_edge_object(pair_key)
-                    links.append(edge_obj)
-            else:
-                # 5b.4) Not discovered by BFS => belongs to weak_links
-                edge_obj = build_edge_object(pair_key)
-                weak_links.append(edge_obj)
+    # ------------------------------------------
+    # 3) Fetch publication info (ranks, years)
+    # ------------------------------------------
+    # Only pairs that end up in the edge data map are ever annotated, most were fetched while pruning
+    missing_pairs = [pair for pair in edge_data_map.keys() if pair not in pair_to_ranks_freq]
+    await fetch_pub_info(missing_pairs, max_tuple_per_query, pair_to_ranks_freq, pair_to_years_freq, filters)
+
+    # --------------------------------------------------------
+    # 4) Build BFS trees separately for each root in sql_authors
+    # 5) Combine BFS-discovered edges and classify them
+    # --------------------------------------------------------
+    root_ids = [a["id"] for a in sql_authors]
+    links, semi_weak_links, weak_links, global_discovered = await graph_executor.run(
+        classify_edges, adj_list, edge_data_map, root_ids,
+        {pair: pair_to_ranks_freq[pair] for pair in edge_data_map},
+        {pair: pair_to_years_freq[pair] for pair in edge_data_map}
+    )
+
+    # -------------------------------------------------------
+    # 6) Finalize node rankings only for discovered nodes
+    # -------------------------------------------------------
+    discovered_node_ids = list(global_discovered)  # we need them in a list for the query
+
+    nodes_full_data = await AuthorQuery.build_author_overview_query(
+        pool, [AuthorQuery.author_ids_condition(discovered_node_ids)]
+    ).execute()
+
+    return {
+        "nodes": nodes, "links": links, "semi_weak_links": semi_weak_links, "weak_links": weak_links,
+        "global_discovered": global_discovered, "nodes_full_data": nodes_full_data, "root_ids": root_ids,
+        "edge_data_map": edge_data_map, "max_depth": max_depth, "filters": filters, "node_budget": node_budget,
+        "edge_budget": edge_budget, "top_k": top_k, "truncation": truncation, "reach": reach,
+        "cluster_requested": cluster_requested
+    }
+
+
+@app.post("/generate-graph")
+async def generate_graph():
+    try:
+        data = await request.get_json()
+        try:
+            network = await compute_network(data)
+        except NetworkRejected as e:
+            return jsonify({"error": str(e), "reach": e.reach}), 413
+        nodes, links, semi_weak_links, weak_links = (
+            network["nodes"], network["links"], network["semi_weak_links"], network["weak_links"]
+        )
+        global_discovered, nodes_full_data = network["global_discovered"], network["nodes_full_data"]
+        root_ids, edge_data_map, max_depth = network["root_ids"], network["edge_data_map"], network["max_depth"]
+        filters, truncation, reach = network["filters"], network["truncation"], network["reach"]
+        node_budget, edge_budget, top_k = network["node_budget"], network["edge_budget"], network["top_k"]
+        cluster_requested = network["cluster_requested"]
+
+        columnar = data.get("format") == COLUMNAR_FORMAT
+        compress = "gzip" in request.headers.get("Accept-Encoding", "")
+        truncation["truncated"] = any(
+            truncation[key] > 0 for key in ("neighbors_pruned", "nodes_dropped", "edges_dropped")
+        )
 
         # -------------------------------------------------------
-        # 6) Finalize node rankings only for discovered nodes
+        # 7) Optional community view: a collapsed graph, clusters are expanded on demand
         # -------------------------------------------------------
-        # Filter down to discovered nodes only:
-        discovered_node_ids = list(global_discovered)  # we need them in a list for the query
-        total_nodes_ids_str = ','.join(f"({num})" for num in discovered_node_ids)
+        if cluster_requested and len(global_discovered) >= int(conf_reader.get_value("graph_cluster_min_nodes")):
+            # The token is the signed request, a worker that did not build the network can compute it again
+            cluster_token = sign_graph_spec(data)
+            body, counts, clusters = await graph_executor.run(
+                build_clustered_payload, nodes, links, semi_weak_links, weak_links, global_discovered,
+                nodes_full_data, columnar, compress,
+                {"truncation": truncation, "reach": reach, "cluster_token": cluster_token}
+            )
+            graph_cache.put_many(CLUSTERS_REGION, {cluster_token: clusters})
+
+            app.logger.info(f"Clustered graph generated: {counts}, {len(clusters)} clusters, {len(body)} bytes")
+            return graph_response(body, compress)
+
+        # -------------------------------------------------------
+        # 8) Optional precomputed layout, for networks too large to lay out in the browser
+        # -------------------------------------------------------
+        positions = None
+        if data.get("layout") and len(global_discovered) >= int(conf_reader.get_value("graph_layout_min_nodes")):
+            layout_key = (tuple(sorted(root_ids)), max_depth, filters.cache_key(), node_budget, edge_budget, top_k)
+            cached_layouts, _ = graph_cache.get_many(LAYOUTS_REGION, [layout_key])
+            positions = cached_layouts.get(layout_key)
+            if positions is None:
+                layout_edges = [pair for pair in edge_data_map if pair[0] in global_discovered and pair[1] in global_discovered]
+                positions = await graph_executor.run(
+                    compute_layout, sorted(global_discovered), layout_edges,
+                    int(conf_reader.get_value("graph_layout_iterations"))
+                )
+                graph_cache.put_many(LAYOUTS_REGION, {layout_key: positions})
+
+        body, counts = await graph_executor.run(
+            build_graph_payload, nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data,
+            columnar, compress, {"truncation": truncation, "reach": reach}, positions
+        )
 
-        nodes_full_data = await AuthorQuery.build_author_overview_query(pool).join(
-            "INNER", f"(VALUES {total_nodes_ids_str})", "totids(id)", on_condition="totids.id = ab.id"
+        app.logger.info(f"Graph generated: {counts}, {len(body)} bytes (columnar={columnar}, gzip={compress})")
+        return graph_response(body, compress)
+
+    except ValueError as e:
+        app.logger.warning(f"Invalid graph request: {e}")
+        return jsonify({"error": str(e)}), 400
+    except GraphExecutorBusy as e:
+        app.logger.warning(f"Graph generation refused: {e}")
+        return jsonify({"error": "Server is busy generating other networks, please retry shortly"}), 503
+    except GraphJobTimeout as e:
+        app.logger.error(f"Graph generation timed out: {e}")
+        return jsonify({"error": "Network generation took too long, consider a lower depth or fewer roots"}), 504
+    except Exception as e:
+        app.logger.error(f"Error: {e}")
+        app.logger.error(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
+
+
+@app.post("/author_path")
+async def author_path():
+    """
+    Shortest collaboration paths between two authors.
+    Only the path nodes and edges are annotated, in the same payload format as /generate-graph.
+    """
+    try:
+        data = await request.get_json()
+        source_id = int(data["source_author_id"])
+        target_id = int(data["target_author_id"])
+        config = ctx.get_config()
+        max_tuple_per_query = int(config.get_value("max_tuple_per_query"))
+        max_length = int(config.get_value("max_path_length"))
+        max_paths = int(config.get_value("max_paths"))
+        k = min(int(data.get("k") or max_paths), max_paths)
+
+        async def fetch_neighbors(author_ids):
+            return await fetch_author_neighbors(author_ids, max_tuple_per_query)
+
+        paths = await find_shortest_paths(source_id, target_id, fetch_neighbors, max_length, k)
+        if not paths:
+            return jsonify({"nodes": [], "links": [], "semi_weak_links": [], "weak_links": [],
+                            "paths": [], "max_path_length": max_length})
+
+        path_node_ids = {author_id for path in paths for author_id in path}
+        path_pairs = {tuple(sorted(pair)) for path in paths for pair in zip(path, path[1:])}
+
+        node_ids_str = ','.join(f"({num})" for num in path_node_ids)
+        sql_authors = await (QueryBuilder(ctx.get_pool(), Author.__tablename__, 'a').select('a.id, to_camel_case(a.name) as "name", a.image_url')
+                             .join("INNER", f"(VALUES {node_ids_str})", "id_author(id)", on_condition="a.id = id_author.id")
+                             .execute())
+        nodes = {
+            author["id"]: {
+                "id": author["id"],
+                "label": author["name"],
+                "image": author["image_url"] or "",
+                "is_root": author["id"] in (source_id, target_id)
+            }
+            for author in sql_authors
+        }
+
+        pair_to_ranks_freq = {}
+        pair_to_years_freq = {}
+        await fetch_pub_info(list(path_pairs), max_tuple_per_query, pair_to_ranks_freq, pair_to_years_freq)
+
+        links = []
+        for s_id, e_id in path_pairs:
+            s_node = nodes.get(s_id, {})
+            e_node = nodes.get(e_id, {})
+            edge_data = (s_id, s_node.get("label"), s_node.get("image"), e_id, e_node.get("label"), e_node.get("image"))
+            links.append(build_edge_object(edge_data, pair_to_ranks_freq[(s_id, e_id)], pair_to_years_freq[(s_id, e_id)]))
+
+        nodes_full_data = await AuthorQuery.build_author_overview_query(
+            pool, [AuthorQuery.author_ids_condition(list(nodes.keys()))]
         ).execute()
 
-        id_to_author_data = {x["Author ID"]: x for x in nodes_full_data}
+        graph = finalize_graph(nodes, links, [], [], set(nodes.keys()), nodes_full_data)
+        graph["paths"] = paths
+        graph["max_path_length"] = max_length
+        return jsonify(graph)
 
-        for node_id in global_discovered:
-            author_data = id_to_author_data.get(node_id)
-            if author_data:
-                freq_conf_rank = author_data["Frequent Conf. Rank"]
-                freq_jour_rank = author_data["Frequent Journal Rank"]
-                nodes[node_id]["freq_conf_rank"] = freq_conf_rank
-                nodes[node_id]["freq_journal_rank"] = freq_jour_rank
+    except Exception as e:
+        app.logger.error(f"Error: {e}")
+        app.logger.error(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
 
-        nodes = {nid: ndata for nid, ndata in nodes.items() if nid in global_discovered}
 
-        # Filter links so only edges where both endpoints are discovered
-        links = [
-            link for link in links
-            if link["source"] in global_discovered and link["target"] in global_discovered
-        ]
+@app.post("/estimate-graph")
+async def estimate_graph():
+    """
+    Estimated number of authors within each depth of a network, from the reach sketches.
+    """
+    try:
+        data = await request.get_json()
+        start = time.perf_counter()
+        root_ids = [int(num) for num in str(data["start_author_id"]).split(',') if num.strip()]
+        max_depth = min(int(data.get("depth") or conf_reader.get_value("max_generative_depth")),
+                        int(conf_reader.get_value("max_generative_depth")))
+
+        estimates = await estimate_reach(root_ids, max_depth)
+        return jsonify({
+            "estimates": estimates,
+            "limit": int(conf_reader.get_value("graph_reach_limit")),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error: {e}")
+        app.logger.error(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
 
-        app.logger.info(links)
-        app.logger.info(semi_weak_links)
-        app.logger.info(weak_links)
-        return jsonify({"nodes": list(nodes.values()), "links": links, "semi_weak_links": semi_weak_links, "weak_links": weak_links})
 
+@app.post("/expand-cluster")
+async def expand_cluster():
+    """
+    Authors and links of one cluster of a clustered network.
+    Links leaving the cluster join two authors and name the group of the outer one in other_cluster.
+    Clusters missing from this worker's cache are computed again from the signed cluster token.
+    """
+    try:
+        data = await request.get_json()
+        cluster_token = data.get("cluster_token")
+        if not cluster_token:
+            return jsonify({"error": "Missing cluster token"}), 400
+        cached, _ = graph_cache.get_many(CLUSTERS_REGION, [cluster_token])
+        clusters = cached.get(cluster_token)
+        if clusters is None:
+            try:
+                spec = load_graph_spec(cluster_token)
+                network = await compute_network(spec)
+            except (BadSignature, NetworkRejected) as e:
+                app.logger.warning(f"Cluster token not usable: {e}")
+                return jsonify({"error": "Network expired, please generate it again"}), 404
+            _, clusters = await graph_executor.run(
+                build_clusters, network["nodes"], network["links"], network["semi_weak_links"],
+                network["weak_links"], network["global_discovered"], network["nodes_full_data"]
+            )
+            graph_cache.put_many(CLUSTERS_REGION, {cluster_token: clusters})
+
+        cluster = clusters.get(data.get("cluster_id"))
+        if cluster is None:
+            return jsonify({"error": "Unknown cluster"}), 404
+        return jsonify(cluster)
+
+    except GraphExecutorBusy as e:
+        app.logger.warning(f"Cluster expansion refused: {e}")
+        return jsonify({"error": "Server is busy generating other networks, please retry shortly"}), 503
+    except GraphJobTimeout as e:
+        app.logger.error(f"Cluster expansion timed out: {e}")
+        return jsonify({"error": "Network generation took too long, please generate it again"}), 504
     except Exception as e:
         app.logger.error(f"Error: {e}")
         app.logger.error(traceback.format_exc())
         return jsonify({"error": str(e)}), 500
 
 
+@app.get("/suggest")
+async def suggest():
+    """
+    Top matches of a prefix among authors, conferences, journals or interests, from the in-memory indexes.
+    """
+    kind = request.args.get("kind", AUTHORS_KIND)
+    prefix = request.args.get("q", "")
+    if kind not in SUGGEST_KINDS:
+        return jsonify({"error": f"Unknown suggestion kind: {kind}"}), 400
+
+    max_suggestions = ctx.get_config().get_value("max_suggestions")
+    try:
+        k = min(int(request.args.get("k", max_suggestions)), max_suggestions)
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    if k < 1:
+        return jsonify({"error": "k must be positive"}), 400
+    return jsonify({
+        "suggestions": suggest_index.suggest(kind, prefix, k),
+        "ready": suggest_index.is_ready(kind),
+    })
+
+
+@app.get("/cache_stats")
+async def cache_stats():
+    return jsonify({"graph": graph_cache.stats(), "tables": table_cache_stats(), "pages": page_cache_stats()})
+
+
 # ---------------------------
 # ASYNC HELPER FUNCTIONS
 # ---------------------------
-async def fetch_author_links_batch(author_ids):
-    if not author_ids:
-        return []
+def graph_response(body: bytes, compressed: bool):
+    response = Response(body, status=200, content_type="application/json")
+    if compressed:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+async def prefetch_pages(qb: QueryBuilder, table_id: str, order_column: str, order_type: str, offsets, limit: int):
+    """
+    Fetch the pages at the given offsets in one query and cache them, skipping the ones cached or already on their way.
+    """
+    keys = reserve_pages([(table_id, order_column, order_type, offset, limit) for offset in offsets])
+    if not keys:
+        return
+    first = min(key[3] for key in keys)
+    last = max(key[3] for key in keys)
     try:
-        return await AuthorQuery.build_author_group_query_batch(pool, author_ids).execute()
+        window = qb.clone()
+        # The window is cached page by page, keep it out of the query result cache
+        window.cache_results = False
+        rows = await window.offset(first).limit(last + limit - first).execute()
+        store_pages({key: rows[key[3] - first:key[3] - first + limit] for key in keys}, prefetched=True)
     except Exception as e:
-        app.logger.error(f"fetch_author_links_batch error: {e}")
+        release_pages(keys)
+        logger.warning(f"Prefetch of table pages failed: {e}")
+
+
+async def resolve_table(table_id: str):
+    """
+    (QueryBuilder, row_methods, facets) of a table, from this worker cache or rebuilt from its signed spec.
+    The builder is shared, clone it before changing it.
+
+    :raises BadSignature: If the table_id is not a valid table spec.
+    """
+    qb = get_query_builder(table_id)
+    row_methods = get_row_methods(table_id)
+    facets = get_facets(table_id)
+    if qb is None or row_methods is None or facets is None:
+        view_name, spec_args = load_table_spec(table_id)
+        table_component = await build_table(view_name, spec_args)
+        qb, row_methods, facets = table_component.query_builder, table_component.row_methods, table_component.facets
+        store_query_builder(table_id, qb, row_methods, facets)
+    return qb, row_methods, facets
+
+
+ORDER_TYPES = ("ASC", "DESC")
+
+
+async def order_table_query(table_qb: QueryBuilder, order_column, order_type) -> QueryBuilder:
+    """
+    Clone of a table query without offset and limit, ordered by one of its output columns.
+    Rows without a value are left out. Columns with a sort key are ordered in the query itself, the others by wrapping it.
+
+    :param table_qb: Shared builder of the table, it is only described so its clones know the output columns.
+    :raises ValueError: If the column is not an output column of the query or the order is not ASC/DESC,
+                        both are inlined in the SQL.
+    """
+    if order_column and order_type:
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"Unknown order type: {order_type}")
+        if order_column not in await table_qb.output_columns():
+            raise ValueError(f"Unknown order column: {order_column}")
+    qb = table_qb.clone(no_offset=True, no_limit=True)
+    if not order_column or not order_type:
+        return qb
+    sort_key = qb.sort_keys.get(order_column)
+    if sort_key is not None:
+        qb.and_condition("", sort_key["condition"], custom=True)
+        handle_order_by(qb, order_column, order_type, sort_key["expression"])
+        return qb
+    qb.offset_value = None
+    qb.limit_value = None
+    params = qb.parameters
+    qb = QueryBuilder(ctx.get_pool(), f"({qb.build_query_string()})", "ordered")
+    qb.select("*")
+    qb.parameters = params
+    qb.and_condition("", f"\"{order_column}\" IS NOT NULL", custom=True)
+    qb.and_condition("", f"\"{order_column}\" != ''", custom=True)
+    handle_order_by(qb, order_column, order_type)
+    return qb
+
+
+async def fetch_author_links_batch(author_ids, filters: GraphFilters = None):
+    """
+    Co-author link rows of a chunk of authors, database errors are raised to the caller.
+    """
+    if not author_ids:
         return []
+    return await AuthorQuery.build_author_group_query_batch(pool, author_ids, filters).execute()
+
+def read_graph_budget(data):
+    """
+    Node/edge budget and neighbors kept per node for a graph request,
+    capped by the server configuration.
+
+    :raises ValueError: If a requested value is below 1.
+    """
+    config = ctx.get_config()
+    max_nodes = int(config.get_value("max_graph_nodes"))
+    max_edges = int(config.get_value("max_graph_edges"))
+    max_neighbors = int(config.get_value("max_neighbors_per_node"))
+
+    node_budget = min(int(data.get("max_nodes") or max_nodes), max_nodes)
+    edge_budget = min(int(data.get("max_edges") or max_edges), max_edges)
+    top_k = min(int(data.get("top_k") or max_neighbors), max_neighbors)
+    if min(node_budget, edge_budget, top_k) < 1:
+        raise ValueError("max_nodes, max_edges and top_k must be at least 1")
+    return node_budget, edge_budget, top_k
+
+async def fetch_author_links(author_ids, chunk_size, filters: GraphFilters = None):
+    """
+    Co-author link rows of the given authors, only the authors missing from the graph cache are queried.
+    """
+    filter_key = filters.cache_key() if filters is not None else None
+    cached, missing = graph_cache.get_many(LINKS_REGION, [(author_id, filter_key) for author_id in author_ids])
+    missing_ids = [author_id for author_id, _ in missing]
+
+    chunks = [missing_ids[i: i + chunk_size] for i in range(0, len(missing_ids), chunk_size)]
+    tasks = [asyncio.create_task(fetch_author_links_batch(chunk, filters)) for chunk in chunks]
+    sub_results_list = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Every author of a successful chunk is cached, also when it has no links.
+    # A failed chunk is left out of this graph and of the cache, the next request queries it again
+    fetched = {}
+    for chunk, sub_results in zip(chunks, sub_results_list):
+        if isinstance(sub_results, Exception):
+            app.logger.error(f"fetch_author_links_batch error: {sub_results}")
+            continue
+        chunk_rows = {(author_id, filter_key): [] for author_id in chunk}
+        for row in sub_results:
+            chunk_rows[(row["start_author_id"], filter_key)].append(row)
+        fetched.update(chunk_rows)
+    graph_cache.put_many(LINKS_REGION, fetched)
+
+    # Combine sub-results
+    rows = []
+    for author_rows in list(cached.values()) + list(fetched.values()):
+        rows.extend(author_rows)
+    return rows
+
+async def prune_author_links(rows, graph_nodes, pair_to_ranks_freq, pair_to_years_freq, top_k,
+                             node_budget, edge_budget, truncation, chunk_size, filters: GraphFilters = None):
+    """
+    Fetch the pair statistics of the given links and keep only the strongest ones within budget.
+    Truncation counters are accumulated into the truncation dict.
+    """
+    if not rows:
+        return rows
+
+    row_pairs = {tuple(sorted((row["start_author_id"], row["end_author_id"]))) for row in rows}
+    missing_pairs = [pair for pair in row_pairs if pair not in pair_to_ranks_freq]
+    await fetch_pub_info(missing_pairs, chunk_size, pair_to_ranks_freq, pair_to_years_freq, filters)
+
+    kept_rows, stats = await graph_executor.run(
+        prune_links, rows, graph_nodes,
+        {pair: pair_to_ranks_freq[pair] for pair in row_pairs},
+        {pair: pair_to_years_freq[pair] for pair in row_pairs},
+        top_k, node_budget, edge_budget
+    )
+    for key, value in stats.items():
+        truncation[key] += value
+    return kept_rows
+
+async def estimate_reach(root_ids, max_depth):
+    """
+    Estimated number of authors reachable from the roots within each depth up to max_depth.
+    Roots without a sketch (no co-authors, or not yet processed) count as themselves.
 
-async def fetch_pub_info_subbatch(pairs):
+    :return: Map depth -> estimate, empty when there are no roots or the sketch table is not created yet.
+    """
+    root_ids = sorted(set(root_ids))
+    if not root_ids or max_depth < 1:
+        return {}
+    root_ids_str = ','.join(f"({int(num)})" for num in root_ids)
+    try:
+        rows = await (QueryBuilder(ctx.get_pool(), AuthorReachSketch.__tablename__, "rs", cache_results=False)
+                      .join("INNER", f"(VALUES {root_ids_str})", "roots(id)", on_condition="rs.author_id = roots.id")
+                      .and_condition("", f"rs.hop <= {int(max_depth)}", custom=True)
+                      .select("rs.author_id, rs.hop, rs.registers")
+                      .execute())
+    except UndefinedTable as e:
+        app.logger.warning(f"Reach sketches unavailable, the reach policy is skipped: {e}")
+        return {}
+
+    sketches_by_hop = defaultdict(list)
+    for row in rows:
+        sketches_by_hop[row["hop"]].append(bytes(row["registers"]))
+
+    estimates = {}
+    for hop in range(1, max_depth + 1):
+        sketches = sketches_by_hop.get(hop, [])
+        estimates[hop] = (estimate(merge(sketches)) if sketches else 0) + len(root_ids) - len(sketches)
+    return estimates
+
+async def fetch_author_neighbors(author_ids, chunk_size):
+    """
+    Neighbors of the given authors in the co-author relation, as a map author id -> neighbor ids.
+    """
+    neighbors, missing_ids = graph_cache.get_many(NEIGHBORS_REGION, author_ids)
+
+    tasks = []
+    for i in range(0, len(missing_ids), chunk_size):
+        chunk = missing_ids[i: i + chunk_size]
+        tasks.append(asyncio.create_task(AuthorQuery.build_neighbors_query_batch(pool, chunk).execute()))
+    sub_results_list = await asyncio.gather(*tasks)
+
+    fetched = {author_id: [] for author_id in missing_ids}
+    for sub_results in sub_results_list:
+        for row in sub_results:
+            fetched[row["author_id"]].append(row["neighbor_id"])
+    graph_cache.put_many(NEIGHBORS_REGION, fetched)
+
+    neighbors.update(fetched)
+    return neighbors
+
+async def fetch_pub_info(pairs_list, chunk_size, pair_to_ranks_freq, pair_to_years_freq, filters: GraphFilters = None):
+    """
+    Fetch rank and year frequencies for the given pairs into the given maps.
+    Every requested pair gets an entry, empty when the authors share no ranked publication.
+    With filters, only the publications satisfying them are counted.
+    """
+    if not pairs_list:
+        return
+
+    filter_key = filters.cache_key() if filters is not None else None
+    cached, missing = graph_cache.get_many(PAIRS_REGION, [(pair, filter_key) for pair in pairs_list])
+    missing_pairs = [pair for pair, _ in missing]
+
+    sub_batches = [missing_pairs[i: i + chunk_size] for i in range(0, len(missing_pairs), chunk_size)]
+    tasks = [asyncio.create_task(fetch_pub_info_subbatch(sub_batch, filters)) for sub_batch in sub_batches]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for pair in missing_pairs:
+        pair_to_ranks_freq[pair] = {}
+        pair_to_years_freq[pair] = {}
+
+    # Merge partial dictionaries, as plain dicts so they can be shipped to the graph executor.
+    # Pairs of a failed sub-batch stay empty for this graph only, they are not cached
+    succeeded = []
+    for sub_batch, result in zip(sub_batches, results):
+        if isinstance(result, Exception):
+            app.logger.error(f"fetch_pub_info_subbatch error: {result}")
+            continue
+        ranks_dict, years_dict = result
+        for p, freq_map in ranks_dict.items():
+            pair_to_ranks_freq[p] = dict(freq_map)
+        for p, y_map in years_dict.items():
+            pair_to_years_freq[p] = dict(y_map)
+        succeeded.extend(sub_batch)
+
+    graph_cache.put_many(PAIRS_REGION, {
+        (pair, filter_key): (pair_to_ranks_freq[pair], pair_to_years_freq[pair]) for pair in succeeded
+    })
+    for (pair, _), (ranks_map, years_map) in cached.items():
+        pair_to_ranks_freq[pair] = ranks_map
+        pair_to_years_freq[pair] = years_map
+
+async def fetch_pub_info_subbatch(pairs, filters: GraphFilters = None):
     if not pairs:
         return {}, {}
-    ranks_rows = await fetch_pub_ranks_batch(pairs)
-    years_rows = await fetch_pub_years_batch(pairs)
+    ranks_rows = await fetch_pub_ranks_batch(pairs, filters)
+    years_rows = await fetch_pub_years_batch(pairs, filters)
 
     ranks_freq = defaultdict(lambda: defaultdict(int))
     years_freq = defaultdict(lambda: defaultdict(int))
@@ -1078,23 +1625,15 @@ async def fetch_pub_info_subbatch(pairs):
 
     return ranks_freq, years_freq
 
-async def fetch_pub_ranks_batch(pairs):
+async def fetch_pub_ranks_batch(pairs, filters: GraphFilters = None):
     if not pairs:
         return []
-    try:
-        return await PublicationQuery.build_author_publication_query_batch(pool, pairs).execute()
-    except Exception as e:
-        app.logger.error(f"fetch_pub_ranks_batch error: {e}")
-        return []
+    return await PublicationQuery.build_author_publication_query_batch(pool, pairs, filters).execute()
 
-async def fetch_pub_years_batch(pairs):
+async def fetch_pub_years_batch(pairs, filters: GraphFilters = None):
     if not pairs:
         return []
-    try:
-        return await PublicationQuery.build_author_publication_year_query_batch(pool, pairs).execute()
-    except Exception as e:
-        app.logger.error(f"fetch_pub_years_batch error: {e}")
-        return []
+    return await PublicationQuery.build_author_publication_year_query_batch(pool, pairs, filters).execute()
 
 
 if __name__ == '__main__':
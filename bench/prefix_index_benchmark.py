@@ -0,0 +1,36 @@
+"""
+Prefix index build time, size and lookup latency on synthetic author names.
+Run from the repository root: python -m bench.prefix_index_benchmark
+"""
+import random
+import time
+
+from com.gwngames.server.search.PrefixIndex import PrefixIndex
+
+
+def main():
+    rng = random.Random(3)
+    syllables = ["ka", "lo", "mi", "ra", "ne", "to", "si", "ber", "an", "dre", "gon", "vel", "ti", "mar"]
+
+    def fake_name():
+        return " ".join("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title() for _ in range(2))
+
+    bench_items = [(idx, name, name, rng.random(), [name]) for idx, name in ((i, fake_name()) for i in range(300_000))]
+    started = time.perf_counter()
+    index = PrefixIndex(bench_items)
+    size = (index.key_prefixes.nbytes + index.key_starts.nbytes + index.key_ends.nbytes
+            + index.positions.nbytes + len(index.buffer))
+    print(f"Indexed {len(index)} items, {len(index.key_prefixes)} keys ({size / 2 ** 20:.1f} MiB) "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    lookups = 1000
+    for query in ("k", "ma", "mar", "kalo", "Dregon Ti"):
+        started = time.perf_counter()
+        for _ in range(lookups):
+            results = index.search(query, 10)
+        elapsed = (time.perf_counter() - started) * 1000 / lookups
+        print(f"'{query}': {len(results)} results, {elapsed:.3f}ms per lookup")
+
+
+if __name__ == '__main__':
+    main()
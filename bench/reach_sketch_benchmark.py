@@ -0,0 +1,41 @@
+"""
+Reach sketch build time and accuracy on a synthetic co-author graph, against exact BFS reach.
+Run from the repository root: python -m bench.reach_sketch_benchmark
+"""
+import time
+
+import numpy as np
+
+from com.gwngames.server.graph.ReachSketch import build_sketches, merge, estimate
+
+
+def main():
+    rng = np.random.default_rng(7)
+    authors = 100_000
+    edges = 500_000
+    bench_sources = rng.integers(0, authors, edges)
+    bench_targets = (bench_sources + rng.integers(-500, 500, edges)) % authors
+
+    start = time.perf_counter()
+    ids, hop_sketches = build_sketches(bench_sources, bench_targets, 3)
+    print(f"Built {len(hop_sketches)} hops for {len(ids)} authors in {time.perf_counter() - start:.2f}s")
+
+    adjacency = {}
+    for s, t in zip(bench_sources.tolist(), bench_targets.tolist()):
+        adjacency.setdefault(s, set()).add(t)
+    position = {author_id: idx for idx, author_id in enumerate(ids.tolist())}
+    for roots in (rng.integers(0, authors, 1).tolist(), rng.integers(0, authors, 20).tolist()):
+        seen = set(roots)
+        frontier = set(roots)
+        for hop in range(3):
+            frontier = {n for a in frontier for n in adjacency.get(a, ())} - seen
+            seen |= frontier
+            start = time.perf_counter()
+            union = merge(hop_sketches[hop][position[r]].tobytes() for r in roots)
+            approx = estimate(union)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{len(roots)} roots, hop {hop + 1}: exact {len(seen)}, estimate {approx} ({elapsed:.2f}ms)")
+
+
+if __name__ == '__main__':
+    main()
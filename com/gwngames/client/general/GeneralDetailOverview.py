@@ -1,9 +1,15 @@
+import logging
+
+from psycopg.errors import UndefinedTable
 from quart import render_template
 
 from com.gwngames.server.query.QueryBuilder import QueryBuilder
 
+logger = logging.getLogger(__name__)
+
 class GeneralDetailOverview:
-    def __init__(self, query_builder: QueryBuilder, title_field, description_field, image_field=None, url_fields=None):
+    def __init__(self, query_builder: QueryBuilder, title_field, description_field, image_field=None, url_fields=None,
+                 document_field=None, field_order=None, fallback_query_builder: QueryBuilder = None):
         """
         Initialize the DetailedDataViewer.
 
@@ -12,12 +18,19 @@ class GeneralDetailOverview:
         :param description_field: Field name for the description.
         :param image_field: (Optional) Field name for the image URL.
         :param url_fields: (Optional) List of field names that contain URLs.
+        :param document_field: (Optional) Column holding a JSON document, its keys are shown as the fields.
+        :param field_order: (Optional) Order of the document fields, JSONB does not keep it. Unlisted ones come last.
+        :param fallback_query_builder: (Optional) Query used when query_builder finds nothing,
+                                       e.g. while a document is not built yet, or reads a table not created yet.
         """
         self.query_builder = query_builder
         self.title_field = title_field
         self.description_field = description_field
         self.image_field = image_field
         self.url_fields = url_fields or []
+        self.document_field = document_field
+        self.field_order = field_order or []
+        self.fallback_query_builder = fallback_query_builder
         self.row_methods = []
 
     def add_row_method(self, label, endpoint_name, column_name="id"):
@@ -35,12 +48,24 @@ class GeneralDetailOverview:
         Render the data viewer component with the configured query.
         """
         # Execute the query to fetch data
-        rows = await self.query_builder.execute()
+        try:
+            rows = await self.query_builder.execute()
+        except UndefinedTable as e:
+            if self.fallback_query_builder is None:
+                raise
+            logger.warning(f"Detail query on a missing table, using the fallback query: {e}")
+            rows = []
+        if not rows and self.fallback_query_builder is not None:
+            rows = await self.fallback_query_builder.execute()
         if not rows:
-            return render_template("generic_detail_overview.html", data=None)
+            return await render_template("generic_detail_overview.html", data=None)
 
         # Take the first result as the primary data source
         data = rows[0]
+        if self.document_field and self.document_field in data:
+            document = data[self.document_field]
+            data = {field: document[field] for field in self.field_order if field in document}
+            data.update((field, value) for field, value in document.items() if field not in data)
 
         # Extract image, title, and description
         image_url = data.get(self.image_field) if self.image_field else None
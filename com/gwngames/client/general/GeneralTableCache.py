@@ -1,37 +1,217 @@
-from typing import Dict, List
-from com.gwngames.server.query.QueryBuilder import QueryBuilder
 import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import cachetools
+
+from com.gwngames.server.query.QueryBuilder import QueryBuilder
+
+
+def entry_size(entry: Tuple[QueryBuilder, List[Dict], List[Dict]]) -> int:
+    """
+    Approximate memory held by a cached table: the SQL text, its parameters, row methods and facets.
+    """
+    qb, row_methods, facets = entry
+    return len(qb.build_query_string()) + len(repr(qb.parameters)) + len(repr(row_methods)) + len(repr(facets))
+
+
+def page_size(entry: Tuple[List[Dict], bool]) -> int:
+    """
+    Approximate memory held by a cached page of rows.
+    """
+    return len(repr(entry[0]))
+
+
+class _TableStore(cachetools.TTLCache):
+    """
+    TTL cache bounded by the size of its entries, counting what it evicts.
+    Expired entries are dropped lazily on access, no thread is started per entry.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, getsizeof=entry_size):
+        super().__init__(maxsize=maxsize, ttl=ttl, getsizeof=getsizeof)
+        self.evictions = 0
+
+    def popitem(self):
+        self.evictions += 1
+        return super().popitem()
+
 
-TABLE_CACHE: Dict[str, QueryBuilder] = {}
-METHODS_CACHE: Dict[str, List[Dict]] = {}
+# Rendered tables by table_id, 64 MB of SQL text for one day unless configured otherwise
+TABLE_CACHE: _TableStore = _TableStore(maxsize=64 * 1024 * 1024, ttl=86400)
+# Pages of rows by (table_id, order_column, order_type, offset, limit), with whether they were prefetched
+PAGE_CACHE: _TableStore = _TableStore(maxsize=32 * 1024 * 1024, ttl=600, getsizeof=page_size)
+# Total row count by (table_id, order_column, order_type)
+COUNT_CACHE: cachetools.TTLCache = cachetools.TTLCache(maxsize=10000, ttl=600)
+# Facet counts by table_id, the table spec already holds the filters
+FACET_CACHE: cachetools.TTLCache = cachetools.TTLCache(maxsize=2000, ttl=600)
 CACHE_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "stores": 0}
+_PAGE_STATS = {"hits": 0, "misses": 0, "prefetched": 0, "prefetch_hits": 0}
+# Pages being prefetched, so concurrent fetches do not prefetch them twice
+_PENDING_PAGES = set()
 
 
-def store_query_builder(table_id: str, qb: QueryBuilder, row_methods: List[Dict]) -> None:
+def configure_table_cache(max_bytes: int, ttl: float, page_max_bytes: int, page_ttl: float) -> None:
+    """
+    (Re)create the table and page stores, dropping their content.
+
+    :param max_bytes: Size budget of the cached tables, see entry_size.
+    :param ttl: Seconds a table stays valid.
+    :param page_max_bytes: Size budget of the cached pages, see page_size.
+    :param page_ttl: Seconds a page, a row count or facet counts stay valid.
+    """
+    global TABLE_CACHE, PAGE_CACHE, COUNT_CACHE, FACET_CACHE
+    with CACHE_LOCK:
+        TABLE_CACHE = _TableStore(maxsize=max_bytes, ttl=ttl)
+        PAGE_CACHE = _TableStore(maxsize=page_max_bytes, ttl=page_ttl, getsizeof=page_size)
+        COUNT_CACHE = cachetools.TTLCache(maxsize=COUNT_CACHE.maxsize, ttl=page_ttl)
+        FACET_CACHE = cachetools.TTLCache(maxsize=FACET_CACHE.maxsize, ttl=page_ttl)
+        _STATS.update(hits=0, misses=0, stores=0)
+        _PAGE_STATS.update(hits=0, misses=0, prefetched=0, prefetch_hits=0)
+        _PENDING_PAGES.clear()
+
+
+def store_query_builder(table_id: str, qb: QueryBuilder, row_methods: List[Dict], facets: List[Dict] = None) -> None:
     """Store a QueryBuilder in the global cache under the table_id key."""
     with CACHE_LOCK:  # Ensure thread-safe access
-        TABLE_CACHE[table_id] = qb
-        METHODS_CACHE[table_id] = row_methods
+        try:
+            TABLE_CACHE[table_id] = (qb, row_methods, facets or [])
+            _STATS["stores"] += 1
+        except ValueError:
+            # Larger than the whole budget: the table is rebuilt from its spec on every fetch
+            pass
 
-    timer = threading.Timer(86400, remove_query_builder, args=[table_id])
-    timer.daemon = True
-    timer.start()
+
+def _get_entry(table_id: str) -> Optional[Tuple[QueryBuilder, List[Dict], List[Dict]]]:
+    with CACHE_LOCK:
+        entry = TABLE_CACHE.get(table_id)
+        _STATS["hits" if entry is not None else "misses"] += 1
+        return entry
 
 
-def get_query_builder(table_id: str) -> QueryBuilder:
+def get_query_builder(table_id: str) -> Optional[QueryBuilder]:
     """Retrieve a QueryBuilder from the global cache by table_id."""
+    entry = _get_entry(table_id)
+    return entry[0] if entry is not None else None
+
+
+def get_row_methods(table_id: str) -> Optional[List[Dict]]:
     with CACHE_LOCK:
-        return TABLE_CACHE.get(table_id)
+        entry = TABLE_CACHE.get(table_id)
+        return entry[1] if entry is not None else None
 
 
-def get_row_methods(table_id: str) -> List[Dict]:
+def get_facets(table_id: str) -> Optional[List[Dict]]:
     with CACHE_LOCK:
-        return METHODS_CACHE.get(table_id)
+        entry = TABLE_CACHE.get(table_id)
+        return entry[2] if entry is not None else None
 
 
 def remove_query_builder(table_id: str) -> None:
     """Remove a QueryBuilder from the global cache if no longer needed."""
     with CACHE_LOCK:
-        if table_id in TABLE_CACHE:
-            del TABLE_CACHE[table_id]
-            del METHODS_CACHE[table_id]
+        TABLE_CACHE.pop(table_id, None)
+
+
+def get_cached_page(key: Hashable) -> Optional[List[Dict]]:
+    with CACHE_LOCK:
+        entry = PAGE_CACHE.get(key)
+        if entry is None:
+            _PAGE_STATS["misses"] += 1
+            return None
+        _PAGE_STATS["hits"] += 1
+        if entry[1]:
+            # Count a prefetched page once, so prefetch_use_rate is the share of prefetches that paid off
+            _PAGE_STATS["prefetch_hits"] += 1
+            PAGE_CACHE[key] = (entry[0], False)
+        return entry[0]
+
+
+def store_pages(pages: Dict[Hashable, List[Dict]], prefetched: bool = False) -> None:
+    """
+    Cache pages of rows, releasing their prefetch reservation.
+    """
+    with CACHE_LOCK:
+        for key, rows in pages.items():
+            _PENDING_PAGES.discard(key)
+            try:
+                PAGE_CACHE[key] = (rows, prefetched)
+            except ValueError:
+                continue
+            if prefetched:
+                _PAGE_STATS["prefetched"] += 1
+
+
+def reserve_pages(keys: Iterable[Hashable]) -> List[Hashable]:
+    """
+    Reserve the pages worth prefetching: the ones neither cached nor being prefetched already.
+    Reserved pages must be passed to store_pages or release_pages.
+    """
+    with CACHE_LOCK:
+        reserved = [key for key in keys if key not in PAGE_CACHE and key not in _PENDING_PAGES]
+        _PENDING_PAGES.update(reserved)
+        return reserved
+
+
+def release_pages(keys: Iterable[Hashable]) -> None:
+    with CACHE_LOCK:
+        _PENDING_PAGES.difference_update(keys)
+
+
+def get_cached_count(key: Hashable) -> Optional[int]:
+    with CACHE_LOCK:
+        return COUNT_CACHE.get(key)
+
+
+def store_count(key: Hashable, count: int) -> None:
+    with CACHE_LOCK:
+        COUNT_CACHE[key] = count
+
+
+def get_cached_facets(table_id: str) -> Optional[Dict[str, List[Dict]]]:
+    with CACHE_LOCK:
+        return FACET_CACHE.get(table_id)
+
+
+def store_facets(table_id: str, facets: Dict[str, List[Dict]]) -> None:
+    with CACHE_LOCK:
+        FACET_CACHE[table_id] = facets
+
+
+def table_cache_stats() -> Dict[str, Any]:
+    with CACHE_LOCK:
+        TABLE_CACHE.expire()
+        hits = _STATS["hits"]
+        misses = _STATS["misses"]
+        return {
+            "entries": len(TABLE_CACHE),
+            "bytes": TABLE_CACHE.currsize,
+            "max_bytes": TABLE_CACHE.maxsize,
+            "stores": _STATS["stores"],
+            "evictions": TABLE_CACHE.evictions,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+
+def page_cache_stats() -> Dict[str, Any]:
+    with CACHE_LOCK:
+        PAGE_CACHE.expire()
+        hits = _PAGE_STATS["hits"]
+        misses = _PAGE_STATS["misses"]
+        prefetched = _PAGE_STATS["prefetched"]
+        return {
+            "entries": len(PAGE_CACHE),
+            "bytes": PAGE_CACHE.currsize,
+            "max_bytes": PAGE_CACHE.maxsize,
+            "evictions": PAGE_CACHE.evictions,
+            "counts": len(COUNT_CACHE),
+            "facets": len(FACET_CACHE),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "prefetched": prefetched,
+            "prefetch_hits": _PAGE_STATS["prefetch_hits"],
+            "prefetch_use_rate": round(_PAGE_STATS["prefetch_hits"] / prefetched, 4) if prefetched else 0.0,
+        }
@@ -1,8 +1,8 @@
 import logging
 import uuid
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Mapping, Callable
 
-from quart import render_template, request
+from quart import render_template
 from com.gwngames.client.general.GeneralTableCache import store_query_builder
 from com.gwngames.server.query.QueryBuilder import QueryBuilder
 
@@ -39,6 +39,7 @@ class GeneralTableOverview:
         self.filters: List[Dict] = []
         self.row_methods: List[Dict] = []
         self.page_methods: List[Dict] = []
+        self.facets: List[Dict] = []
         self.external_records = []
         self.enable_checkboxes = enable_checkboxes
 
@@ -46,7 +47,7 @@ class GeneralTableOverview:
         self.alias: Optional[str] = query_builder.alias
         self.entity_class: Optional[str] = query_builder.table_name
 
-        # Generate a unique table_id to store/retrieve the QueryBuilder from cache
+        # Replaced by the signed table spec when built through TableSpec.build_table
         self.table_id: str = str(uuid.uuid4())
 
         logger.info(
@@ -62,10 +63,16 @@ class GeneralTableOverview:
         is_aggregated: bool = False,
         or_split: bool = False,
         equal: bool = False,
-        int_like: bool = False
+        int_like: bool = False,
+        suggest: Optional[str] = None,
+        condition: Optional[Callable[[QueryBuilder, List[str]], None]] = None
     ):
         """
         Add a filter to the table.
+
+        :param suggest: Kind of the /suggest index offering values while typing, ids for int_like filters.
+        :param condition: Custom condition builder, called with the query builder and the comma separated
+                          values instead of matching the field.
         """
         self.filters.append({
             "field_name": field_name,
@@ -74,10 +81,23 @@ class GeneralTableOverview:
             "is_aggregated": is_aggregated,
             "or_split": or_split,
             "equal": equal,
-            "int_like": int_like
+            "int_like": int_like,
+            "suggest": suggest,
+            "condition": condition
         })
         logger.debug(f"Added filter: {field_name}, type: {filter_type}, aggregated={is_aggregated}")
 
+    def add_facet(self, column: str, filter_field: str, label: Optional[str] = None):
+        """
+        Add a facet: the count of rows per value of an output column, shown next to the filters.
+
+        :param column: Output column of the query to count values of.
+        :param filter_field: Field name of the filter a facet value is applied to.
+        :param label: Title of the facet.
+        """
+        self.facets.append({"column": column, "filter_field": filter_field, "label": label or column})
+        logger.debug(f"Added facet: {column} -> {filter_field}")
+
     def add_row_method(self, label: str, endpoint_name: str):
         """
         Add an action (button/link) that will appear in every row.
@@ -93,6 +113,24 @@ class GeneralTableOverview:
         self.page_methods.append({"label": label, "endpoint": endpoint_name})
         logger.debug(f"Added page method: {label} -> {endpoint_name}")
 
+    def apply_filters(self, args: Mapping[str, str]):
+        """
+        Apply the filters of the table to the query builder.
+
+        :param args: Filter values by field name, as sent by the filter form.
+        """
+        for filter_el in self.filters:
+            filter_value = args.get(filter_el["field_name"])
+
+            is_bypass_rule = filter_el["filter_type"] == "integer"
+
+            if filter_value or is_bypass_rule:
+                logger.debug(f"Applying filter: {filter_el['field_name']} with value {filter_value}")
+                if filter_el["filter_type"] == "string":
+                    self.handle_string_filter(filter_el, filter_value, filter_el.get("or_split"), filter_el.get("equal"))
+                elif filter_el["filter_type"] == "integer":
+                    self.handle_int_filter(filter_el, args)
+
     async def render(self):
         """
         Render the main HTML (template) that includes filters,
@@ -101,7 +139,7 @@ class GeneralTableOverview:
         Typically, we just render the skeleton or do a small initial fetch.
         """
         logger.info(f"Rendering table overview for '{self.table_title}' (table_id={self.table_id})")
-        store_query_builder(self.table_id, self.query_builder, self.row_methods)
+        store_query_builder(self.table_id, self.query_builder, self.row_methods, self.facets)
 
         # Optionally, we can fetch an initial page to show something by default:
         # or we can omit it and let the JavaScript fetch from /fetch_data
@@ -109,19 +147,6 @@ class GeneralTableOverview:
         init_offset = 0
         columns = []
 
-        # Apply filters to the query builder
-        for filter_el in self.filters:
-            filter_value = request.args.get(filter_el["field_name"])
-
-            is_bypass_rule = filter_el["filter_type"] == "integer"
-
-            if filter_value or is_bypass_rule:
-                logger.debug(f"Applying filter: {filter_el['field_name']} with value {filter_value}")
-                if filter_el["filter_type"] == "string":
-                    self.handle_string_filter(filter_el, filter_value, filter_el.get("or_split"), filter_el.get("equal"))
-                elif filter_el["filter_type"] == "integer":
-                    self.handle_int_filter(filter_el)
-
         # Attempt a minimal initial fetch
         self.query_builder.offset(init_offset).limit(self.limit)
         init_rows = await self.query_builder.execute()
@@ -140,12 +165,7 @@ class GeneralTableOverview:
             columns = list(init_rows[0].keys())
 
         # We'll just do a rough count here for the initial rendering
-        count_query = self.query_builder.clone(no_limit=True, no_offset=True)
-        count_query.order_by_fields = []
-        count_query = QueryBuilder(count_query.pool, f"({count_query.build_query_string()})", "count")
-        count_query.parameters = self.query_builder.parameters
-        count_query.select("COUNT(*) AS count")
-        count_data = await count_query.execute()
+        count_data = await self.query_builder.build_count_query().execute()
         total_count = sum(row["count"] for row in count_data)
 
         return await render_template(
@@ -155,6 +175,7 @@ class GeneralTableOverview:
             filters=self.filters,
             row_methods=self.row_methods,
             page_methods=self.page_methods,
+            facets=self.facets,
             image_field=self.image_field,
             enable_checkboxes=self.enable_checkboxes,
             initial_rows=init_rows,
@@ -178,6 +199,10 @@ class GeneralTableOverview:
 
         # Split filter_value by comma, trim whitespace, and iterate over each value
         filter_values = [value.strip() for value in filter_value.split(',')]
+        if filter_element.get("condition"):
+            filter_element["condition"](self.query_builder, [value for value in filter_values if value])
+            return
+
         is_aggregated = filter_element.get("is_aggregated", False)
 
         if or_split:
@@ -212,9 +237,9 @@ class GeneralTableOverview:
                     )
 
 
-    def handle_int_filter(self, filter_element):
-        from_value = request.args.get(f"{filter_element['field_name']}_from")
-        to_value = request.args.get(f"{filter_element['field_name']}_to")
+    def handle_int_filter(self, filter_element, args: Mapping[str, str]):
+        from_value = args.get(f"{filter_element['field_name']}_from")
+        to_value = args.get(f"{filter_element['field_name']}_to")
         logger.debug(f"Handling integer filter for field: {filter_element['field_name']}, from: {from_value}, to: {to_value}")
 
         if from_value is not None and from_value != '':
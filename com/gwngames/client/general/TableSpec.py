@@ -0,0 +1,62 @@
+import logging
+from typing import Awaitable, Callable, Dict, Mapping, Tuple
+
+from itsdangerous import URLSafeSerializer, BadSignature
+
+from com.gwngames.client.general.GeneralTableOverview import GeneralTableOverview
+from com.gwngames.config.SigningKey import signing_key
+
+logger = logging.getLogger(__name__)
+
+SPEC_SALT = "table-spec"
+
+# View name -> coroutine building the table of that view from the request arguments
+TABLE_FACTORIES: Dict[str, Callable[[Mapping[str, str]], Awaitable[GeneralTableOverview]]] = {}
+
+
+def register_table(view_name: str):
+    """
+    Register the factory of a table view, so any worker can rebuild the table from a spec token.
+    """
+    def decorator(factory):
+        TABLE_FACTORIES[view_name] = factory
+        return factory
+    return decorator
+
+
+def _serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(signing_key(), salt=SPEC_SALT)
+
+
+def sign_table_spec(view_name: str, args: Mapping[str, str]) -> str:
+    """
+    Compact signed token holding the view and the arguments (drill-down and filters) of a table.
+
+    :param view_name: Name the table factory is registered with.
+    :param args: Request arguments the table was built from.
+    """
+    spec = {"v": view_name, "a": {key: value for key, value in args.items() if value != ""}}
+    return _serializer().dumps(spec)
+
+
+def load_table_spec(token: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Verify a spec token and return (view_name, args).
+
+    :raises BadSignature: If the token was not signed by this application or names an unknown view.
+    """
+    spec = _serializer().loads(token)
+    if spec.get("v") not in TABLE_FACTORIES:
+        raise BadSignature(f"Unknown table view: {spec.get('v')}")
+    return spec["v"], dict(spec.get("a", {}))
+
+
+async def build_table(view_name: str, args: Mapping[str, str]) -> GeneralTableOverview:
+    """
+    Build the table of a view with its filters applied and its spec token as table_id.
+    """
+    table_component = await TABLE_FACTORIES[view_name](args)
+    table_component.apply_filters(args)
+    table_component.table_id = sign_table_spec(view_name, args)
+    logger.debug(f"Built table '{view_name}' from args {dict(args)}")
+    return table_component
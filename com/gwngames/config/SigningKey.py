@@ -0,0 +1,20 @@
+import os
+
+from com.gwngames.config.Context import Context
+
+SIGNING_KEY_ENV = "PUBVIEWER_TABLE_SPEC_SECRET"
+# Value shipped in config.json, public, so it must never sign anything
+PLACEHOLDER_KEY = "change-me-pubviewer-table-spec"
+
+
+def signing_key() -> str:
+    """
+    Key signing the table and graph tokens: the PUBVIEWER_TABLE_SPEC_SECRET environment variable,
+    else table_spec_secret of the configuration.
+
+    :raises RuntimeError: If no key is set, or it is still the placeholder of config.json.
+    """
+    key = os.environ.get(SIGNING_KEY_ENV) or Context().get_config().get_value("table_spec_secret")
+    if not key or key == PLACEHOLDER_KEY:
+        raise RuntimeError(f"No signing key configured, set the {SIGNING_KEY_ENV} environment variable")
+    return key
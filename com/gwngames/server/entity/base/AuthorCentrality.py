@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Float, TIMESTAMP, func
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class AuthorCentrality(Base):
+    """
+    Centrality of an author in the co-author graph, computed by a batch job.
+    PageRank is scaled so that the average author scores 1.
+    """
+    __tablename__ = "author_centrality"
+
+    author_id = Column(Integer, primary_key=True)
+    degree = Column(Integer, nullable=False)
+    weighted_degree = Column(Float, nullable=False)
+    pagerank = Column(Float, nullable=False)
+    update_date = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<AuthorCentrality(author_id={self.author_id}, degree={self.degree}, pagerank={self.pagerank})>"
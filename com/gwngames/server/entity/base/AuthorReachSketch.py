@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, LargeBinary
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class AuthorReachSketch(Base):
+    """
+    HyperLogLog sketch of the authors reachable from an author in at most `hop` co-author steps,
+    maintained by a batch job and merged at request time to estimate a network size.
+    """
+    __tablename__ = "author_reach_sketch"
+
+    author_id = Column(Integer, primary_key=True)
+    hop = Column(Integer, primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<AuthorReachSketch(author_id={self.author_id}, hop={self.hop})>"
@@ -0,0 +1,268 @@
+import math
+from collections import defaultdict, deque
+
+CONF_RANKS = ["A*", "A", "B", "C"]
+JOURNAL_RANKS = ["Q1", "Q2", "Q3", "Q4"]
+# Quality of a shared publication by venue rank, used to weigh links when pruning
+RANK_QUALITY = {"A*": 4, "Q1": 4, "A": 3, "Q2": 3, "B": 2, "Q3": 2, "C": 1, "Q4": 1}
+# Bonus per unit of log PageRank of the co-author, so influential co-authors are kept first
+CENTRALITY_WEIGHT = 1.0
+
+
+def build_adjacency(sql_authors, edges, weak_edges):
+    """
+    Build minimal node info, the adjacency list and the edge data map
+    from the rows collected by the BFS expansion.
+
+    :param sql_authors: Root authors rows (id, name, image_url).
+    :param edges: Strong edges as (s_id, s_label, s_img, e_id, e_label, e_img) tuples.
+    :param weak_edges: Edges found from the final depth, same shape as edges.
+    :return: (nodes, adj_list, edge_data_map)
+    """
+    nodes = {}
+    for author in sql_authors:
+        if author["id"] not in nodes:
+            nodes[author["id"]] = {
+                "id": author["id"],
+                "label": author["name"],
+                "image": author["image_url"],
+                "is_root": True
+            }
+
+    # adjacency list
+    adj_list = defaultdict(list)
+
+    # We'll store all edge data in a dictionary keyed by a sorted tuple
+    # For instance pair_key = (min_id, max_id)
+    edge_data_map = {}
+
+    # Ingest strong edges
+    for (s_id, s_label, s_img, e_id, e_label, e_img) in edges:
+        adj_list[s_id].append(e_id)
+        adj_list[e_id].append(s_id)
+
+        # If a node is missing, add minimal info
+        if s_id not in nodes:
+            nodes[s_id] = {"id": s_id, "label": s_label, "image": s_img or ""}
+        if e_id not in nodes:
+            nodes[e_id] = {"id": e_id, "label": e_label, "image": e_img or ""}
+
+        pair_key = tuple(sorted((s_id, e_id)))
+        edge_data_map[pair_key] = (s_id, s_label, s_img, e_id, e_label, e_img)
+
+    # Ingest weak edges
+    for (s_id, s_label, s_img, e_id, e_label, e_img) in weak_edges:
+        if s_id in nodes and e_id in nodes:
+            adj_list[s_id].append(e_id)
+            adj_list[e_id].append(s_id)
+
+            pair_key = tuple(sorted((s_id, e_id)))
+            edge_data_map[pair_key] = (s_id, s_label, s_img, e_id, e_label, e_img)
+
+    return nodes, adj_list, edge_data_map
+
+
+def pair_weight(rank_counts, years_map):
+    """
+    Weight of a co-author link: shared publications, plus a bonus for ranked venues.
+    """
+    shared_publications = sum(years_map.values())
+    quality = sum(cnt * RANK_QUALITY.get(rank, 0) for rank, cnt in rank_counts.items())
+    return shared_publications + quality / 4
+
+
+def prune_links(rows, graph_nodes, pair_to_ranks_freq, pair_to_years_freq, top_k, node_budget, edge_budget):
+    """
+    Keep the top_k strongest links of every start author, then accept links strongest first
+    while the edge budget lasts, admitting new end authors while the node budget lasts.
+
+    :param rows: Link rows from the co-author query (start_author_id, end_author_id, ...).
+    :param graph_nodes: Authors already in the graph, they never count against the node budget.
+    :param top_k: Links kept per start author.
+    :param node_budget: New authors that can still be added.
+    :param edge_budget: Links that can still be added.
+    :return: (kept_rows, stats) where stats counts what was pruned or dropped.
+    """
+    by_start = defaultdict(list)
+    for row in rows:
+        pair_key = tuple(sorted((row["start_author_id"], row["end_author_id"])))
+        weight = pair_weight(pair_to_ranks_freq.get(pair_key, {}), pair_to_years_freq.get(pair_key, {}))
+        weight += CENTRALITY_WEIGHT * math.log1p(float(row.get("end_author_pagerank") or 0))
+        by_start[row["start_author_id"]].append((weight, row))
+
+    neighbors_pruned = 0
+    candidates = []
+    for weighted_rows in by_start.values():
+        weighted_rows.sort(key=lambda item: item[0], reverse=True)
+        neighbors_pruned += max(len(weighted_rows) - top_k, 0)
+        candidates.extend(weighted_rows[:top_k])
+
+    candidates.sort(key=lambda item: item[0], reverse=True)
+
+    kept_rows = []
+    admitted = set()
+    dropped_nodes = set()
+    edges_dropped = 0
+    for _, row in candidates:
+        if len(kept_rows) >= edge_budget:
+            edges_dropped += 1
+            continue
+
+        e_id = row["end_author_id"]
+        if e_id not in graph_nodes and e_id not in admitted:
+            if len(admitted) >= node_budget:
+                dropped_nodes.add(e_id)
+                continue
+            admitted.add(e_id)
+        kept_rows.append(row)
+
+    stats = {
+        "neighbors_pruned": neighbors_pruned,
+        "nodes_dropped": len(dropped_nodes - admitted),
+        "edges_dropped": edges_dropped,
+    }
+    return kept_rows, stats
+
+
+def build_edge_object(edge_data, rank_counts, years_map):
+    """
+    Build the final link object for an edge, with rank and year counts.
+    """
+    (s_id, s_label, s_img, e_id, e_label, e_img) = edge_data
+
+    conf_freq = {}
+    jour_freq = {}
+    unranked = 0
+    for rank_str, cnt in rank_counts.items():
+        if rank_str in CONF_RANKS:
+            conf_freq[rank_str] = conf_freq.get(rank_str, 0) + cnt
+        elif rank_str in JOURNAL_RANKS:
+            jour_freq[rank_str] = jour_freq.get(rank_str, 0) + cnt
+        else:
+            unranked += cnt
+
+    best_conf = max(conf_freq, key=conf_freq.get) if conf_freq else "Unranked"
+    best_jour = max(jour_freq, key=jour_freq.get) if jour_freq else "Unranked"
+
+    link_obj = {
+        "source": s_id,
+        "target": e_id,
+        "avg_conf_rank": best_conf,
+        "avg_journal_rank": best_jour,
+        "Unranked": unranked,
+    }
+    # Add year counts, etc.
+    for yr, val in years_map.items():
+        link_obj[str(yr)] = val
+    for rank, val in conf_freq.items():
+        link_obj[str(rank)] = val
+    for rank, val in jour_freq.items():
+        link_obj[str(rank)] = val
+
+    return link_obj
+
+
+def classify_edges(adj_list, edge_data_map, root_ids, pair_to_ranks_freq, pair_to_years_freq):
+    """
+    Run a BFS from every root and split the known edges into
+    links, semi_weak_links and weak_links.
+
+    :return: (links, semi_weak_links, weak_links, global_discovered)
+    """
+    root_id_set = set(root_ids)
+
+    # This will store "tree edges" discovered by BFS from each root
+    # Key: root_id => set of discovered edges (as sorted tuple)
+    per_root_tree_edges = defaultdict(set)
+
+    # Track how many BFS runs discovered each node
+    node_discovery_count = defaultdict(int)
+    global_discovered = set()
+
+    for root_id in root_ids:
+        discovered = set()
+        queue = deque()
+
+        discovered.add(root_id)
+        global_discovered.add(root_id)
+        queue.append(root_id)
+        node_discovery_count[root_id] += 1  # discovered by BFS from root_id
+
+        while queue:
+            current_id = queue.popleft()
+
+            for neighbor_id in adj_list.get(current_id, ()):
+                # Special rule: If neighbor is also a root author
+                # do NOT build a BFS tree edge here => that link
+                # should end up in weak_links only.
+                if neighbor_id in root_id_set and neighbor_id != current_id:
+                    continue
+
+                if neighbor_id not in discovered:
+                    discovered.add(neighbor_id)
+                    global_discovered.add(neighbor_id)
+                    queue.append(neighbor_id)
+                    node_discovery_count[neighbor_id] += 1
+
+                    # We have discovered an edge from current_id => neighbor_id
+                    pair_key = tuple(sorted((current_id, neighbor_id)))
+                    per_root_tree_edges[root_id].add(pair_key)
+
+    # All BFS edges across all roots
+    all_tree_edges = set()
+    for edge_set in per_root_tree_edges.values():
+        all_tree_edges.update(edge_set)
+
+    links = []
+    semi_weak_links = []
+    weak_links = []
+
+    for pair_key, edge_data in edge_data_map.items():
+        edge_obj = build_edge_object(
+            edge_data,
+            pair_to_ranks_freq.get(pair_key, {}),
+            pair_to_years_freq.get(pair_key, {})
+        )
+        s_id, e_id = pair_key
+
+        # Edges between two roots, or not discovered by BFS => weak_links
+        if (s_id in root_id_set and e_id in root_id_set) or pair_key not in all_tree_edges:
+            weak_links.append(edge_obj)
+            continue
+
+        c1 = node_discovery_count[s_id]
+        c2 = node_discovery_count[e_id]
+        if c1 > 1 or c2 > 1:
+            # root_counts = max( #roots that discovered s_id , #roots that discovered e_id )
+            edge_obj["root_counts"] = max(c1, c2)
+            semi_weak_links.append(edge_obj)
+        else:
+            links.append(edge_obj)
+
+    return links, semi_weak_links, weak_links, global_discovered
+
+
+def finalize_graph(nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data):
+    """
+    Attach node rankings, keep only discovered nodes and return the response payload.
+    """
+    # "Author ID" is a text column in the overview query
+    id_to_author_data = {int(x["Author ID"]): x for x in nodes_full_data}
+
+    for node_id in global_discovered:
+        author_data = id_to_author_data.get(node_id)
+        if author_data:
+            nodes[node_id]["freq_conf_rank"] = author_data["Frequent Conf. Rank"]
+            nodes[node_id]["freq_journal_rank"] = author_data["Frequent Journal Rank"]
+            nodes[node_id]["degree"] = int(author_data["Co-authors"])
+            nodes[node_id]["pagerank"] = float(author_data["PageRank"])
+
+    nodes = [ndata for nid, ndata in nodes.items() if nid in global_discovered]
+
+    # Filter links so only edges where both endpoints are discovered
+    links = [
+        link for link in links
+        if link["source"] in global_discovered and link["target"] in global_discovered
+    ]
+
+    return {"nodes": nodes, "links": links, "semi_weak_links": semi_weak_links, "weak_links": weak_links}
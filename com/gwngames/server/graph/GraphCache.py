@@ -0,0 +1,97 @@
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+import cachetools
+
+# Co-author link rows per author, neighbor ids per author (path search), rank/year maps per pair,
+# node positions per network request, cluster contents per clustered network token
+LINKS_REGION = "links"
+NEIGHBORS_REGION = "neighbors"
+PAIRS_REGION = "pairs"
+LAYOUTS_REGION = "layouts"
+CLUSTERS_REGION = "clusters"
+REGIONS = [LINKS_REGION, NEIGHBORS_REGION, PAIRS_REGION, LAYOUTS_REGION, CLUSTERS_REGION]
+# Regions whose entries hold a whole network
+NETWORK_REGIONS = {LAYOUTS_REGION, CLUSTERS_REGION}
+
+
+class GraphCache:
+    """
+    LRU caches with TTL shared by all graph requests of a worker.
+    Entries are per author or per normalized pair, so overlapping networks
+    only query the keys they have not seen yet.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            self._cache_lock = threading.Lock()
+            self._caches: Dict[str, cachetools.TTLCache] = {}
+            self._hits: Dict[str, int] = {}
+            self._misses: Dict[str, int] = {}
+            self.configure(maxsize=100000, ttl=3600, network_maxsize=64)
+
+    def configure(self, maxsize: int, ttl: float, network_maxsize: int):
+        """
+        (Re)create the caches, dropping their content.
+
+        :param maxsize: Maximum number of entries per author/pair region.
+        :param ttl: Seconds an entry stays valid.
+        :param network_maxsize: Maximum number of entries per layout/cluster region, each holds a whole network.
+        """
+        with self._cache_lock:
+            for region in REGIONS:
+                size = network_maxsize if region in NETWORK_REGIONS else maxsize
+                self._caches[region] = cachetools.TTLCache(maxsize=size, ttl=ttl)
+                self._hits[region] = 0
+                self._misses[region] = 0
+
+    def get_many(self, region: str, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+        """
+        Look up several keys at once.
+
+        :return: (found, missing) where found maps the cached keys to their values.
+        """
+        found = {}
+        missing = []
+        with self._cache_lock:
+            cache = self._caches[region]
+            for key in keys:
+                value = cache.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    found[key] = value
+            self._hits[region] += len(found)
+            self._misses[region] += len(missing)
+        return found, missing
+
+    def put_many(self, region: str, values: Dict[Hashable, Any]):
+        with self._cache_lock:
+            cache = self._caches[region]
+            for key, value in values.items():
+                cache[key] = value
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cache_lock:
+            stats = {}
+            for region in REGIONS:
+                hits = self._hits[region]
+                misses = self._misses[region]
+                stats[region] = {
+                    "entries": len(self._caches[region]),
+                    "maxsize": self._caches[region].maxsize,
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                }
+            return stats
@@ -0,0 +1,206 @@
+import random
+from collections import Counter, defaultdict
+
+from com.gwngames.server.graph.GraphAssembler import finalize_graph, pair_weight, CONF_RANKS, JOURNAL_RANKS
+from com.gwngames.server.graph.GraphEncoder import LINK_FIELDS, LINK_TYPES, serialize_graph
+
+CLUSTER_PREFIX = "cluster-"
+# Members listed in a cluster summary
+TOP_MEMBERS = 5
+
+
+def link_counts(link):
+    """
+    Rank and year counts of a link object, everything but endpoints and summary fields.
+    """
+    return {key: value for key, value in link.items()
+            if key not in ("source", "target") and key not in LINK_FIELDS and isinstance(value, (int, float))}
+
+
+def link_weight(link):
+    counts = link_counts(link)
+    ranks = {key: value for key, value in counts.items() if key in CONF_RANKS or key in JOURNAL_RANKS}
+    years = {key: value for key, value in counts.items() if key.isdigit()}
+    return pair_weight(ranks, years)
+
+
+def detect_communities(node_ids, weighted_edges, max_iterations: int = 20, seed: int = 0):
+    """
+    Weighted label propagation: every author repeatedly takes the label with
+    the largest total link weight among its co-authors, until labels are stable.
+
+    :param node_ids: Authors to cluster.
+    :param weighted_edges: (source_id, target_id, weight) triples.
+    :return: Map author id -> cluster index, clusters numbered by decreasing size.
+    """
+    adjacency = defaultdict(lambda: defaultdict(float))
+    for s_id, e_id, weight in weighted_edges:
+        if s_id != e_id:
+            adjacency[s_id][e_id] += weight
+            adjacency[e_id][s_id] += weight
+
+    labels = {node_id: node_id for node_id in node_ids}
+    order = list(node_ids)
+    rng = random.Random(seed)
+
+    for _ in range(max_iterations):
+        rng.shuffle(order)
+        changed = 0
+        for node_id in order:
+            neighbors = adjacency.get(node_id)
+            if not neighbors:
+                continue
+            scores = defaultdict(float)
+            for neighbor_id, weight in neighbors.items():
+                if neighbor_id in labels:
+                    scores[labels[neighbor_id]] += weight
+            if not scores:
+                continue
+            best = max(scores.values())
+            candidates = [label for label, score in scores.items() if score == best]
+            # Ties keep the current label, otherwise the smallest one, so runs are reproducible
+            new_label = labels[node_id] if labels[node_id] in candidates else min(candidates)
+            if new_label != labels[node_id]:
+                labels[node_id] = new_label
+                changed += 1
+        if not changed:
+            break
+
+    sizes = Counter(labels.values())
+    ranking = {label: idx for idx, (label, _) in enumerate(sorted(sizes.items(), key=lambda item: (-item[1], item[0])))}
+    return {node_id: ranking[label] for node_id, label in labels.items()}
+
+
+def _merge_link(target, link):
+    for key, value in link_counts(link).items():
+        target[key] = target.get(key, 0) + value
+
+
+def _summary_link(source, target, counts):
+    conf_freq = {rank: counts[rank] for rank in CONF_RANKS if counts.get(rank)}
+    jour_freq = {rank: counts[rank] for rank in JOURNAL_RANKS if counts.get(rank)}
+    link_obj = {
+        "source": source,
+        "target": target,
+        "avg_conf_rank": max(conf_freq, key=conf_freq.get) if conf_freq else "Unranked",
+        "avg_journal_rank": max(jour_freq, key=jour_freq.get) if jour_freq else "Unranked",
+    }
+    link_obj.update(counts)
+    return link_obj
+
+
+def collapse_graph(graph):
+    """
+    Collapse a finalized graph into communities.
+    Clusters with one author are kept as plain author nodes.
+
+    :return: (super_graph, clusters) where super_graph has one node per cluster and one link per pair of
+             connected clusters, and clusters maps a cluster node id to its authors and links for expansion.
+    """
+    nodes_by_id = {node["id"]: node for node in graph["nodes"]}
+    all_links = [(link_type, link) for link_type in LINK_TYPES for link in graph[link_type]]
+    # Sorted inputs, so a worker computing the network again finds the same clusters
+    membership = detect_communities(
+        sorted(nodes_by_id.keys()),
+        sorted((link["source"], link["target"], link_weight(link)) for _, link in all_links)
+    )
+
+    members = defaultdict(list)
+    for node_id, cluster in membership.items():
+        members[cluster].append(node_id)
+
+    def group_id(node_id):
+        cluster = membership[node_id]
+        return f"{CLUSTER_PREFIX}{cluster}" if len(members[cluster]) > 1 else node_id
+
+    weighted_degree = defaultdict(float)
+    clusters = {}
+    for cluster, member_ids in members.items():
+        if len(member_ids) > 1:
+            clusters[f"{CLUSTER_PREFIX}{cluster}"] = {
+                "nodes": [nodes_by_id[node_id] for node_id in member_ids],
+                "links": [], "semi_weak_links": [], "weak_links": [],
+                "boundary": defaultdict(dict),
+            }
+
+    super_counts = defaultdict(dict)
+    for link_type, link in all_links:
+        # A self-loop joins no two authors, and a single author has no cluster to keep it in
+        if link["source"] == link["target"]:
+            continue
+        source, target = group_id(link["source"]), group_id(link["target"])
+        weight = link_weight(link)
+        weighted_degree[link["source"]] += weight
+        weighted_degree[link["target"]] += weight
+
+        if source == target:
+            clusters[source][link_type].append(link)
+            continue
+
+        _merge_link(super_counts[tuple(sorted((source, target), key=str))], link)
+        # Links leaving a cluster keep both authors and name the other group, the client points them
+        # to the other cluster node while it is collapsed and to the author once it is expanded
+        if source in clusters:
+            _merge_link(clusters[source]["boundary"][(link["source"], link["target"], target)], link)
+        if target in clusters:
+            _merge_link(clusters[target]["boundary"][(link["target"], link["source"], source)], link)
+
+    super_nodes = []
+    for group, data in clusters.items():
+        member_nodes = data["nodes"]
+        conf_ranks = Counter(node.get("freq_conf_rank") or "Unranked" for node in member_nodes)
+        journal_ranks = Counter(node.get("freq_journal_rank") or "Unranked" for node in member_nodes)
+        top_members = sorted(member_nodes, key=lambda node: -weighted_degree[node["id"]])[:TOP_MEMBERS]
+        super_nodes.append({
+            "id": group,
+            "label": f"{top_members[0]['label']} +{len(member_nodes) - 1}",
+            "image": "",
+            "is_cluster": True,
+            "is_root": any(node.get("is_root") for node in member_nodes),
+            "size": len(member_nodes),
+            "freq_conf_rank": conf_ranks.most_common(1)[0][0],
+            "freq_journal_rank": journal_ranks.most_common(1)[0][0],
+            "conf_ranks": dict(conf_ranks),
+            "journal_ranks": dict(journal_ranks),
+            "top_members": [node["label"] for node in top_members],
+        })
+        data["links"].extend(
+            dict(_summary_link(member_id, other_id, counts), other_cluster=other_group)
+            for (member_id, other_id, other_group), counts in data["boundary"].items()
+        )
+        del data["boundary"]
+
+    singles = [nodes_by_id[ids[0]] for ids in members.values() if len(ids) == 1]
+    super_graph = {
+        "nodes": super_nodes + singles,
+        "links": [_summary_link(source, target, counts) for (source, target), counts in super_counts.items()],
+        "semi_weak_links": [],
+        "weak_links": [],
+    }
+    return super_graph, clusters
+
+
+def build_clusters(nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data):
+    """
+    Finalize the graph and collapse it into communities.
+    Community detection is seeded, so the same network always gives the same clusters.
+
+    :return: (super_graph, clusters), see collapse_graph.
+    """
+    graph = finalize_graph(nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data)
+    return collapse_graph(graph)
+
+
+def build_clustered_payload(nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data,
+                            columnar: bool = False, compress: bool = False, extra=None):
+    """
+    Finalize the graph, collapse it into communities and serialize the collapsed graph.
+
+    :return: (body, counts, clusters) where clusters holds what each cluster node expands to.
+    """
+    super_graph, clusters = build_clusters(
+        nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data
+    )
+    super_graph.update(extra or {})
+    counts = {key: len(value) for key, value in super_graph.items() if isinstance(value, list)}
+    return serialize_graph(super_graph, columnar, compress), counts, clusters
@@ -0,0 +1,127 @@
+import gzip
+import json
+
+from com.gwngames.server.graph.GraphAssembler import finalize_graph
+
+COLUMNAR_FORMAT = "columnar"
+
+# Link keys carried as their own columns, every other link key is a rank/year count
+LINK_FIELDS = ["avg_conf_rank", "avg_journal_rank", "root_counts"]
+# Link and node columns whose values are stored as indices in the shared dictionary
+DICT_FIELDS = {"avg_conf_rank", "avg_journal_rank", "freq_conf_rank", "freq_journal_rank"}
+LINK_TYPES = ["links", "semi_weak_links", "weak_links"]
+
+
+class _Dictionary:
+    """
+    Shared string dictionary for rank names and year keys.
+    """
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def encode(self, value):
+        if value is None:
+            return None
+        value = str(value)
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def encode_columnar(graph):
+    """
+    Encode a graph payload column by column: nodes and links become arrays per field,
+    link endpoints become node indices and rank/year keys are shared through a dictionary.
+    Per-link counts are stored CSR-style (offsets, keys, values).
+    """
+    dictionary = _Dictionary()
+    nodes = graph["nodes"]
+
+    node_fields = []
+    for node in nodes:
+        for key in node:
+            if key not in node_fields:
+                node_fields.append(key)
+
+    node_columns = {}
+    for field in node_fields:
+        if field in DICT_FIELDS:
+            node_columns[field] = [dictionary.encode(node.get(field)) for node in nodes]
+        else:
+            node_columns[field] = [node.get(field) for node in nodes]
+
+    node_index = {node["id"]: idx for idx, node in enumerate(nodes)}
+
+    encoded = {
+        "format": COLUMNAR_FORMAT,
+        "dict": dictionary.values,
+        "nodes": node_columns,
+    }
+
+    # Anything besides nodes and links (e.g. truncation info) is passed through as is
+    for key, value in graph.items():
+        if key != "nodes" and key not in LINK_TYPES:
+            encoded[key] = value
+
+    for link_type in LINK_TYPES:
+        links = graph[link_type]
+        columns = {
+            "source": [node_index.get(link["source"], -1) for link in links],
+            "target": [node_index.get(link["target"], -1) for link in links],
+            "count_offsets": [0],
+            "count_keys": [],
+            "count_values": [],
+        }
+        for field in LINK_FIELDS:
+            if field in DICT_FIELDS:
+                columns[field] = [dictionary.encode(link.get(field)) for link in links]
+            else:
+                columns[field] = [link.get(field) for link in links]
+
+        for link in links:
+            for key, value in link.items():
+                if key in ("source", "target") or key in LINK_FIELDS:
+                    continue
+                columns["count_keys"].append(dictionary.encode(key))
+                columns["count_values"].append(value)
+            columns["count_offsets"].append(len(columns["count_keys"]))
+
+        encoded[link_type] = columns
+
+    return encoded
+
+
+def serialize_graph(graph, columnar: bool = False, compress: bool = False) -> bytes:
+    """
+    Serialize a graph payload to JSON bytes, optionally columnar and gzip-compressed.
+    """
+    payload = encode_columnar(graph) if columnar else graph
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if compress:
+        body = gzip.compress(body, compresslevel=5)
+    return body
+
+
+def build_graph_payload(nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data,
+                        columnar: bool = False, compress: bool = False, extra=None, positions=None):
+    """
+    Finalize the graph and serialize it in the same job, so the full graph
+    never travels back to the event loop.
+
+    :param extra: Additional top-level fields for the response.
+    :param positions: Precomputed layout, node id -> (x, y), added to the nodes as layout_x/layout_y.
+    :return: (body, counts) where counts holds the size of each graph section.
+    """
+    graph = finalize_graph(nodes, links, semi_weak_links, weak_links, global_discovered, nodes_full_data)
+    if positions:
+        for node in graph["nodes"]:
+            position = positions.get(node["id"])
+            if position is not None:
+                node["layout_x"], node["layout_y"] = position
+    graph.update(extra or {})
+    counts = {key: len(value) for key, value in graph.items() if isinstance(value, list)}
+    return serialize_graph(graph, columnar, compress), counts
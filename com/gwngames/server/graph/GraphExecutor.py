@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+
+class GraphExecutorBusy(Exception):
+    pass
+
+
+class GraphJobTimeout(Exception):
+    pass
+
+
+class GraphExecutor:
+    """
+    Runs CPU-bound graph jobs in a dedicated process pool, so the event loop
+    only awaits DB I/O and job results. The number of in-flight jobs is bounded:
+    once the queue is full new jobs are refused instead of piling up.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            self.logger = logging.getLogger('GraphExecutor')
+            self._executor: Optional[ProcessPoolExecutor] = None
+            self._pending: int = 0
+            self._pending_lock = threading.Lock()
+            self.max_queue: int = 0
+            self.timeout: float = 0
+
+    def start(self, max_workers: int, max_queue: int, timeout: float):
+        """
+        Create the process pool.
+
+        :param max_workers: Number of worker processes.
+        :param max_queue: Maximum number of jobs running or waiting for a worker.
+        :param timeout: Seconds a request waits for a single job.
+        """
+        # spawn: the server process holds threads and sockets that must not be forked
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.logger.info(f"Graph executor started: workers={max_workers}, queue={max_queue}, timeout={timeout}s")
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.logger.info("Graph executor stopped.")
+
+    def _release(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) in the pool and await its result.
+
+        :raises GraphExecutorBusy: If the queue is full.
+        :raises GraphJobTimeout: If the job does not complete within the timeout.
+        """
+        if self._executor is None:
+            raise RuntimeError("Graph executor has not been started. Call start first.")
+
+        with self._pending_lock:
+            if self._pending >= self.max_queue:
+                raise GraphExecutorBusy(f"Graph executor queue is full ({self.max_queue} jobs)")
+            self._pending += 1
+
+        # The slot is released when the job really ends, not when the caller gives up on it
+        job = self._executor.submit(fn, *args)
+        job.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError:
+            job.cancel()
+            raise GraphJobTimeout(f"Graph job {fn.__name__} timed out after {self.timeout}s")
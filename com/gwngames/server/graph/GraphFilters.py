@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+from com.gwngames.server.graph.GraphAssembler import CONF_RANKS, JOURNAL_RANKS
+
+UNRANKED = "Unranked"
+
+
+class GraphFilters:
+    """
+    Year window and rank set requested for a network.
+    Values are validated here, so the SQL conditions can be inlined like the other VALUES joins.
+    """
+
+    def __init__(self, conference_rank: Optional[str] = None, journal_rank: Optional[str] = None,
+                 from_year: Optional[int] = None, to_year: Optional[int] = None):
+        if conference_rank not in (None, UNRANKED) and conference_rank not in CONF_RANKS:
+            raise ValueError(f"Unknown conference rank: {conference_rank}")
+        if journal_rank not in (None, UNRANKED) and journal_rank not in JOURNAL_RANKS:
+            raise ValueError(f"Unknown journal rank: {journal_rank}")
+        self.conference_rank = conference_rank
+        self.journal_rank = journal_rank
+        self.from_year = from_year
+        self.to_year = to_year
+
+    @staticmethod
+    def from_request(data) -> "GraphFilters":
+        """
+        Read the filters of a graph request, empty strings meaning "Any".
+        """
+        def read_int(key):
+            value = data.get(key)
+            return int(value) if value not in (None, "") else None
+
+        return GraphFilters(
+            conference_rank=data.get("conference_rank") or None,
+            journal_rank=data.get("journal_rank") or None,
+            from_year=read_int("from_year"),
+            to_year=read_int("to_year")
+        )
+
+    def is_empty(self) -> bool:
+        return not self.has_rank_filter() and self.from_year is None and self.to_year is None
+
+    def has_rank_filter(self) -> bool:
+        return self.conference_rank is not None or self.journal_rank is not None
+
+    def cache_key(self) -> tuple:
+        return self.conference_rank, self.journal_rank, self.from_year, self.to_year
+
+    def publication_conditions(self, publication_alias: str = "p", journal_alias: str = "j",
+                               conference_alias: str = "c") -> List[str]:
+        """
+        SQL conditions a shared publication must satisfy.
+        Rank conditions need the journal and conference tables joined (LEFT) under the given aliases.
+
+        :return: Conditions to be AND-ed, empty when there is no filter.
+        """
+        conditions = []
+        if self.from_year is not None:
+            conditions.append(f"{publication_alias}.publication_year >= {int(self.from_year)}")
+        if self.to_year is not None:
+            conditions.append(f"{publication_alias}.publication_year <= {int(self.to_year)}")
+
+        # Either requested rank is enough, as the client sums conference and journal counts
+        rank_conditions = []
+        for rank, column in ((self.conference_rank, f"{conference_alias}.rank"),
+                             (self.journal_rank, f"{journal_alias}.q_rank")):
+            if rank == UNRANKED:
+                rank_conditions.append(f"({conference_alias}.rank IS NULL AND {journal_alias}.q_rank IS NULL)")
+            elif rank is not None:
+                rank_conditions.append(f"{column} = '{rank}'")
+        if rank_conditions:
+            conditions.append("(" + " OR ".join(rank_conditions) + ")")
+
+        return conditions
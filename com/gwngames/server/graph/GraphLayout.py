@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+# Ideal link length in pixels, matches the client link distance
+LINK_DISTANCE = 100.0
+# Up to this many nodes repulsion is computed exactly, above it through the grid approximation
+EXACT_REPULSION_LIMIT = 500
+MAX_GRID_SIZE = 32
+# Nodes per chunk when computing exact repulsion, bounds the temporary arrays
+REPULSION_CHUNK = 1024
+GRAVITY = 0.05
+
+
+def _exact_repulsion(pos, k):
+    disp = np.zeros_like(pos)
+    for start in range(0, len(pos), REPULSION_CHUNK):
+        chunk = pos[start:start + REPULSION_CHUNK]
+        delta = chunk[:, None, :] - pos[None, :, :]
+        dist2 = np.maximum(np.einsum("ijk,ijk->ij", delta, delta), 0.01)
+        disp[start:start + REPULSION_CHUNK] = np.einsum("ijk,ij->ik", delta, k * k / dist2)
+    return disp
+
+
+def _grid_repulsion(pos, k):
+    """
+    Single-level Barnes-Hut: grid cells push each other through their centers of mass
+    and every node takes the push of its cell, plus the push of the rest of its own cell seen as one body.
+    """
+    n = len(pos)
+    grid_size = int(min(MAX_GRID_SIZE, max(4, math.sqrt(n / 4))))
+    low = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - low, 1e-6)
+    cell_xy = np.minimum((grid_size * (pos - low) / span).astype(np.int64), grid_size - 1)
+    cell = cell_xy[:, 0] * grid_size + cell_xy[:, 1]
+
+    cells = grid_size * grid_size
+    mass = np.bincount(cell, minlength=cells).astype(np.float64)
+    com = np.stack([
+        np.bincount(cell, weights=pos[:, 0], minlength=cells),
+        np.bincount(cell, weights=pos[:, 1], minlength=cells),
+    ], axis=1) / np.maximum(mass, 1)[:, None]
+
+    # Far field, cell to cell (empty cells have no mass, the own cell is excluded)
+    delta = com[:, None, :] - com[None, :, :]
+    dist2 = np.maximum(np.einsum("ijk,ijk->ij", delta, delta), 0.01)
+    weight = k * k * mass[None, :] / dist2
+    np.fill_diagonal(weight, 0)
+    disp = np.einsum("ijk,ij->ik", delta, weight)[cell]
+
+    # Near field: the rest of the own cell
+    own_mass = mass[cell] - 1
+    own_com = (com[cell] * mass[cell][:, None] - pos) / np.maximum(own_mass, 1)[:, None]
+    own_delta = pos - own_com
+    own_dist2 = np.maximum(np.einsum("ij,ij->i", own_delta, own_delta), 0.01)
+    disp += own_delta * (k * k * own_mass / own_dist2)[:, None]
+    return disp
+
+
+def compute_layout(node_ids, edges, iterations: int = 60, seed: int = 0):
+    """
+    Fruchterman-Reingold layout: links attract, all nodes repel each other,
+    with repulsion approximated on a grid for large networks.
+
+    :param node_ids: Ids of the nodes to place.
+    :param edges: (source_id, target_id) pairs, pairs with unknown ids are ignored.
+    :param iterations: Number of cooling steps.
+    :param seed: Seed of the initial random placement, so the same network gets the same layout.
+    :return: Map node id -> (x, y), centered on the origin.
+    """
+    n = len(node_ids)
+    if n == 0:
+        return {}
+
+    index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+    known = [(index[s], index[t]) for s, t in edges if s in index and t in index and s != t]
+    src = np.array([s for s, _ in known], dtype=np.int64)
+    dst = np.array([t for _, t in known], dtype=np.int64)
+
+    k = LINK_DISTANCE
+    radius = k * math.sqrt(n)
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-radius, radius, size=(n, 2))
+
+    repulsion = _exact_repulsion if n <= EXACT_REPULSION_LIMIT else _grid_repulsion
+    temperature = radius / 4
+    cooling = temperature / max(iterations, 1)
+
+    for _ in range(iterations):
+        disp = repulsion(pos, k)
+
+        if len(src):
+            delta = pos[src] - pos[dst]
+            dist = np.sqrt(np.maximum(np.einsum("ij,ij->i", delta, delta), 0.01))
+            pull = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] += np.bincount(dst, weights=pull[:, axis], minlength=n)
+                disp[:, axis] -= np.bincount(src, weights=pull[:, axis], minlength=n)
+
+        # Keep disconnected components close to the center
+        disp -= GRAVITY * pos
+
+        length = np.sqrt(np.maximum(np.einsum("ij,ij->i", disp, disp), 1e-9))
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature = max(temperature - cooling, 1.0)
+
+    pos -= pos.mean(axis=0)
+    return {node_id: (round(float(pos[idx, 0]), 1), round(float(pos[idx, 1]), 1)) for node_id, idx in index.items()}
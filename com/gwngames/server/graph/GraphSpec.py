@@ -0,0 +1,33 @@
+from typing import Any, Dict, Mapping
+
+from itsdangerous import URLSafeSerializer
+
+from com.gwngames.config.SigningKey import signing_key
+
+SPEC_SALT = "graph-spec"
+# Request fields that only change the encoding of a network, not its content
+ENCODING_FIELDS = ("format", "layout")
+
+
+def _serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(signing_key(), salt=SPEC_SALT)
+
+
+def sign_graph_spec(data: Mapping[str, Any]) -> str:
+    """
+    Signed token holding a graph request, so any worker can compute the same network again.
+    Equal requests give equal tokens.
+
+    :param data: Body of the /generate-graph request.
+    """
+    spec = {key: value for key, value in data.items() if key not in ENCODING_FIELDS}
+    return _serializer().dumps(dict(sorted(spec.items())))
+
+
+def load_graph_spec(token: str) -> Dict[str, Any]:
+    """
+    Verify a graph token and return the request it was signed from.
+
+    :raises BadSignature: If the token was not signed by this application.
+    """
+    return _serializer().loads(token)
@@ -0,0 +1,83 @@
+from typing import Awaitable, Callable, Dict, Iterable, List, Set
+
+
+async def find_shortest_paths(
+        source_id: int,
+        target_id: int,
+        fetch_neighbors: Callable[[List[int]], Awaitable[Dict[int, Iterable[int]]]],
+        max_length: int,
+        k: int
+) -> List[List[int]]:
+    """
+    Bidirectional, level-synchronous BFS over the co-author relation.
+    The smaller frontier is expanded at every step, so only a small part of the graph is fetched.
+
+    :param source_id: Author the paths start from.
+    :param target_id: Author the paths end at.
+    :param fetch_neighbors: Coroutine mapping a list of author ids to their neighbors.
+    :param max_length: Maximum number of links in a path.
+    :param k: Maximum number of paths returned.
+    :return: Up to k distinct shortest paths as lists of author ids, empty if none within max_length.
+    """
+    if source_id == target_id:
+        return [[source_id]]
+
+    # Parents and distance of every visited author, per side
+    parents = ({source_id: set()}, {target_id: set()})
+    distance = ({source_id: 0}, {target_id: 0})
+    frontiers = ({source_id}, {target_id})
+    depths = [0, 0]
+
+    while frontiers[0] and frontiers[1] and depths[0] + depths[1] < max_length:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        other = 1 - side
+
+        neighbors = await fetch_neighbors(list(frontiers[side]))
+        depths[side] += 1
+
+        next_frontier: Set[int] = set()
+        for author_id in frontiers[side]:
+            for neighbor_id in neighbors.get(author_id, ()):
+                if neighbor_id in distance[side] and neighbor_id not in next_frontier:
+                    continue
+                # Every author of the previous level leading here is a parent, to keep all shortest paths
+                parents[side].setdefault(neighbor_id, set()).add(author_id)
+                distance[side][neighbor_id] = depths[side]
+                next_frontier.add(neighbor_id)
+        frontiers[side].clear()
+        frontiers[side].update(next_frontier)
+
+        meeting = [author_id for author_id in next_frontier if author_id in distance[other]]
+        if meeting:
+            best = min(distance[other][author_id] for author_id in meeting)
+            meeting = [author_id for author_id in meeting if distance[other][author_id] == best]
+            return _join_paths(meeting, parents[0], parents[1], source_id, target_id, k)
+
+    return []
+
+
+def _walk_to_root(author_id, parents, root_id, limit):
+    """
+    All paths from author_id back to root_id following the parent sets, at most limit of them.
+    """
+    if author_id == root_id:
+        return [[author_id]]
+    paths = []
+    for parent_id in sorted(parents.get(author_id, ())):
+        for path in _walk_to_root(parent_id, parents, root_id, limit - len(paths)):
+            paths.append(path + [author_id])
+            if len(paths) >= limit:
+                return paths
+    return paths
+
+
+def _join_paths(meeting, forward_parents, backward_parents, source_id, target_id, k):
+    paths = []
+    for author_id in sorted(meeting):
+        for head in _walk_to_root(author_id, forward_parents, source_id, k):
+            for tail in _walk_to_root(author_id, backward_parents, target_id, k):
+                # head ends with the meeting author, tail (reversed) starts with it
+                paths.append(head + list(reversed(tail))[1:])
+                if len(paths) >= k:
+                    return paths
+    return paths
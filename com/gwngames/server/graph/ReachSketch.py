@@ -0,0 +1,96 @@
+
+import numpy as np
+
+# 2^7 registers per sketch: 128 bytes per author and hop, about 9% standard error
+PRECISION = 7
+REGISTERS = 1 << PRECISION
+# Edges gathered at once when propagating, bounds the temporary register block
+EDGE_CHUNK = 200_000
+
+_HASH_BITS = 64 - PRECISION
+
+
+def _hash(ids):
+    """
+    splitmix64 finalizer, spreads consecutive author ids over the 64 bit space.
+    """
+    with np.errstate(over="ignore"):
+        x = np.asarray(ids, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def seed_registers(author_ids):
+    """
+    One HyperLogLog sketch per author, holding only the author itself.
+
+    :return: (n, REGISTERS) uint8 array.
+    """
+    hashed = _hash(author_ids)
+    bucket = (hashed >> np.uint64(_HASH_BITS)).astype(np.int64)
+    rest = hashed & np.uint64((1 << _HASH_BITS) - 1)
+    # Rank = position of the leftmost 1 bit in the remaining bits
+    _, exponent = np.frexp(rest.astype(np.float64))
+    rank = np.where(rest == 0, _HASH_BITS + 1, _HASH_BITS - exponent + 1).astype(np.uint8)
+
+    registers = np.zeros((len(author_ids), REGISTERS), dtype=np.uint8)
+    registers[np.arange(len(author_ids)), bucket] = rank
+    return registers
+
+
+def build_sketches(sources, targets, max_hops: int):
+    """
+    Reach sketches of every author: the sketch at hop h holds all authors reachable in at most h steps
+    following sources -> targets, as the network BFS does. Every hop takes the register-wise maximum
+    of the previous hop sketches of the neighbors.
+
+    :return: (author_ids, sketches) where sketches[h - 1] is the (n, REGISTERS) array for hop h.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    author_ids, index = np.unique(np.concatenate([sources, targets]), return_inverse=True)
+    src = index[:len(sources)]
+    dst = index[len(sources):]
+
+    order = np.argsort(src, kind="stable")
+    src, dst = src[order], dst[order]
+
+    previous = seed_registers(author_ids)
+    sketches = []
+    for _ in range(max_hops):
+        current = previous.copy()
+        for start in range(0, len(src), EDGE_CHUNK):
+            chunk_src = src[start:start + EDGE_CHUNK]
+            chunk_dst = dst[start:start + EDGE_CHUNK]
+            # Edges are sorted by source: reduce each run of equal sources in one go
+            run_starts = np.flatnonzero(np.r_[True, chunk_src[1:] != chunk_src[:-1]])
+            reduced = np.maximum.reduceat(previous[chunk_dst], run_starts, axis=0)
+            run_src = chunk_src[run_starts]
+            current[run_src] = np.maximum(current[run_src], reduced)
+        sketches.append(current)
+        previous = current
+    return author_ids, sketches
+
+
+def merge(sketches):
+    """
+    Union of several sketches given as bytes, as registers array.
+    """
+    registers = np.zeros(REGISTERS, dtype=np.uint8)
+    for sketch in sketches:
+        np.maximum(registers, np.frombuffer(sketch, dtype=np.uint8), out=registers)
+    return registers
+
+
+def estimate(registers) -> int:
+    """
+    HyperLogLog cardinality estimate, with the small range correction.
+    """
+    registers = np.asarray(registers, dtype=np.float64)
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    raw = alpha * REGISTERS * REGISTERS / np.sum(np.power(2.0, -registers))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * REGISTERS and zeros:
+        return int(round(REGISTERS * np.log(REGISTERS / zeros)))
+    return int(round(raw))
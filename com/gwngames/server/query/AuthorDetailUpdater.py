@@ -0,0 +1,45 @@
+import logging
+
+from psycopg.rows import tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger("AuthorDetailUpdater")
+
+# Oldest stale authors, skipping the ones another worker is draining
+DEQUEUE_QUERY = """
+    DELETE FROM author_detail_dirty
+    WHERE author_id IN (
+        SELECT author_id FROM author_detail_dirty
+        ORDER BY queued_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING author_id;
+"""
+
+REFRESH_QUERY = "SELECT refresh_author_detail_documents(%s);"
+
+
+async def drain_author_detail_queue(pool: AsyncConnectionPool, batch_size: int):
+    """
+    Rebuild the detail documents of the authors queued by the author_detail_document triggers.
+    Each batch is dequeued and refreshed in one transaction, a failed batch stays queued.
+    """
+    logger.info("Starting the author detail document refresh...")
+    refreshed = 0
+    try:
+        while True:
+            async with pool.connection() as conn:
+                async with conn.transaction():
+                    async with conn.cursor(row_factory=tuple_row) as cur:
+                        await cur.execute(DEQUEUE_QUERY, (batch_size,))
+                        author_ids = [row[0] for row in await cur.fetchall()]
+                        if not author_ids:
+                            break
+                        await cur.execute(REFRESH_QUERY, (author_ids,))
+                        refreshed += len(author_ids)
+
+        logger.info(f"Author detail documents refreshed: {refreshed} authors.")
+
+    except Exception as e:
+        logger.error(f"Error during author detail document refresh after {refreshed} authors: {e}")
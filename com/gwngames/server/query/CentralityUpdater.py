@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+
+import numpy as np
+from psycopg.rows import tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+from com.gwngames.server.graph.Centrality import compute_centrality, changed_rows
+
+logger = logging.getLogger("CentralityUpdater")
+
+# Table and indexes, the researchers overview, the graph links and the author suggestions join it
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "sql", "author_centrality.sql")
+
+# Co-author links weighted by shared publications, at least 1 as the link itself is known.
+# Shared publications are counted once per pair, then joined to the links
+EDGES_QUERY = """
+    SELECT
+        aco.author_id,
+        aco.coauthor_id,
+        COALESCE(sp.shared, 1) AS shared
+    FROM author_coauthor aco
+    LEFT JOIN (
+        SELECT pa1.author_id, pa2.author_id AS coauthor_id, COUNT(*) AS shared
+        FROM publication_author pa1
+        JOIN publication_author pa2
+            ON pa2.publication_id = pa1.publication_id AND pa2.author_id <> pa1.author_id
+        GROUP BY pa1.author_id, pa2.author_id
+    ) sp ON sp.author_id = aco.author_id AND sp.coauthor_id = aco.coauthor_id;
+"""
+
+STORED_QUERY = "SELECT author_id, degree, weighted_degree, pagerank FROM author_centrality;"
+
+UPSERT_QUERY = """
+    INSERT INTO author_centrality (author_id, degree, weighted_degree, pagerank, update_date)
+    VALUES (%s, %s, %s, %s, now())
+    ON CONFLICT (author_id) DO UPDATE
+    SET degree = EXCLUDED.degree,
+        weighted_degree = EXCLUDED.weighted_degree,
+        pagerank = EXCLUDED.pagerank,
+        update_date = EXCLUDED.update_date;
+"""
+
+DELETE_QUERY = "DELETE FROM author_centrality WHERE author_id = ANY(%s);"
+
+
+async def ensure_centrality_table(pool: AsyncConnectionPool):
+    """
+    Apply author_centrality.sql, it only creates what is missing. Until the first update the table is empty
+    and the queries joining it see a centrality of 0.
+    """
+    try:
+        with open(SCHEMA_FILE) as schema_file:
+            script = schema_file.read()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(script)
+        logger.info("Author centrality table ready.")
+    except Exception as e:
+        logger.error(f"Could not apply {os.path.basename(SCHEMA_FILE)}, apply it by hand: {e}")
+
+
+def _centrality_rows(edges, stored):
+    """
+    Centrality of the authors of some co-author links, compared with the stored scores.
+
+    :param edges: (author_id, coauthor_id, shared) rows.
+    :param stored: Map author id -> (degree, weighted_degree, pagerank) currently in the table.
+    :return: (author_ids, rows to write, author ids to remove, PageRank iterations).
+    """
+    if edges:
+        edge_array = np.array(edges, dtype=np.int64)
+        sources, targets, weights = edge_array[:, 0], edge_array[:, 1], edge_array[:, 2]
+    else:
+        sources = targets = weights = np.zeros(0, dtype=np.int64)
+
+    author_ids, degree, weighted_degree, pagerank, iterations = compute_centrality(
+        sources, targets, weights, {author_id: row[2] for author_id, row in stored.items()}
+    )
+    rows = changed_rows(author_ids, degree, weighted_degree, pagerank, stored)
+    current = set(author_ids.tolist())
+    removed = [author_id for author_id in stored if author_id not in current]
+    return author_ids, rows, removed, iterations
+
+
+async def update_author_centrality(pool: AsyncConnectionPool):
+    """
+    Recompute degree, weighted degree and PageRank of every author and store them in author_centrality.
+    PageRank starts from the stored scores and only the rows that changed are written.
+    """
+    logger.info("Starting the author centrality update...")
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cur:
+                await cur.execute(EDGES_QUERY)
+                edges = await cur.fetchall()
+                await cur.execute(STORED_QUERY)
+                stored = {row[0]: (row[1], row[2], row[3]) for row in await cur.fetchall()}
+
+        # Array building, the power iteration and the diff are pure Python/NumPy, keep them off the event loop
+        author_ids, rows, removed, iterations = await asyncio.to_thread(_centrality_rows, edges, stored)
+
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    if rows:
+                        await cur.executemany(UPSERT_QUERY, rows)
+                    if removed:
+                        await cur.execute(DELETE_QUERY, (removed,))
+
+        logger.info(f"Author centrality updated: {len(author_ids)} authors, {iterations} PageRank iterations, "
+                    f"{len(rows)} rows written, {len(removed)} removed.")
+
+    except Exception as e:
+        logger.error(f"Error during author centrality update: {e}")
@@ -1,7 +1,9 @@
 import hashlib
 import logging
 import re
-from typing import Any, Dict, List, Optional, Union, Tuple
+import uuid
+from copy import copy
+from typing import Any, AsyncIterator, Dict, List, Optional, Union, Tuple
 
 import cachetools
 from psycopg_pool import AsyncConnectionPool
@@ -16,6 +18,8 @@ class QueryBuilder:
 
     # Global cache shared across all QueryBuilder instances
     global_cache: cachetools.LRUCache = cachetools.LRUCache(maxsize=1000)
+    # Pages up to this size compute their aggregate joins per row, larger results in one pass, see join_aggregate
+    LATERAL_PAGE_MAX: int = 1000
 
     def __init__(
             self,
@@ -38,6 +42,8 @@ class QueryBuilder:
         self.parameters: Dict[str, Any] = {}
         self.order_by_clauses: List[str] = []
         self.join_clause: str = ""
+        # The joins of join_clause one by one, so build_count_query can leave some out
+        self.joins: List[Dict[str, Any]] = []
         self.custom_select: str = alias  # default: "SELECT alias" => all columns from alias
         self.limit_value: Optional[int] = None
         self.offset_value: Optional[int] = None
@@ -49,6 +55,14 @@ class QueryBuilder:
 
         # List (or dict) to hold CTE definitions
         self.ctes: List[Dict[str, Any]] = []
+        # Id column of the base CTE when conditions may be pushed into it, see set_base_cte
+        self.base_cte_key: Optional[str] = None
+        # Per row aggregates, see join_aggregate
+        self.aggregate_joins: List[Dict[str, Any]] = []
+        # Typed expressions the output columns sort on, see add_sort_key
+        self.sort_keys: Dict[str, Dict[str, str]] = {}
+        # Output column names once described, see output_columns
+        self.output_column_names: Optional[List[str]] = None
 
     def _next_param_name(self, base: str) -> str:
         """Generate a unique parameter name."""
@@ -86,6 +100,16 @@ class QueryBuilder:
 
         return self
 
+    def add_parameter(self, base: str, value: Any) -> str:
+        """
+        Register a bound parameter for a custom condition.
+
+        :return: The placeholder to write in the condition, e.g. ":abc0".
+        """
+        param_name = self._next_param_name(base)
+        self.parameters[param_name] = value
+        return f":{param_name}"
+
     def and_condition(self, parameter: str, value: Any, operator: str = "=", custom: bool = False,
                       is_case_sensitive: bool = True) -> "QueryBuilder":
         return self.add_condition(operator, parameter, value, custom, "AND", is_case_sensitive)
@@ -102,9 +126,12 @@ class QueryBuilder:
             on_condition: Optional[str] = None,
             this_field: Optional[str] = None,
             other_field: Optional[str] = None,
+            unique: bool = False,
     ) -> "QueryBuilder":
         """
         Add a JOIN clause to the query.
+
+        :param unique: The join matches at most one row (e.g. on a primary key), a LEFT join then keeps the row count.
         """
         if isinstance(other, QueryBuilder):
             table_name = other.table_name
@@ -112,14 +139,22 @@ class QueryBuilder:
             table_name = other
 
         if on_condition:
-            self.join_clause += f" {join_type.upper()} JOIN {table_name} {join_alias} ON {on_condition}"
+            join_sql = f" {join_type.upper()} JOIN {table_name} {join_alias} ON {on_condition}"
         elif this_field and other_field:
-            self.join_clause += (
+            join_sql = (
                 f" {join_type.upper()} JOIN {table_name} {join_alias} "
                 f"ON {self.alias}.{this_field} = {join_alias}.{other_field}"
             )
         else:
             raise ValueError("Either 'on_condition' or both 'this_field' and 'other_field' must be provided.")
+
+        self.join_clause += join_sql
+        self.joins.append({
+            "join_type": join_type.upper(),
+            "join_alias": join_alias.split("(")[0],
+            "sql": join_sql,
+            "unique": unique
+        })
         return self
 
     def group_by(self, *fields: str) -> "QueryBuilder":
@@ -130,6 +165,18 @@ class QueryBuilder:
         self.order_by_clauses.append(f"{field} {'ASC' if ascending else 'DESC'}")
         return self
 
+    def add_sort_key(self, column: str, expression: str, condition: Optional[str] = None) -> "QueryBuilder":
+        """
+        Declare the typed expression an output column sorts on, so the query is ordered by it directly
+        instead of by the output column of a wrapping query, and an index on the expression can serve the order.
+
+        :param column: Output column, as named in the select.
+        :param expression: Expression over the query aliases sorting like the column, e.g. "ab.id" for '' || ab.id.
+        :param condition: Condition keeping the rows with a value in the column, "expression IS NOT NULL" by default.
+        """
+        self.sort_keys[column] = {"expression": expression, "condition": condition or f"{expression} IS NOT NULL"}
+        return self
+
     def add_having_condition(
             self,
             operator: str,
@@ -292,41 +339,27 @@ class QueryBuilder:
     def with_cte(
             self,
             cte_name: str,
-            subquery: Union[str, "QueryBuilder"]
+            subquery: Union[str, "QueryBuilder"],
+            key_column: Optional[str] = None
     ) -> "QueryBuilder":
         """
         Add a CTE (Common Table Expression) to the query.
+        A QueryBuilder subquery is kept as is and rendered with the query, so conditions can still be pushed into it.
 
         :param cte_name: The name of the CTE (e.g. "my_cte").
         :param subquery: Either a raw SQL string or another QueryBuilder instance.
+        :param key_column: Column of the subquery holding the base entity id (e.g. "pa.author_id").
+                           When the base CTE is restricted, see set_base_cte, this CTE is restricted to its ids.
         """
         if isinstance(subquery, QueryBuilder):
-            # 1. Build the subquery
-            subquery_sql = subquery.build_query_string()
-            # 2. Convert to psycopg placeholders
-            subquery_sql_converted, subquery_params = subquery._convert_params_for_psycopg(subquery_sql)
-
-            # 3. Rename subquery parameters to avoid collisions
-            new_params = {}
-            for k, v in subquery_params.items():
-                new_key = f"{cte_name}_{k}"
-                new_params[new_key] = v
-
-            # 4. Replace placeholders in the subquery SQL
-            temp_sql = subquery_sql_converted
-            for old_key, _ in subquery_params.items():
-                old_placeholder = f"%({old_key})s"
-                new_placeholder = f"%({cte_name}_{old_key})s"
-                temp_sql = temp_sql.replace(old_placeholder, new_placeholder)
-
-            # 5. Store the final CTE definition
+            subquery = subquery._with_prefixed_parameters(f"{cte_name}_")
             self.ctes.append({
                 "cte_name": cte_name,
-                "sql": temp_sql
+                "builder": subquery,
+                "key_column": key_column
             })
-
-            # 6. Merge the parameters
-            self.parameters.update(new_params)
+            # The subquery parameters travel with this query
+            self._merge_parameters(subquery.parameters)
 
         else:
             # subquery is a raw SQL string
@@ -337,28 +370,242 @@ class QueryBuilder:
 
         return self
 
+    def _with_prefixed_parameters(self, prefix: str) -> "QueryBuilder":
+        """
+        Clone of this query whose parameters, and the ones of its subqueries, are renamed to prefix + name.
+        Names are only unique per builder, every counter starts at 0, while generated names never hold
+        an underscore: a subquery merged under a prefixed name cannot collide with this query parameters.
+        """
+        names = set(self.parameters)
+        # Every renamed field gets a new value, a shallow copy leaves this query untouched
+        cloned = copy(self)
+        if not names:
+            return cloned
+        pattern = re.compile(r':([A-Za-z0-9_]+)')
+
+        def rename(text: str) -> str:
+            return pattern.sub(lambda m: f":{prefix}{m.group(1)}" if m.group(1) in names else m.group(0), text)
+
+        cloned.table_name = rename(cloned.table_name)
+        cloned.custom_select = rename(cloned.custom_select)
+        cloned.conditions = [rename(condition) for condition in cloned.conditions]
+        cloned.having_conditions = [rename(condition) for condition in cloned.having_conditions]
+        cloned.order_by_clauses = [rename(clause) for clause in cloned.order_by_clauses]
+        cloned.join_clause = rename(cloned.join_clause)
+        cloned.joins = [{**join_def, "sql": rename(join_def["sql"])} for join_def in cloned.joins]
+        cloned.sort_keys = {column: {key: rename(value) for key, value in sort_key.items()}
+                            for column, sort_key in cloned.sort_keys.items()}
+        cloned.ctes = [
+            {**cte_def, "builder": cte_def["builder"]._with_prefixed_parameters(prefix)} if "builder" in cte_def
+            else {**cte_def, "sql": rename(cte_def["sql"])}
+            for cte_def in cloned.ctes
+        ]
+        cloned.aggregate_joins = [{**agg, "builder": agg["builder"]._with_prefixed_parameters(prefix)}
+                                  for agg in cloned.aggregate_joins]
+        cloned.parameters = {f"{prefix}{name}": value for name, value in cloned.parameters.items()}
+        return cloned
+
+    def _merge_parameters(self, parameters: Dict[str, Any]) -> None:
+        """
+        Add the parameters of a subquery to this query.
+
+        :raises ValueError: If a name is already bound to another value, the query would run with the wrong one.
+        """
+        for name, value in parameters.items():
+            if name in self.parameters and self.parameters[name] != value:
+                raise ValueError(f"Parameter {name} is already bound to another value")
+        self.parameters.update(parameters)
+
+    def set_base_cte(self, key_column: str) -> "QueryBuilder":
+        """
+        Declare that this query reads from the CTE named as its table, holding one row per base entity.
+        When the query is built, the AND conditions only referencing this query alias are evaluated inside
+        that CTE, and the CTEs declared with a key_column only aggregate the ids the base CTE keeps.
+
+        :param key_column: Id column of the base CTE (e.g. "id").
+        """
+        self.base_cte_key = key_column
+        return self
+
+    def _pushable_conditions(self) -> Tuple[List[str], List[str]]:
+        """
+        Split the WHERE conditions into (kept, pushed): pushed ones only reference this query alias
+        and can be evaluated inside the base CTE.
+        """
+        if self.base_cte_key is None or any(condition.startswith("OR ") for condition in self.conditions):
+            return self.conditions, []
+
+        kept, pushed = [], []
+        for condition in self.conditions:
+            body = condition[4:] if condition.startswith("AND ") else condition
+            # Literals may contain dots, they do not reference tables
+            aliases = set(re.findall(r'\b([A-Za-z_]\w*)\.[A-Za-z_"]', re.sub(r"'[^']*'", "''", body)))
+            if aliases == {self.alias}:
+                pushed.append(body)
+            else:
+                kept.append(body)
+        kept = [condition if idx == 0 else f"AND {condition}" for idx, condition in enumerate(kept)]
+        return kept, pushed
+
+    def join_aggregate(
+            self,
+            cte_name: str,
+            subquery: "QueryBuilder",
+            join_alias: str,
+            key_column: str,
+            this_field: str
+    ) -> "QueryBuilder":
+        """
+        LEFT JOIN an aggregate grouped by key_column, holding at most one row per row of this query.
+
+        A limited query of at most LATERAL_PAGE_MAX rows whose conditions and order do not use the aggregate
+        selects its page first, then computes the aggregate with LEFT JOIN LATERAL for the rows of the page only.
+        Otherwise the aggregate is computed once for all rows as the CTE cte_name, see with_cte.
+        The other joins must keep one row per row of this query, they are repeated around the page.
+
+        :param cte_name: Name of the CTE when the aggregate is computed in one pass.
+        :param subquery: The aggregate, grouped by key_column.
+        :param join_alias: Alias of the aggregate in the query.
+        :param key_column: Column of the subquery matching this_field (e.g. "ai.author_id").
+        :param this_field: Column of this query alias the aggregate belongs to (e.g. "id").
+        """
+        subquery = subquery._with_prefixed_parameters(f"{cte_name}_")
+        self.aggregate_joins.append({
+            "cte_name": cte_name,
+            "builder": subquery,
+            "join_alias": join_alias,
+            "key_column": key_column,
+            "this_field": this_field
+        })
+        self._merge_parameters(subquery.parameters)
+        return self
+
+    def _pages_first(self) -> bool:
+        """
+        Whether the page can be selected before computing the aggregate joins.
+        """
+        if not self.aggregate_joins or self.limit_value is None or self.limit_value > self.LATERAL_PAGE_MAX:
+            return False
+        if self.group_by_fields or self.having_conditions:
+            return False
+        # Output columns are only known once the aggregates are joined
+        if any(clause.lstrip().startswith('"') for clause in self.order_by_clauses):
+            return False
+        aggregate_aliases = "|".join(re.escape(agg["join_alias"]) for agg in self.aggregate_joins)
+        return not re.search(rf"\b({aggregate_aliases})\.", " ".join(self.conditions + self.order_by_clauses))
+
+    def _render_aggregate_joins(self, lateral: bool) -> str:
+        joins = ""
+        for agg in self.aggregate_joins:
+            if lateral:
+                builder = copy(agg["builder"])
+                condition = f"{agg['key_column']} = {self.alias}.{agg['this_field']}"
+                builder.conditions = list(builder.conditions) + [f"AND {condition}" if builder.conditions else condition]
+                joins += f" LEFT JOIN LATERAL ({builder.build_query_string()}) {agg['join_alias']} ON TRUE"
+            else:
+                key_name = agg["key_column"].split(".")[-1]
+                joins += (f" LEFT JOIN {agg['cte_name']} {agg['join_alias']} "
+                          f"ON {self.alias}.{agg['this_field']} = {agg['join_alias']}.{key_name}")
+        return joins
+
+    def _render_ctes(self, ctes: List[Dict[str, Any]], pushed: List[str]) -> str:
+        base = next((cte for cte in ctes if cte["cte_name"] == self.table_name and "builder" in cte), None)
+        restricted = base is not None and (pushed or base["builder"].conditions)
+
+        cte_statements = []
+        for cte_def in ctes:
+            if "builder" not in cte_def:
+                cte_statements.append(f"{cte_def['cte_name']} AS ( {cte_def['sql']} )")
+                continue
+
+            builder = copy(cte_def["builder"])
+            builder.conditions = list(builder.conditions)
+            if cte_def is base:
+                for condition in pushed:
+                    # The CTE selects the columns under their own names, only the alias changes
+                    condition = re.sub(rf"\b{re.escape(self.alias)}\.", f"{builder.alias}.", condition)
+                    builder.conditions.append(f"AND {condition}" if builder.conditions else condition)
+            elif restricted and cte_def.get("key_column"):
+                condition = f"{cte_def['key_column']} IN (SELECT {self.base_cte_key} FROM {self.table_name})"
+                builder.conditions.append(f"AND {condition}" if builder.conditions else condition)
+            cte_statements.append(f"{cte_def['cte_name']} AS ( {builder.build_query_string()} )")
+        return f"WITH {', '.join(cte_statements)} "
+
     def build_query_string(self) -> str:
         """
         Construct the full SQL query string, including any CTEs if present.
         """
-        # Build the WITH clause if we have CTEs
-        with_clause = ""
-        if self.ctes:
-            cte_statements = []
-            for cte_def in self.ctes:
-                cte_statements.append(f"{cte_def['cte_name']} AS ( {cte_def['sql']} )")
-            with_clause = f"WITH {', '.join(cte_statements)} "
+        conditions, pushed = self._pushable_conditions()
+        lateral = self._pages_first()
+
+        # Build the WITH clause if we have CTEs, aggregates computed in one pass are CTEs too
+        ctes = self.ctes if lateral else self.ctes + self.aggregate_joins
+        with_clause = self._render_ctes(ctes, pushed) if ctes else ""
 
         base_query = f"SELECT {self.custom_select} FROM {self.table_name} {self.alias}"
+        aggregate_joins = self._render_aggregate_joins(lateral)
 
-        where_clause = f" WHERE {' '.join(self.conditions)}" if self.conditions else ""
+        where_clause = f" WHERE {' '.join(conditions)}" if conditions else ""
         group_by_clause = f" GROUP BY {', '.join(self.group_by_fields)}" if self.group_by_fields else ""
         having_clause = f" HAVING {' '.join(self.having_conditions)}" if self.having_conditions else ""
         order_by_clause = f" ORDER BY {', '.join(self.order_by_clauses)}" if self.order_by_clauses else ""
         limit_clause = f" LIMIT {self.limit_value}" if self.limit_value is not None else ""
         offset_clause = f" OFFSET {self.offset_value}" if self.offset_value is not None else ""
 
-        return with_clause + base_query + self.join_clause + where_clause + group_by_clause + having_clause + order_by_clause + limit_clause + offset_clause
+        if lateral:
+            # Page on the base rows, then join the aggregates of that page only
+            page_query = (f"SELECT {self.alias}.* FROM {self.table_name} {self.alias}" + self.join_clause
+                          + where_clause + order_by_clause + limit_clause + offset_clause)
+            return (with_clause + f"SELECT {self.custom_select} FROM ({page_query}) {self.alias}"
+                    + self.join_clause + aggregate_joins + order_by_clause)
+
+        return with_clause + base_query + self.join_clause + aggregate_joins + where_clause + group_by_clause + having_clause + order_by_clause + limit_clause + offset_clause
+
+    def build_count_query(self) -> "QueryBuilder":
+        """
+        A query counting the rows of this one, executing to [{"count": n}].
+        Select expressions, order, paging, the unique LEFT joins and aggregates no condition references
+        and the CTEs nothing references anymore are left out. Grouped or DISTINCT queries are counted as a subquery.
+        """
+        if self.group_by_fields or self.having_conditions or self.custom_select.lstrip().upper().startswith("DISTINCT"):
+            grouped = self.clone(no_offset=True, no_limit=True)
+            grouped.order_by_clauses = []
+            count_query = QueryBuilder(self.pool, f"({grouped.build_query_string()})", "count", self.cache_results)
+            count_query.parameters = grouped.parameters
+            return count_query.select("COUNT(*) AS count")
+
+        count_query = self.clone(no_offset=True, no_limit=True)
+        count_query.cache_results = self.cache_results
+        count_query.order_by_clauses = []
+        count_query.select("COUNT(*) AS count")
+
+        def referenced(alias: str, text: str) -> bool:
+            return re.search(rf"\b{re.escape(alias)}\.", text) is not None
+
+        conditions = " ".join(count_query.conditions)
+        count_query.aggregate_joins = [
+            agg for agg in count_query.aggregate_joins if referenced(agg["join_alias"], conditions)
+        ]
+
+        # Later joins may only reference earlier ones, walking backwards sees every use of a join
+        kept_joins = []
+        for join_def in reversed(count_query.joins):
+            used = conditions + " ".join(kept["sql"] for kept in kept_joins)
+            if join_def["join_type"] != "LEFT" or not join_def["unique"] or referenced(join_def["join_alias"], used):
+                kept_joins.insert(0, join_def)
+        count_query.joins = kept_joins
+        count_query.join_clause = "".join(join_def["sql"] for join_def in kept_joins)
+
+        # Likewise later CTEs may only reference earlier ones
+        used = " ".join([count_query.table_name, count_query.join_clause, conditions]
+                        + [agg["builder"].build_query_string() for agg in count_query.aggregate_joins])
+        kept_ctes = []
+        for cte_def in reversed(count_query.ctes):
+            if re.search(rf"\b{re.escape(cte_def['cte_name'])}\b", used):
+                kept_ctes.insert(0, cte_def)
+                used += " " + (cte_def["builder"].build_query_string() if "builder" in cte_def else cte_def["sql"])
+        count_query.ctes = kept_ctes
+        return count_query
 
     async def execute(self) -> List[Dict[str, Any]]:
         """
@@ -387,6 +634,39 @@ class QueryBuilder:
             self.global_cache[cache_key] = result_set
         return result_set
 
+    async def output_columns(self) -> List[str]:
+        """
+        Names of the columns the query returns, described by the server without fetching any row.
+        They are kept on the builder and its clones, so a cached builder is described once.
+        """
+        if self.output_column_names is None:
+            converted_query, converted_params = self._convert_params_for_psycopg(self.build_query_string())
+            async with self.pool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(f"SELECT * FROM ({converted_query}) AS described LIMIT 0", converted_params)
+                    self.output_column_names = [column.name for column in cursor.description]
+        return self.output_column_names
+
+    async def stream(self, batch_size: int = 2000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the query with a server-side cursor, yielding rows as they are fetched.
+        Rows are neither buffered nor cached, so memory stays constant whatever the result size.
+
+        :param batch_size: Rows fetched from the server per round trip.
+        """
+        query_string = self.build_query_string()
+        converted_query, converted_params = self._convert_params_for_psycopg(query_string)
+
+        async with self.pool.connection() as conn:
+            # Named cursors only live inside a transaction, the pool connections are in autocommit
+            async with conn.transaction():
+                async with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                    cursor.itersize = batch_size
+                    logging.info(f"Streaming query: {converted_query}")
+                    await cursor.execute(converted_query, converted_params)
+                    async for row in cursor:
+                        yield dict(row)
+
     def clone(self, no_offset=False, no_limit=False) -> "QueryBuilder":
         """
         Create a deep copy of the current QueryBuilder instance, creating a new session for it.
@@ -404,13 +684,21 @@ class QueryBuilder:
         cloned_instance.parameters = deepcopy(self.parameters)
         cloned_instance.order_by_clauses = deepcopy(self.order_by_clauses)
         cloned_instance.join_clause = self.join_clause
+        cloned_instance.joins = [dict(join_def) for join_def in self.joins]
+        cloned_instance.sort_keys = deepcopy(self.sort_keys)
+        cloned_instance.output_column_names = self.output_column_names
         cloned_instance.custom_select = self.custom_select
         cloned_instance.group_by_fields = deepcopy(self.group_by_fields)
         cloned_instance.having_conditions = deepcopy(self.having_conditions)
         cloned_instance.param_counter = self.param_counter
 
-        # Copy CTEs
-        cloned_instance.ctes = deepcopy(self.ctes)
+        # Copy CTEs, their builders are cloned rather than deep copied with their pool
+        cloned_instance.ctes = [
+            {**cte_def, "builder": cte_def["builder"].clone()} if "builder" in cte_def else dict(cte_def)
+            for cte_def in self.ctes
+        ]
+        cloned_instance.base_cte_key = self.base_cte_key
+        cloned_instance.aggregate_joins = [{**agg, "builder": agg["builder"].clone()} for agg in self.aggregate_joins]
 
         cloned_instance.logger = self.logger
 
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+import numpy as np
+from psycopg.rows import tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+from com.gwngames.server.graph.ReachSketch import build_sketches
+
+logger = logging.getLogger("ReachSketchUpdater")
+
+# Same links the network BFS follows: both authors need a Google Scholar profile
+EDGES_QUERY = """
+    SELECT DISTINCT aco.author_id, aco.coauthor_id
+    FROM author_coauthor aco
+    JOIN google_scholar_author start_gs ON start_gs.author_key = aco.author_id
+    JOIN google_scholar_author end_gs ON end_gs.author_key = aco.coauthor_id;
+"""
+
+# Sketches per COPY write, each batch is encoded off the event loop
+COPY_BATCH = 10_000
+
+
+def _build_from_rows(edges, max_hops: int):
+    """
+    Sketches of the (author_id, coauthor_id) rows, see build_sketches.
+    """
+    edge_array = np.array(edges, dtype=np.int64)
+    return build_sketches(edge_array[:, 0], edge_array[:, 1], max_hops)
+
+
+def _encode_copy_rows(author_ids, hop: int, registers) -> bytes:
+    """
+    COPY text lines of a batch of sketches of one hop, the registers as hex bytea.
+    """
+    return "".join(
+        f"{author_id}\t{hop}\t\\\\x{row.tobytes().hex()}\n" for author_id, row in zip(author_ids, registers)
+    ).encode("ascii")
+
+
+async def update_reach_sketches(pool: AsyncConnectionPool, max_hops: int):
+    """
+    Rebuild the reach sketches of every author for hops 1..max_hops.
+    The table is replaced in one transaction, so estimates never see a partial rebuild.
+    """
+    logger.info("Starting the reach sketch update...")
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cur:
+                await cur.execute(EDGES_QUERY)
+                edges = await cur.fetchall()
+
+        if not edges:
+            logger.info("No co-author links, reach sketches left unchanged.")
+            return
+
+        # Array building and the sketch propagation are CPU bound, keep them off the event loop
+        author_ids, sketches = await asyncio.to_thread(_build_from_rows, edges, max_hops)
+        ids = author_ids.tolist()
+
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    await cur.execute("DELETE FROM author_reach_sketch;")
+                    async with cur.copy("COPY author_reach_sketch (author_id, hop, registers) FROM STDIN") as copy:
+                        for hop, registers in enumerate(sketches, start=1):
+                            for start in range(0, len(ids), COPY_BATCH):
+                                await copy.write(await asyncio.to_thread(
+                                    _encode_copy_rows, ids[start:start + COPY_BATCH], hop,
+                                    registers[start:start + COPY_BATCH]
+                                ))
+
+        logger.info(f"Reach sketches updated: {len(author_ids)} authors, {max_hops} hops.")
+
+    except Exception as e:
+        logger.error(f"Error during reach sketch update: {e}")
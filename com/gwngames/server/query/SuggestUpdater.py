@@ -0,0 +1,62 @@
+import asyncio
+import logging
+
+from psycopg.rows import tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+from com.gwngames.server.search.PrefixIndex import PrefixIndex
+from com.gwngames.server.search.SuggestIndex import SuggestIndex, AUTHORS_KIND, CONFERENCES_KIND, JOURNALS_KIND, \
+    INTERESTS_KIND
+
+logger = logging.getLogger("SuggestUpdater")
+
+# Every query returns (id, name, label, weight, searched texts), the weight ranks the suggestions
+SUGGEST_QUERIES = {
+    AUTHORS_KIND: """
+        SELECT a.id, to_camel_case(a.name), to_camel_case(a.name), COALESCE(ac.pagerank, 0), ARRAY[a.name]
+        FROM author a
+        LEFT JOIN author_centrality ac ON ac.author_id = a.id;
+    """,
+    CONFERENCES_KIND: """
+        SELECT c.id, COALESCE(c.acronym, c.title), COALESCE(c.acronym || ' - ', '') || COALESCE(c.title, ''),
+               COUNT(p.id), ARRAY[c.acronym, c.title]
+        FROM conference c
+        LEFT JOIN publication p ON p.conference_id = c.id
+        GROUP BY c.id, c.acronym, c.title;
+    """,
+    JOURNALS_KIND: """
+        SELECT j.id, to_camel_case(j.title), to_camel_case(j.title), COUNT(p.id), ARRAY[j.title]
+        FROM journal j
+        LEFT JOIN publication p ON p.journal_id = j.id
+        GROUP BY j.id, j.title;
+    """,
+    INTERESTS_KIND: """
+        SELECT i.id, to_camel_case(i.name), to_camel_case(i.name), COUNT(ai.author_id), ARRAY[i.name]
+        FROM interest i
+        LEFT JOIN author_interest ai ON ai.interest_id = i.id
+        GROUP BY i.id, i.name;
+    """,
+}
+
+
+async def update_suggest_indexes(pool: AsyncConnectionPool):
+    """
+    Rebuild the prefix index of every suggestion kind from the database.
+    A kind that fails keeps its previous index.
+    """
+    logger.info("Starting the suggestion index update...")
+    suggest_index = SuggestIndex()
+    for kind, query in SUGGEST_QUERIES.items():
+        try:
+            async with pool.connection() as conn:
+                async with conn.cursor(row_factory=tuple_row) as cur:
+                    await cur.execute(query)
+                    rows = await cur.fetchall()
+
+            # Sorting the keys is CPU bound, keep it off the event loop
+            index = await asyncio.to_thread(PrefixIndex, rows)
+            suggest_index.replace(kind, index)
+            logger.info(f"Suggestion index '{kind}' updated: {len(index)} items.")
+
+        except Exception as e:
+            logger.error(f"Error during suggestion index update of '{kind}': {e}")
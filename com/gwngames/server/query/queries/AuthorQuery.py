@@ -1,6 +1,8 @@
 from copy import deepcopy
+from typing import List, Optional
 
 from com.gwngames.server.entity.base.Author import Author
+from com.gwngames.server.entity.base.AuthorCentrality import AuthorCentrality
 from com.gwngames.server.entity.base.Conference import Conference
 from com.gwngames.server.entity.base.Interest import Interest
 from com.gwngames.server.entity.base.Journal import Journal
@@ -8,10 +10,17 @@ from com.gwngames.server.entity.base.Publication import Publication
 from com.gwngames.server.entity.base.Relationships import PublicationAuthor, AuthorInterest, AuthorCoauthor
 from com.gwngames.server.entity.variant.scholar.GoogleScholarAuthor import GoogleScholarAuthor
 from com.gwngames.server.entity.variant.scholar.GoogleScholarPublication import GoogleScholarPublication
+from com.gwngames.server.graph.GraphFilters import GraphFilters
 from com.gwngames.server.query.QueryBuilder import QueryBuilder
 
 
 class AuthorQuery:
+    # Fields of a researcher detail, in display order: the JSONB documents do not keep key order
+    DETAIL_FIELDS = [
+        "Author ID", "Name", "Organization", "Image url", "Homepage", "Scholar ID", "Scholar Profile", "Verified on",
+        "H Index", "I10 Index", "Interests", "Frequent Conf. Rank", "Frequent Journal Rank", "Avg. SJR Score",
+        "Total Cites", "Publications Found"
+    ]
 
     @staticmethod
     def build_author_query_with_filter(session, author_id: int):
@@ -121,13 +130,147 @@ class AuthorQuery:
         return author_query
 
     @staticmethod
-    def build_author_overview_query(session):
-        # CTE 1: author_base
+    def build_author_document_query(session, author_ids: List[int]):
+        """
+        Precomputed detail documents of some authors, see author_detail_document.sql.
+        Authors whose document is not built yet have no row. Results are not cached, documents are kept up to date.
+
+        :param author_ids: Validated author ids, inlined in the query.
+        """
+        document_qb = QueryBuilder(session, "author_detail_document", "ad", cache_results=False)
+        document_qb.and_condition("", AuthorQuery.author_ids_condition(author_ids, "ad.author_id"), custom=True)
+        document_qb.select("ad.author_id, ad.document")
+        return document_qb
+
+    @staticmethod
+    def build_author_details_query_batch(session, author_ids: List[int]):
+        """
+        Popup details of many authors in one set-based query, one row per author.
+        Publication counts, citations and rank modes are aggregated once per author, over their publications only.
+
+        :param author_ids: Validated author ids, inlined in the query.
+        """
+        # Publications found and rank modes
+        pub_stats_qb = (
+            QueryBuilder(session, PublicationAuthor.__tablename__, "pa")
+            .join("INNER", Publication.__tablename__, "p", on_condition="p.id = pa.publication_id")
+            .join("LEFT", Conference.__tablename__, "c", on_condition="c.id = p.conference_id", unique=True)
+            .join("LEFT", Journal.__tablename__, "j", on_condition="j.id = p.journal_id", unique=True)
+            .and_condition("", AuthorQuery.author_ids_condition(author_ids, "pa.author_id"), custom=True)
+            .select("""
+                pa.author_id,
+                COUNT(*) AS pub_total,
+                CASE
+                    WHEN COUNT(c.rank) > 0 THEN MODE() WITHIN GROUP (ORDER BY c.rank)
+                    ELSE 'N/A'
+                END AS freq_conf_rank,
+                CASE
+                    WHEN COUNT(j.q_rank) > 0 THEN MODE() WITHIN GROUP (ORDER BY j.q_rank)
+                    ELSE 'N/A'
+                END AS freq_journal_rank
+            """)
+            .group_by("pa.author_id")
+        )
+
+        # Total cites, a publication listed twice by Scholar with the same citations counts once
+        cited_pubs_qb = (
+            QueryBuilder(session, PublicationAuthor.__tablename__, "pa")
+            .join("INNER", Publication.__tablename__, "p", on_condition="p.id = pa.publication_id")
+            .join("INNER", GoogleScholarPublication.__tablename__, "gsp", on_condition="gsp.publication_key = p.id")
+            .and_condition("", AuthorQuery.author_ids_condition(author_ids, "pa.author_id"), custom=True)
+            .select("DISTINCT pa.author_id, p.title, gsp.total_citations")
+        )
+        cites_qb = (
+            QueryBuilder(session, f"({cited_pubs_qb.build_query_string()})", "cp")
+            .select("cp.author_id, SUM(cp.total_citations) AS cites_total")
+            .group_by("cp.author_id")
+        )
+
+        details_qb = QueryBuilder(session, Author.__tablename__, "a")
+        details_qb \
+            .join("LEFT", f"""
+                LATERAL (
+                    SELECT gsa.h_index, gsa.i10_index FROM {GoogleScholarAuthor.__tablename__} gsa
+                    WHERE gsa.author_key = a.id LIMIT 1
+                )""", "g", on_condition="TRUE", unique=True) \
+            .join_aggregate("pub_stats", pub_stats_qb, "ps", key_column="pa.author_id", this_field="id") \
+            .join_aggregate("cites", cites_qb, "ct", key_column="cp.author_id", this_field="id") \
+            .and_condition("", AuthorQuery.author_ids_condition(author_ids), custom=True)
+
+        details_qb.select("""
+            a.id AS "Author ID",
+            CASE
+                WHEN a.role = '?' THEN a.organization
+                ELSE a.role || ' - ' || a.organization
+            END AS "Organization",
+            COALESCE(g.h_index, 0) AS "H Index",
+            COALESCE(g.i10_index, 0) AS "I10 Index",
+            ct.cites_total AS "Total Cites",
+            COALESCE(ps.pub_total, 0) AS "Publications Found",
+            COALESCE(ps.freq_conf_rank, 'N/A') AS "Frequent Conf. Rank",
+            COALESCE(ps.freq_journal_rank, 'N/A') AS "Frequent Journal Rank"
+        """)
+        return details_qb
+
+    @staticmethod
+    def author_ids_condition(author_ids: List[int], column: str = "a.id") -> str:
+        """
+        Condition on an author id column keeping the given authors.
+
+        :param column: Qualified column holding the author id, a.id by default.
+        """
+        if not author_ids:
+            return "FALSE"
+        return f"{column} IN (VALUES {','.join(f'({int(author_id)})' for author_id in author_ids)})"
+
+    @staticmethod
+    def authors_of_publications_condition(publication_ids: List[int]) -> str:
+        """
+        Condition on a.id keeping the authors of some publications, as a semi-join on publication_author.
+        """
+        if not publication_ids:
+            return "FALSE"
+        values = ','.join(f"({int(pub_id)})" for pub_id in publication_ids)
+        return f"""
+            a.id IN (
+                SELECT pa_f.author_id FROM {PublicationAuthor.__tablename__} pa_f
+                WHERE pa_f.publication_id IN (VALUES {values})
+            )
+        """
+
+    @staticmethod
+    def authors_of_venues_condition(venue_field: str, venue_ids: List[int]) -> str:
+        """
+        Condition on a.id keeping the authors who published in some conferences or journals.
+
+        :param venue_field: "conference_id" or "journal_id".
+        """
+        if not venue_ids:
+            return "FALSE"
+        values = ','.join(f"({int(venue_id)})" for venue_id in venue_ids)
+        return f"""
+            a.id IN (
+                SELECT pa_f.author_id FROM {PublicationAuthor.__tablename__} pa_f
+                JOIN {Publication.__tablename__} p_f ON p_f.id = pa_f.publication_id
+                WHERE p_f.{venue_field} IN (VALUES {values})
+            )
+        """
+
+    @staticmethod
+    def build_author_overview_query(session, author_conditions: Optional[List[str]] = None):
+        """
+        :param author_conditions: Conditions on a.id restricting the authors, applied inside the author_base CTE
+                                  so the aggregations only see the authors that remain.
+        """
+        # CTE 1: author_base, a semi-join rather than DISTINCT ON so a page can stop early
         author_base_qb = (
             QueryBuilder(pool=session, table_name="author", alias="a")
-            .join("INNER", "google_scholar_author", "gsa", on_condition="gsa.author_key = a.id")
+            .and_condition("", f"""
+                EXISTS (
+                    SELECT 1 FROM {GoogleScholarAuthor.__tablename__} gsa WHERE gsa.author_key = a.id
+                )
+            """, custom=True)
             .select("""
-                DISTINCT ON (a.id)
                 a.id,
                 a.name,
                 a.role,
@@ -135,8 +278,10 @@ class AuthorQuery:
                 a.image_url
             """)
         )
+        for condition in author_conditions or []:
+            author_base_qb.and_condition("", condition, custom=True)
 
-        # CTE 2: interests
+        # Aggregate 1: interests
         interests_qb = (
             QueryBuilder(pool=session, table_name="author_interest", alias="ai")
             .join("INNER", "interest", "i", on_condition="i.id = ai.interest_id")
@@ -150,7 +295,7 @@ class AuthorQuery:
             .group_by("ai.author_id")
         )
 
-        # CTE 3: freq_conf_rank
+        # Aggregate 2: freq_conf_rank
         freq_conf_rank_qb = (
             QueryBuilder(pool=session, table_name="publication_author", alias="pa")
             .join("INNER", "publication", "p", on_condition="p.id = pa.publication_id")
@@ -165,7 +310,7 @@ class AuthorQuery:
             .group_by("pa.author_id")
         )
 
-        # CTE 4: freq_journal_rank
+        # Aggregate 3: freq_journal_rank
         freq_journal_rank_qb = (
             QueryBuilder(pool=session, table_name="publication_author", alias="pa")
             .join("INNER", "publication", "p", on_condition="p.id = pa.publication_id")
@@ -180,7 +325,7 @@ class AuthorQuery:
             .group_by("pa.author_id")
         )
 
-        # CTE 5: avg_sjr_score
+        # Aggregate 4: avg_sjr_score
         avg_sjr_score_qb = (
             QueryBuilder(pool=session, table_name="publication_author", alias="pa")
             .join("INNER", "publication", "p", on_condition="p.id = pa.publication_id")
@@ -209,12 +354,10 @@ class AuthorQuery:
 
         main_qb = QueryBuilder(pool=session, table_name="author_base", alias="ab")
 
+        # Conditions on ab are evaluated in author_base, the aggregates only run for the authors it keeps
         main_qb \
             .with_cte("author_base", author_base_qb) \
-            .with_cte("interests", interests_qb) \
-            .with_cte("freq_conf_rank", freq_conf_rank_qb) \
-            .with_cte("freq_journal_rank", freq_journal_rank_qb) \
-            .with_cte("avg_sjr_score", avg_sjr_score_qb)
+            .set_base_cte("id")
 
         main_qb.select("""
             '' || ab.id                  AS "Author ID",
@@ -227,20 +370,38 @@ class AuthorQuery:
             i.interests            AS "Interests",
             CASE WHEN fc.freq_conf_rank IS NOT NULL THEN fc.freq_conf_rank ELSE '' END     AS "Frequent Conf. Rank",
             CASE WHEN fj.freq_journal_rank IS NOT NULL THEN fj.freq_journal_rank ELSE '' END   AS "Frequent Journal Rank",
-            '' || CASE WHEN asjr.avg_sjr_score IS NOT NULL THEN asjr.avg_sjr_score ELSE 0 END     AS "Avg. SJR Score"
+            '' || CASE WHEN asjr.avg_sjr_score IS NOT NULL THEN asjr.avg_sjr_score ELSE 0 END     AS "Avg. SJR Score",
+            '' || COALESCE(ac.degree, 0)  AS "Co-authors",
+            '' || ROUND(CAST(COALESCE(ac.pagerank, 0) AS NUMERIC), 3)  AS "PageRank"
         """)
 
-        # Left joins to each of the other CTEs
+        # Left joins to the aggregates, computed for the page only when it is selected on author columns
         main_qb \
-            .join("LEFT", "interests", "i", on_condition="ab.id = i.author_id") \
-            .join("LEFT", "freq_conf_rank", "fc", on_condition="ab.id = fc.author_id") \
-            .join("LEFT", "freq_journal_rank", "fj", on_condition="ab.id = fj.author_id") \
-            .join("LEFT", "avg_sjr_score", "asjr", on_condition="ab.id = asjr.author_id")
+            .join_aggregate("interests", interests_qb, "i", key_column="ai.author_id", this_field="id") \
+            .join_aggregate("freq_conf_rank", freq_conf_rank_qb, "fc", key_column="pa.author_id", this_field="id") \
+            .join_aggregate("freq_journal_rank", freq_journal_rank_qb, "fj", key_column="pa.author_id", this_field="id") \
+            .join_aggregate("avg_sjr_score", avg_sjr_score_qb, "asjr", key_column="pa.author_id", this_field="id") \
+            .join("LEFT", AuthorCentrality.__tablename__, "ac", on_condition="ab.id = ac.author_id", unique=True)
+
+        # Typed sort keys, the output columns are text
+        main_qb \
+            .add_sort_key("Author ID", "ab.id") \
+            .add_sort_key("Name", "ab.name") \
+            .add_sort_key("Interests", "i.interests", "i.interests <> ''") \
+            .add_sort_key("Frequent Conf. Rank", "fc.freq_conf_rank", "fc.freq_conf_rank <> ''") \
+            .add_sort_key("Frequent Journal Rank", "fj.freq_journal_rank", "fj.freq_journal_rank <> ''") \
+            .add_sort_key("Avg. SJR Score", "COALESCE(asjr.avg_sjr_score, 0)") \
+            .add_sort_key("Co-authors", "COALESCE(ac.degree, 0)") \
+            .add_sort_key("PageRank", "COALESCE(ac.pagerank, 0)")
 
         return main_qb
 
     @staticmethod
-    def build_author_group_query_batch(session, author_ids):
+    def build_author_group_query_batch(session, author_ids, filters: Optional[GraphFilters] = None):
+        """
+        Co-author links of the given authors.
+        With filters, only pairs sharing a publication that satisfies them are returned.
+        """
         # Convert the list of author IDs into a formatted string for SQL VALUES
         author_ids = ",".join(map(str, author_ids))
         numbers = author_ids.split(',')
@@ -261,8 +422,25 @@ class AuthorQuery:
             "INNER", GoogleScholarAuthor.__tablename__, "end_gs", "end_author.id = end_gs.author_key"
         ).join(
             "INNER", f"(VALUES {author_ids})", "id_author(id)", on_condition="start_author.id = id_author.id"
+        ).join(
+            "LEFT", AuthorCentrality.__tablename__, "end_ac", "end_author.id = end_ac.author_id"
         )
 
+        if filters is not None and not filters.is_empty():
+            # Semi-join: the pair must share at least one publication within the filters
+            shared_pub = QueryBuilder(session, PublicationAuthor.__tablename__, "pa1")
+            shared_pub.join("INNER", PublicationAuthor.__tablename__, "pa2", "pa2.publication_id = pa1.publication_id")
+            shared_pub.join("INNER", Publication.__tablename__, "p", "p.id = pa1.publication_id")
+            if filters.has_rank_filter():
+                shared_pub.join("LEFT", Journal.__tablename__, "j", "p.journal_id = j.id")
+                shared_pub.join("LEFT", Conference.__tablename__, "c", "p.conference_id = c.id")
+            shared_pub.and_condition("", "pa1.author_id = start_author.id", custom=True)
+            shared_pub.and_condition("", "pa2.author_id = end_author.id", custom=True)
+            for condition in filters.publication_conditions():
+                shared_pub.and_condition("", condition, custom=True)
+            shared_pub.select("1")
+            qb.and_condition("", f"EXISTS ({shared_pub.build_query_string()})", custom=True)
+
         # Select the required columns
         qb.select(
             """
@@ -271,55 +449,39 @@ class AuthorQuery:
             start_author.image_url AS start_author_image_url,
             end_author.id AS end_author_id,
             to_camel_case(end_author.name) AS end_author_label,
-            end_author.image_url AS end_author_image_url
+            end_author.image_url AS end_author_image_url,
+            COALESCE(end_ac.pagerank, 0) AS end_author_pagerank
             """
         )
 
         # Group by the required columns
         qb.group_by(
             "start_author.id", "start_author.name", "start_author.image_url",
-            "end_author.id", "end_author.name", "end_author.image_url"
+            "end_author.id", "end_author.name", "end_author.image_url", "end_ac.pagerank"
         )
 
         return qb
 
     @staticmethod
-    def build_authors_from_pub_query(session, pub_ids):
-        publication_author_query = QueryBuilder(
-            pool=session,
-            table_name="publication_author",
-            alias="pa"
-        )
-
-        publication_author_query.and_condition(
-            parameter="pa.publication_id",
-            value=f"pa.publication_id IN ({','.join([val.strip() for val in pub_ids.split(',') if val.strip()])})",
-            custom=True
-        )
-
-        author_query = QueryBuilder(
-            pool=session,
-            table_name="author",
-            alias="a"
-        )
-
-        author_query.join(
-            join_type="INNER",
-            other="publication_author",  # Use the actual table name
-            join_alias="pa",
-            this_field="id",  # Author.id
-            other_field="author_id"  # PublicationAuthor.author_id
-        )
-
-        author_query.select("DISTINCT a.name")
-
-        author_query.and_condition(
-            parameter="pa.publication_id",
-            value=f"pa.publication_id IN ({pub_ids})",
-            custom=True
-        )
-
-        return author_query
+    def build_neighbors_query_batch(session, author_ids):
+        """
+        Co-authors of the given authors, following author_coauthor in both directions.
+        Only neighbors with a Google Scholar profile are returned, as in the network view.
+        """
+        author_ids = ','.join(f"({int(num)})" for num in author_ids)
+
+        forward = QueryBuilder(session, AuthorCoauthor.__tablename__, "aco")
+        forward.join("INNER", f"(VALUES {author_ids})", "id_author(id)", on_condition="aco.author_id = id_author.id")
+        forward.select("aco.author_id AS author_id, aco.coauthor_id AS neighbor_id")
+
+        backward = QueryBuilder(session, AuthorCoauthor.__tablename__, "aco")
+        backward.join("INNER", f"(VALUES {author_ids})", "id_author(id)", on_condition="aco.coauthor_id = id_author.id")
+        backward.select("aco.coauthor_id AS author_id, aco.author_id AS neighbor_id")
+
+        neighbors = QueryBuilder(session, f"({forward.build_query_string()} UNION {backward.build_query_string()})", "nb")
+        neighbors.join("INNER", GoogleScholarAuthor.__tablename__, "gs", on_condition="gs.author_key = nb.neighbor_id")
+        neighbors.select("DISTINCT nb.author_id, nb.neighbor_id")
+        return neighbors
 
     @staticmethod
     def build_co_authors_query(session, author_id):
@@ -20,6 +20,13 @@ class ConferenceQuery:
         query_builder.and_condition("", "c.rank IS NOT NULL", custom=True)
         query_builder.and_condition("", "c.acronym IS NOT NULL", custom=True)
 
+        # Typed sort keys, the output columns are text
+        query_builder \
+            .add_sort_key("Conf ID", "c.id") \
+            .add_sort_key("Conference Title", "c.title", "c.title <> ''") \
+            .add_sort_key("Acronym", "c.acronym", "c.acronym <> ''") \
+            .add_sort_key("Conference Rank", "c.rank", "c.rank <> ''")
+
         return query_builder
 
     @staticmethod
@@ -60,22 +67,3 @@ class ConferenceQuery:
         ).select("DISTINCT a.name, a.id")
 
         return author_query
-
-    @staticmethod
-    def build_publications_from_conferences_query(session, conference_ids: str):
-        publication_query = QueryBuilder(
-            pool=session,
-            table_name="publication",
-            alias="p"
-        )
-
-        publication_query.and_condition(
-            parameter="",
-            value=f"p.conference_id IN ({conference_ids})",
-            custom=True
-        )
-
-        publication_query.select("DISTINCT p.id")
-
-        return publication_query
-
@@ -25,6 +25,19 @@ class JournalQuery:
         """)
         query_builder.and_condition("", "j.q_rank IS NOT NULL", custom=True)
         query_builder.and_condition("", "j.title IS NOT NULL", custom=True)
+
+        # Typed sort keys, the output columns are text
+        query_builder \
+            .add_sort_key("Journal ID", "j.id") \
+            .add_sort_key("Journal Title", "j.title", "j.title <> ''") \
+            .add_sort_key("Year", "j.year") \
+            .add_sort_key("Journal Rank", "j.q_rank", "j.q_rank <> ''") \
+            .add_sort_key("H Index", "j.h_index") \
+            .add_sort_key("Total Documents", "j.total_docs") \
+            .add_sort_key("Total Documents (3 Years)", "j.total_docs_3years") \
+            .add_sort_key("Total References", "j.total_refs") \
+            .add_sort_key("Total Citations (3 Years)", "j.total_cites_3years") \
+            .add_sort_key("Citable Documents (3 Years)", "j.citable_docs_3years")
         return query_builder
 
     @staticmethod
@@ -65,23 +78,3 @@ class JournalQuery:
         ).select("DISTINCT a.name, a.id"))
 
         return author_query
-
-    @staticmethod
-    def build_publications_from_journals_query(session, journal_ids: str):
-        publication_query = QueryBuilder(
-            pool=session,
-            table_name="publication",
-            alias="p"
-        )
-
-        publication_query.and_condition(
-            parameter="",
-            value=f"p.journal_id IN ({journal_ids})",
-            custom=True
-        )
-
-        publication_query.select("DISTINCT p.id")
-
-        return publication_query
-
-
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from com.gwngames.server.entity.base.Author import Author
 from com.gwngames.server.entity.base.Conference import Conference
 from com.gwngames.server.entity.base.Journal import Journal
@@ -5,6 +7,7 @@ from com.gwngames.server.entity.base.Publication import Publication
 from com.gwngames.server.entity.base.Relationships import PublicationAuthor
 from com.gwngames.server.entity.variant.scholar.GoogleScholarCitation import GoogleScholarCitation
 from com.gwngames.server.entity.variant.scholar.GoogleScholarPublication import GoogleScholarPublication
+from com.gwngames.server.graph.GraphFilters import GraphFilters
 from com.gwngames.server.query.QueryBuilder import QueryBuilder
 
 
@@ -71,19 +74,18 @@ class PublicationQuery:
         publication_query = QueryBuilder(session, Publication.__tablename__, "p")
         journal_query = QueryBuilder(session, Journal.__tablename__, "j")
         conference_query = QueryBuilder(session, Conference.__tablename__, "c")
-        google_scholar_query = QueryBuilder(session, GoogleScholarPublication.__tablename__, "gsp")
 
+        # One row per publication: the joins follow foreign keys, so no GROUP BY has to see every row before LIMIT
         publication_query.join(
-            "LEFT", journal_query, "j", on_condition="j.id = p.journal_id"
+            "LEFT", journal_query, "j", on_condition="j.id = p.journal_id", unique=True
         ).join(
-            "LEFT", conference_query, "c", on_condition="c.id = p.conference_id"
-        ).join(
-            "LEFT", google_scholar_query, "gsp", on_condition="gsp.publication_key = p.id"
+            "LEFT", conference_query, "c", on_condition="c.id = p.conference_id", unique=True
         )
 
-        publication_query.and_condition("",
-            """
-            (gsp.id IS NOT NULL)
+        publication_query.and_condition("", f"""
+            EXISTS (
+                SELECT 1 FROM {GoogleScholarPublication.__tablename__} gsp WHERE gsp.publication_key = p.id
+            )
             """, custom=True
         )
 
@@ -97,25 +99,95 @@ class PublicationQuery:
             END as "Year",
             p.publisher as "Publisher",
             p.authors AS "Authors",
-            '' || CASE 
-                WHEN COUNT(j.id) > 0 THEN MODE() WITHIN GROUP (
-                    ORDER BY COALESCE(NULLIF(REGEXP_REPLACE(j.sjr, '[^0-9.]', ''), ''), '0')
-                )
-                ELSE '0'
-            END AS "Journal Score",
+            '' || COALESCE(NULLIF(REGEXP_REPLACE(j.sjr, '[^0-9.]', ''), ''), '0') AS "Journal Score",
             j.q_rank AS "Journal Rank",
             c.rank AS "Conference Rank"
             """
         )
 
-        publication_query.group_by(
-            "p.id", "p.title", "p.publication_year", "p.publisher, j.q_rank, c.rank"
-        )
+        # Typed sort keys, the output columns are text
+        publication_query \
+            .add_sort_key("ID", "p.id") \
+            .add_sort_key("Title", "p.title", "p.title <> ''") \
+            .add_sort_key("Year", "p.publication_year", "p.publication_year >= 1950") \
+            .add_sort_key("Publisher", "p.publisher", "p.publisher <> ''") \
+            .add_sort_key("Authors", "p.authors", "p.authors <> ''") \
+            .add_sort_key("Journal Rank", "j.q_rank", "j.q_rank <> ''") \
+            .add_sort_key("Conference Rank", "c.rank", "c.rank <> ''")
 
         return publication_query
 
     @staticmethod
-    def build_author_publication_query_batch(session, pairs):
+    def add_author_condition(query_builder: QueryBuilder, author_ids: List[int], match_all: bool = False):
+        """
+        Keep the publications of some authors with a semi-join on publication_author by author id,
+        answered from the (author_id, publication_id) index instead of matching the authors text.
+
+        :param author_ids: Validated author ids, inlined in the query.
+        :param match_all: Keep the publications written by all the authors instead of any of them.
+        """
+        if not author_ids:
+            query_builder.and_condition("", "FALSE", custom=True)
+            return query_builder
+
+        if match_all:
+            for author_id in author_ids:
+                query_builder.and_condition("", f"""
+                    EXISTS (
+                        SELECT 1 FROM {PublicationAuthor.__tablename__} pa_f
+                        WHERE pa_f.publication_id = p.id AND pa_f.author_id = {int(author_id)}
+                    )
+                """, custom=True)
+        else:
+            values = ','.join(f"({int(author_id)})" for author_id in author_ids)
+            query_builder.and_condition("", f"""
+                p.id IN (
+                    SELECT pa_f.publication_id FROM {PublicationAuthor.__tablename__} pa_f
+                    WHERE pa_f.author_id IN (VALUES {values})
+                )
+            """, custom=True)
+        return query_builder
+
+    @staticmethod
+    def add_venue_condition(query_builder: QueryBuilder, venue_field: str, venue_ids: List[int]):
+        """
+        Keep the publications of some conferences or journals with a WHERE condition on the venue id,
+        filtering rows before aggregation instead of listing their publication ids.
+
+        :param venue_field: "p.conference_id" or "p.journal_id".
+        :param venue_ids: Validated venue ids, inlined in the query.
+        """
+        if not venue_ids:
+            query_builder.and_condition("", "FALSE", custom=True)
+            return query_builder
+
+        values = ','.join(f"({int(venue_id)})" for venue_id in venue_ids)
+        query_builder.and_condition("", f"{venue_field} IN (VALUES {values})", custom=True)
+        return query_builder
+
+    @staticmethod
+    def add_author_filter(query_builder: QueryBuilder, values: List[str]):
+        """
+        Condition of the "Author (AND)" filter: every value is an author id or a part of an author name,
+        each must be an author of the publication.
+        """
+        author_ids = [int(value) for value in values if value.isdigit()]
+        if author_ids:
+            PublicationQuery.add_author_condition(query_builder, author_ids, match_all=True)
+
+        for name in (value for value in values if value and not value.isdigit()):
+            placeholder = query_builder.add_parameter("author_name", f"%{name}%")
+            query_builder.and_condition("", f"""
+                EXISTS (
+                    SELECT 1 FROM {PublicationAuthor.__tablename__} pa_f
+                    JOIN {Author.__tablename__} a_f ON a_f.id = pa_f.author_id
+                    WHERE pa_f.publication_id = p.id AND a_f.name ILIKE {placeholder}
+                )
+            """, custom=True)
+        return query_builder
+
+    @staticmethod
+    def build_author_publication_query_batch(session, pairs, filters: Optional[GraphFilters] = None):
         pairs = ','.join(str(pair) for pair in pairs)
         qb = QueryBuilder(session, Publication.__tablename__, "p")
         qb.join(
@@ -128,6 +200,8 @@ class PublicationQuery:
             "LEFT", Conference.__tablename__, "c", "p.conference_id = c.id"
         )
         qb.and_condition("", "(j.q_rank IS NOT NULL OR c.rank IS NOT NULL)", custom=True)
+        for condition in (filters.publication_conditions() if filters is not None else []):
+            qb.and_condition("", condition, custom=True)
         #qb.and_condition("", f"(pa1.author_id, pa2.author_id) IN ({pairs})", custom=True)
         qb.join("INNER", f"(VALUES {pairs})", "pair(id1, id2)", on_condition="(pa1.author_id, pa2.author_id) = (pair.id1, pair.id2) AND pair.id1 < pair.id2")
         qb.select(
@@ -142,7 +216,7 @@ class PublicationQuery:
         return qb
 
     @staticmethod
-    def build_author_publication_year_query_batch(session, pairs):
+    def build_author_publication_year_query_batch(session, pairs, filters: Optional[GraphFilters] = None):
         pairs = ','.join(str(pair) for pair in pairs)
         qb = QueryBuilder(session, Publication.__tablename__, "p")
         qb.join(
@@ -150,6 +224,14 @@ class PublicationQuery:
         ).join(
             "INNER", PublicationAuthor.__tablename__, "pa2", "p.id = pa2.publication_id"
         )
+        if filters is not None and filters.has_rank_filter():
+            qb.join(
+                "LEFT", Journal.__tablename__, "j", "p.journal_id = j.id"
+            ).join(
+                "LEFT", Conference.__tablename__, "c", "p.conference_id = c.id"
+            )
+        for condition in (filters.publication_conditions() if filters is not None else []):
+            qb.and_condition("", condition, custom=True)
         qb.and_condition("", "(p.journal_id IS NOT NULL OR p.conference_id IS NOT NULL)", custom=True)
         qb.and_condition("", "p.publication_year IS NOT NULL", custom=True)
         #qb.and_condition("",f"(pa1.author_id, pa2.author_id) IN ({pairs})", custom=True)
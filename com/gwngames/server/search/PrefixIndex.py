@@ -0,0 +1,175 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Prefixes up to this many bytes match too many keys to rank at query time, their top items are precomputed
+SHORT_PREFIX = 3
+# Items kept per precomputed prefix
+SHORT_TOP = 50
+# Bytes of a key kept in the sorted array, longer prefixes are checked against the text buffer
+KEY_BYTES = 24
+# Keys encoded per step while building, bounds the temporary gather arrays
+BUILD_CHUNK = 1 << 20
+
+_WORD = re.compile(rb"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Lower case without accents, so "Müller" and "muller" share their keys.
+    """
+    text = text or ""
+    if text.isascii():
+        return text.lower().strip()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+class PrefixIndex:
+    """
+    Sorted array of search keys for prefix lookups with np.searchsorted.
+    Every item is reachable from its full text and from each of its words,
+    so "smi" finds "John Smith" and "conf soft" finds "Intl Conf Soft Eng".
+
+    The normalized texts are stored once, UTF-8 encoded in one buffer. A key is a suffix of a text,
+    kept as its start and end offsets in the buffer plus its first KEY_BYTES bytes in a fixed width array,
+    so no key is a Python object. UTF-8 byte order is code point order and no character encoding
+    is a prefix of another, so prefixes compare the same on bytes as on text.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, str, str, float, Iterable[str]]]):
+        """
+        :param items: (id, name, label, weight, texts) tuples: name is the value a filter takes,
+                      label is what is shown, weight ranks the matches and texts are searched.
+        """
+        ids = []
+        weights = []
+        self.names: List[str] = []
+        self.labels: List[str] = []
+
+        texts = []
+        starts = []
+        ends = []
+        positions = []
+        offset = 0
+        for item_id, name, label, weight, item_texts in items:
+            position = len(ids)
+            ids.append(item_id)
+            weights.append(float(weight or 0))
+            self.names.append(name)
+            self.labels.append(label)
+            for text in {normalize(text).encode("utf-8") for text in item_texts}:
+                if not text:
+                    continue
+                # The text from every word on, so "smi" and "conf soft" both match inside a name or title
+                word_starts = {0}.union(word.start() for word in _WORD.finditer(text))
+                texts.append(text)
+                starts.extend(offset + word_start for word_start in word_starts)
+                ends.extend([offset + len(text)] * len(word_starts))
+                positions.extend([position] * len(word_starts))
+                offset += len(text)
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.float64)
+        self.buffer = b"".join(texts)
+        starts = np.array(starts, dtype=np.int64)
+        ends = np.array(ends, dtype=np.int64)
+        key_prefixes = self._key_prefixes(starts, ends)
+
+        order = np.argsort(key_prefixes, kind="stable")
+        self.key_prefixes = key_prefixes[order]
+        self.key_starts = starts[order]
+        self.key_ends = ends[order]
+        self.positions = np.array(positions, dtype=np.int32)[order]
+        self.short_top: Dict[bytes, np.ndarray] = self._rank_short_prefixes()
+
+    def _key_prefixes(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        First KEY_BYTES bytes of every key, zero padded, as a fixed width bytes array.
+        """
+        data = np.frombuffer(self.buffer + bytes(KEY_BYTES), dtype=np.uint8)
+        prefixes = np.zeros((len(starts), KEY_BYTES), dtype=np.uint8)
+        columns = np.arange(KEY_BYTES)
+        for begin in range(0, len(starts), BUILD_CHUNK):
+            chunk_starts = starts[begin:begin + BUILD_CHUNK, None]
+            indices = chunk_starts + columns
+            chunk = data[indices]
+            # Bytes past the end of the text belong to the next one
+            chunk[indices >= ends[begin:begin + BUILD_CHUNK, None]] = 0
+            prefixes[begin:begin + BUILD_CHUNK] = chunk
+        return prefixes.view(f"S{KEY_BYTES}").ravel()
+
+    def _key_range(self, prefix: bytes) -> Tuple[int, int]:
+        """
+        Range of the sorted keys whose first KEY_BYTES bytes start with prefix.
+        """
+        key = prefix[:KEY_BYTES]
+        start = int(np.searchsorted(self.key_prefixes, key, side="left"))
+        if len(key) == KEY_BYTES:
+            end = int(np.searchsorted(self.key_prefixes, key, side="right"))
+        else:
+            # 0xff never appears in UTF-8, it sorts after every key with this prefix
+            end = int(np.searchsorted(self.key_prefixes, key + b"\xff", side="left"))
+        return start, end
+
+    def _best(self, positions: np.ndarray, k: int) -> np.ndarray:
+        """
+        The k heaviest distinct items among positions, heaviest first.
+        Only the heaviest keys are deduplicated and sorted, a long run of keys is partitioned once.
+        """
+        weights = self.weights[positions]
+        scan = k
+        while True:
+            if len(positions) > scan:
+                candidates = np.unique(positions[np.argpartition(-weights, scan)[:scan]])
+            else:
+                candidates = np.unique(positions)
+            # An item matching through several keys takes several of them, widen until k items are found
+            if len(candidates) >= k or len(positions) <= scan:
+                break
+            scan *= 2
+        best = candidates[np.argsort(-self.weights[candidates], kind="stable")]
+        return best[:k]
+
+    def _rank_short_prefixes(self) -> Dict[bytes, np.ndarray]:
+        # Keys are sorted, so the keys sharing a short prefix are one contiguous run
+        short_top = {}
+        if not len(self.key_prefixes):
+            return short_top
+        key_bytes = self.key_prefixes.view(np.uint8).reshape(-1, KEY_BYTES)
+        for length in range(1, SHORT_PREFIX + 1):
+            heads = key_bytes[:, :length]
+            run_starts = np.flatnonzero(np.r_[True, np.any(heads[1:] != heads[:-1], axis=1)])
+            run_ends = np.r_[run_starts[1:], len(heads)]
+            # Keys shorter than the prefix are zero padded, they have no prefix of that length
+            complete = heads[run_starts, length - 1] != 0
+            for run_start, run_end in zip(run_starts[complete].tolist(), run_ends[complete].tolist()):
+                short_top[heads[run_start].tobytes()] = self._best(self.positions[run_start:run_end], SHORT_TOP)
+        return short_top
+
+    def search(self, prefix: str, k: int = 10) -> List[Dict]:
+        """
+        The k heaviest items with a key starting with prefix.
+        """
+        prefix = normalize(prefix).encode("utf-8")
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX:
+            best = self.short_top.get(prefix, self.positions[:0])[:k]
+        else:
+            start, end = self._key_range(prefix)
+            positions = self.positions[start:end]
+            if len(prefix) > KEY_BYTES:
+                # The array only holds the first bytes of the keys, the rest is compared in the buffer
+                matches = [idx for idx, (key_start, key_end) in enumerate(zip(
+                    self.key_starts[start:end].tolist(), self.key_ends[start:end].tolist()
+                )) if key_end - key_start >= len(prefix) and self.buffer[key_start:key_start + len(prefix)] == prefix]
+                positions = positions[matches]
+            best = self._best(positions, k)
+        return [{"id": int(self.ids[position]), "name": self.names[position], "label": self.labels[position]}
+                for position in best.tolist()]
+
+    def __len__(self):
+        return len(self.ids)
@@ -0,0 +1,49 @@
+import threading
+from typing import Dict, List
+
+from com.gwngames.server.search.PrefixIndex import PrefixIndex
+
+AUTHORS_KIND = "authors"
+CONFERENCES_KIND = "conferences"
+JOURNALS_KIND = "journals"
+INTERESTS_KIND = "interests"
+KINDS = [AUTHORS_KIND, CONFERENCES_KIND, JOURNALS_KIND, INTERESTS_KIND]
+
+
+class SuggestIndex:
+    """
+    Prefix indexes used for the filter suggestions of a worker, one per kind.
+    Indexes are rebuilt aside and swapped in whole, lookups never wait for a rebuild.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            self._indexes: Dict[str, PrefixIndex] = {}
+
+    def replace(self, kind: str, index: PrefixIndex):
+        self._indexes[kind] = index
+
+    def is_ready(self, kind: str) -> bool:
+        return kind in self._indexes
+
+    def suggest(self, kind: str, prefix: str, k: int = 10) -> List[Dict]:
+        """
+        Top k items of a kind matching a prefix, empty while the index is not built yet.
+        """
+        index = self._indexes.get(kind)
+        if index is None:
+            return []
+        return index.search(prefix, k)
+
+    def stats(self) -> Dict[str, int]:
+        return {kind: len(index) for kind, index in self._indexes.items()}
@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS author_centrality (
+    author_id       INTEGER PRIMARY KEY REFERENCES author (id) ON DELETE CASCADE,
+    degree          INTEGER NOT NULL,
+    weighted_degree DOUBLE PRECISION NOT NULL,
+    pagerank        DOUBLE PRECISION NOT NULL,
+    update_date     TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_author_centrality_pagerank ON author_centrality (pagerank DESC);
+CREATE INDEX IF NOT EXISTS idx_author_centrality_degree ON author_centrality (degree DESC);
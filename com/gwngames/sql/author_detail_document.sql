@@ -0,0 +1,188 @@
+-- Researcher details as one JSONB document per author, served by primary key
+CREATE TABLE IF NOT EXISTS author_detail_document (
+    author_id   INTEGER PRIMARY KEY REFERENCES author (id) ON DELETE CASCADE,
+    document    JSONB NOT NULL,
+    update_date TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Authors whose document is stale, filled by triggers and drained by the server
+CREATE TABLE IF NOT EXISTS author_detail_dirty (
+    author_id INTEGER PRIMARY KEY,
+    queued_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_author_detail_dirty_queued_at ON author_detail_dirty (queued_at);
+
+-- Rebuild the documents of some authors, set-based: every aggregate only reads their publications
+CREATE OR REPLACE FUNCTION refresh_author_detail_documents(author_ids INTEGER[]) RETURNS INTEGER AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    INSERT INTO author_detail_document (author_id, document, update_date)
+    SELECT
+        a.id,
+        jsonb_build_object(
+            'Author ID', a.id,
+            'Name', to_camel_case(a.name),
+            'Organization', CASE WHEN a.role = '?' THEN a.organization ELSE a.role || ' - ' || a.organization END,
+            'Image url', a.image_url,
+            'Homepage', a.homepage_url,
+            'Scholar ID', COALESCE(g.author_id, 'N/A'),
+            'Scholar Profile', COALESCE(g.profile_url, 'N/A'),
+            'Verified on', COALESCE(g.verified, 'N/A'),
+            'H Index', COALESCE(g.h_index, 0),
+            'I10 Index', COALESCE(g.i10_index, 0),
+            'Interests', COALESCE(it.interests, 'N/A'),
+            'Frequent Conf. Rank', COALESCE(ps.freq_conf_rank, 'N/A'),
+            'Frequent Journal Rank', COALESCE(ps.freq_journal_rank, 'N/A'),
+            'Avg. SJR Score', COALESCE(ps.avg_sjr_score, 0),
+            'Total Cites', ct.cites_total,
+            'Publications Found', COALESCE(ps.pub_total, 0)
+        ),
+        now()
+    FROM author a
+    LEFT JOIN LATERAL (
+        SELECT gsa.author_id, gsa.profile_url, gsa.verified, gsa.h_index, gsa.i10_index
+        FROM google_scholar_author gsa
+        WHERE gsa.author_key = a.id
+        LIMIT 1
+    ) g ON TRUE
+    LEFT JOIN (
+        SELECT ai.author_id, STRING_AGG(DISTINCT to_camel_case(i.name), ', ') AS interests
+        FROM author_interest ai
+        JOIN interest i ON i.id = ai.interest_id
+        WHERE ai.author_id = ANY(author_ids)
+        GROUP BY ai.author_id
+    ) it ON it.author_id = a.id
+    LEFT JOIN (
+        SELECT
+            pa.author_id,
+            COUNT(*) AS pub_total,
+            CASE WHEN COUNT(c.rank) > 0 THEN MODE() WITHIN GROUP (ORDER BY c.rank) ELSE 'N/A' END AS freq_conf_rank,
+            CASE WHEN COUNT(j.q_rank) > 0 THEN MODE() WITHIN GROUP (ORDER BY j.q_rank) ELSE 'N/A' END AS freq_journal_rank,
+            CASE
+                WHEN COUNT(j.sjr) > 0 THEN ROUND(
+                    CAST(
+                        AVG(CAST(COALESCE(NULLIF(REGEXP_REPLACE(j.sjr, '[^0-9.]', ''), ''), '0') AS FLOAT)) * 10
+                        AS NUMERIC
+                    ), 2
+                )
+                ELSE 0
+            END AS avg_sjr_score
+        FROM publication_author pa
+        JOIN publication p ON p.id = pa.publication_id
+        LEFT JOIN conference c ON c.id = p.conference_id
+        LEFT JOIN journal j ON j.id = p.journal_id
+        WHERE pa.author_id = ANY(author_ids)
+        GROUP BY pa.author_id
+    ) ps ON ps.author_id = a.id
+    LEFT JOIN (
+        -- A publication listed twice by Scholar with the same citations counts once
+        SELECT cp.author_id, SUM(cp.total_citations) AS cites_total
+        FROM (
+            SELECT DISTINCT pa.author_id, p.title, gsp.total_citations
+            FROM publication_author pa
+            JOIN publication p ON p.id = pa.publication_id
+            JOIN google_scholar_publication gsp ON gsp.publication_key = p.id
+            WHERE pa.author_id = ANY(author_ids)
+        ) cp
+        GROUP BY cp.author_id
+    ) ct ON ct.author_id = a.id
+    WHERE a.id = ANY(author_ids)
+    ON CONFLICT (author_id) DO UPDATE
+    SET document = EXCLUDED.document,
+        update_date = EXCLUDED.update_date;
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Queue the authors a changed row of a source table contributes to
+CREATE OR REPLACE FUNCTION queue_author_detail_row(table_name TEXT, row_data JSONB) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO author_detail_dirty (author_id)
+    SELECT changed.author_id
+    FROM (
+        SELECT (row_data ->> 'author_id')::INTEGER AS author_id
+        WHERE table_name IN ('publication_author', 'author_interest')
+        UNION ALL
+        SELECT (row_data ->> 'id')::INTEGER
+        WHERE table_name = 'author'
+        UNION ALL
+        SELECT (row_data ->> 'author_key')::INTEGER
+        WHERE table_name = 'google_scholar_author'
+        UNION ALL
+        SELECT pa.author_id FROM publication_author pa
+        WHERE table_name = 'publication' AND pa.publication_id = (row_data ->> 'id')::INTEGER
+        UNION ALL
+        SELECT pa.author_id FROM publication_author pa
+        WHERE table_name = 'google_scholar_publication'
+          AND pa.publication_id = (row_data ->> 'publication_key')::INTEGER
+        UNION ALL
+        SELECT pa.author_id FROM publication_author pa JOIN publication p ON p.id = pa.publication_id
+        WHERE table_name = 'journal' AND p.journal_id = (row_data ->> 'id')::INTEGER
+        UNION ALL
+        SELECT pa.author_id FROM publication_author pa JOIN publication p ON p.id = pa.publication_id
+        WHERE table_name = 'conference' AND p.conference_id = (row_data ->> 'id')::INTEGER
+    ) changed
+    WHERE changed.author_id IS NOT NULL
+    ON CONFLICT (author_id) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION queue_author_detail() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM queue_author_detail_row(TG_TABLE_NAME, to_jsonb(OLD));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM queue_author_detail_row(TG_TABLE_NAME, to_jsonb(NEW));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the columns a document shows, publication.authors is rewritten every few minutes and is not one of them
+DROP TRIGGER IF EXISTS trg_author_detail_author ON author;
+CREATE TRIGGER trg_author_detail_author
+    AFTER UPDATE OF name, role, organization, image_url, homepage_url ON author
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_publication_author ON publication_author;
+CREATE TRIGGER trg_author_detail_publication_author
+    AFTER INSERT OR UPDATE OR DELETE ON publication_author
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_author_interest ON author_interest;
+CREATE TRIGGER trg_author_detail_author_interest
+    AFTER INSERT OR UPDATE OR DELETE ON author_interest
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_scholar_author ON google_scholar_author;
+CREATE TRIGGER trg_author_detail_scholar_author
+    AFTER INSERT OR UPDATE OR DELETE ON google_scholar_author
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_publication ON publication;
+CREATE TRIGGER trg_author_detail_publication
+    AFTER UPDATE OF title, conference_id, journal_id ON publication
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_scholar_publication ON google_scholar_publication;
+CREATE TRIGGER trg_author_detail_scholar_publication
+    AFTER INSERT OR DELETE OR UPDATE OF publication_key, total_citations ON google_scholar_publication
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_journal ON journal;
+CREATE TRIGGER trg_author_detail_journal
+    AFTER UPDATE OF q_rank, sjr ON journal
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+DROP TRIGGER IF EXISTS trg_author_detail_conference ON conference;
+CREATE TRIGGER trg_author_detail_conference
+    AFTER UPDATE OF rank ON conference
+    FOR EACH ROW EXECUTE FUNCTION queue_author_detail();
+
+-- Every author starts stale, the first drains build all documents
+INSERT INTO author_detail_dirty (author_id) SELECT id FROM author ON CONFLICT (author_id) DO NOTHING;
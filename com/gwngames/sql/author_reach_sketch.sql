@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS author_reach_sketch (
+    author_id INTEGER NOT NULL REFERENCES author (id) ON DELETE CASCADE,
+    hop       INTEGER NOT NULL,
+    registers BYTEA   NOT NULL,
+    PRIMARY KEY (author_id, hop)
+);
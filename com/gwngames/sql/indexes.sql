@@ -2,3 +2,21 @@ CREATE INDEX idx_publication_author_pub_id ON publication_author (publication_id
 CREATE INDEX idx_publication_author_author_id ON publication_author (author_id);
 CREATE INDEX idx_publication_title ON publication (title);
 CREATE INDEX idx_author_name ON author (name);
+
+CREATE INDEX idx_publication_author_author_pub ON publication_author (author_id, publication_id);
+CREATE INDEX idx_publication_year ON publication (publication_year);
+
+-- Author filters on publications: semi-join probes per publication, name parts matched with trigrams
+CREATE INDEX idx_publication_author_pub_author ON publication_author (publication_id, author_id);
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_author_name_trgm ON author USING gin (name gin_trgm_ops);
+
+-- Conference and journal drill-downs on publications
+CREATE INDEX idx_publication_conference_id ON publication (conference_id);
+CREATE INDEX idx_publication_journal_id ON publication (journal_id);
+
+-- Overview columns sorted on their typed sort keys, read in index order for top-N pages
+CREATE INDEX idx_publication_publisher ON publication (publisher);
+CREATE INDEX idx_journal_title ON journal (title);
+CREATE INDEX idx_journal_h_index ON journal (h_index);
+CREATE INDEX idx_conference_acronym ON conference (acronym);
@@ -7,6 +7,9 @@ const FORCE_SETTINGS = {
     collideRadius: 24,
     collideStrength: 0.4,
     linkDistanceScale: 1.5,
+    // Short settling run for networks laid out by the server
+    settleAlpha: 0.1,
+    settleAlphaDecay: 0.1,
     zoomStep: 1.1,
     simulationMaxRuntime: 5000
 };
@@ -22,9 +25,12 @@ const LINK_WIDTH_SCALE = d3.scaleLinear()
 let graphData = { nodes: [], links: [], semi_weak_links: [], weak_links: []};
 let prev_id = 0;
 let prev_depth = 0;
+let prev_filters = "";
 let prevConfRank = "";
 let prevJournalRank = "";
 let currentlySelected = "";
+// Set when the server answered with a network collapsed into clusters
+let clusterToken = null;
 let zoomBehavior;
 var showAll = true;
 
@@ -105,6 +111,17 @@ function getLinkColor(link, selectedConfRank, selectedJournRank, isLinkFilter) {
 // Updates the dropdown labels with graph nodes
 // ======================================================
 
+// ======================================================
+// Node size: roots and clusters are larger, authors grow with their PageRank
+// ======================================================
+function nodeRadius(d) {
+    if (d.is_cluster) return Math.min(48, 24 + 4 * Math.sqrt(d.size));
+    const base = d.is_root ? 32 : 16;
+    if (!d.pagerank) return base;
+    // PageRank is 1 for the average author
+    return base * Math.max(0.75, Math.min(2, Math.sqrt(d.pagerank)));
+}
+
 function updateNodeDropdown() {
   console.log("Starting dropdown update...");
 
@@ -118,7 +135,9 @@ function updateNodeDropdown() {
   const existingOptions = $('#node-label option').toArray();
 
   // Add options that do not already exist in the dropdown
-  graphData.nodes.forEach(({ id, label }) => {
+  graphData.nodes.forEach(({ id, label, is_cluster }) => {
+    // Clusters cannot be used as roots
+    if (is_cluster) return;
     let alreadyExists = false;
     existingOptions.forEach(option => {
         if (option.value === id.toString()){
@@ -434,6 +453,17 @@ function renderGraph(conferenceRank, journalRank) {
     // ----------------------------------------------------------------------
     // 3. Create D3 force simulation
     // ----------------------------------------------------------------------
+    // Large networks come with a server-side layout: start from it and only let the simulation settle
+    const preplaced = filteredNodes.length > 0 && filteredNodes.every((n) => n.layout_x !== undefined);
+    if (preplaced) {
+        filteredNodes.forEach((n) => {
+            if (n.x === undefined) {
+                n.x = width / 2 + n.layout_x;
+                n.y = height / 2 + n.layout_y;
+            }
+        });
+    }
+
     const simulation = d3.forceSimulation(filteredNodes)
       .force("link", d3.forceLink(linkData).id(d => d.id).distance(100).strength(1))
         .force("semi_weak_link", d3.forceLink(semiWeakLinkData).id(d => d.id).distance(200).strength(d => (1 / d.root_counts)))
@@ -443,6 +473,10 @@ function renderGraph(conferenceRank, journalRank) {
       .force("x", d3.forceX())
       .force("y", d3.forceY());
 
+    if (preplaced) {
+        simulation.alpha(FORCE_SETTINGS.settleAlpha).alphaDecay(FORCE_SETTINGS.settleAlphaDecay);
+    }
+
     simulation.on("end", () => {
          simulation
            .force("link", null)
@@ -512,20 +546,35 @@ function renderGraph(conferenceRank, journalRank) {
     .join("g")
     .attr("class", "node")
     .call(drag(simulation))
+    .on("click", (event, d) => {
+        if (d.is_cluster) {
+            expandCluster(d, conferenceRank, journalRank);
+        }
+    })
     .on("contextmenu", (event, d) => {
         event.preventDefault();
-        showNodePopup(d, event.pageX, event.pageY);
+        if (d.is_cluster) {
+            showClusterPopup(d);
+        } else {
+            showNodePopup(d, event.pageX, event.pageY);
+        }
+    })
+    .on("mouseenter", (event, d) => {
+        // Warm the popup details of the authors the pointer goes over, they are batched together
+        if (!d.is_cluster) {
+            requestAuthorDetail(d.id).catch(() => {});
+        }
     });
 
     // Define a unique clipPath for each node
     node.append("clipPath")
         .attr("id", d => `clip-circle-${d.id}`)
         .append("circle")
-        .attr("r", d => d.is_root ? 32 : 16);
+        .attr("r", d => nodeRadius(d));
 
     // A circle (visible outline)
     node.append("circle")
-        .attr("r", d => d.is_root ? 32 : 16)
+        .attr("r", d => nodeRadius(d))
         .attr("fill", "white")
         .attr("stroke", "#000")
         .attr("stroke-width", 1.5);
@@ -533,10 +582,10 @@ function renderGraph(conferenceRank, journalRank) {
     // The image, clipped to the circle
     node.append("svg:image")
         .attr("xlink:href", d => d.image || "")
-        .attr("width", d => d.is_root ? 64 : 32)
-        .attr("height", d => d.is_root ? 64 : 32)
-        .attr("x", d => d.is_root ? -32 : -16)
-        .attr("y", d => d.is_root ? -32 : -16)
+        .attr("width", d => 2 * nodeRadius(d))
+        .attr("height", d => 2 * nodeRadius(d))
+        .attr("x", d => -nodeRadius(d))
+        .attr("y", d => -nodeRadius(d))
         .attr("clip-path", d => `url(#clip-circle-${d.id})`)
         .on("error", function () {
             d3.select(this).attr("xlink:href", "/static/resource/avatar.png");
@@ -545,7 +594,7 @@ function renderGraph(conferenceRank, journalRank) {
     // The label below the node
     node.append("text")
         .attr("x", 0)
-        .attr("y", d => d.is_root ? 48 : 24)
+        .attr("y", d => 1.5 * nodeRadius(d))
         .attr("text-anchor", "middle")
         .attr("alignment-baseline", "hanging")
         .style("font-size", d => d.is_root ? "12px" : "8px")
@@ -581,30 +630,194 @@ function renderGraph(conferenceRank, journalRank) {
 
 
 // ======================================================
-// Show Node Popup on right-click
+// Clusters: summary on right-click, expansion on click
 // ======================================================
-function showNodePopup(nodeData, x, y) {
+function linkEndpointId(endpoint) {
+    return typeof endpoint === "object" ? endpoint.id : endpoint;
+}
+
+// Boundary links of an expanded cluster join two authors, the outer one stays
+// hidden behind its cluster node until that cluster is expanded as well
+function remapBoundaryLinks(links) {
+    const shownIds = new Set(graphData.nodes.map((node) => node.id));
+    const merged = new Map();
+    const result = [];
+    links.forEach((link) => {
+        if (link.other_cluster === undefined) {
+            result.push(link);
+            return;
+        }
+        const target = shownIds.has(link.other_cluster) ? link.other_cluster : link.target;
+        const key = `${link.source}|${target}`;
+        const existing = merged.get(key);
+        if (!existing) {
+            const remapped = { ...link, target };
+            merged.set(key, remapped);
+            result.push(remapped);
+            return;
+        }
+        // Several authors behind the same cluster node add up to one link
+        Object.entries(link).forEach(([field, value]) => {
+            if (typeof value === "number") existing[field] = (existing[field] || 0) + value;
+        });
+    });
+    return result;
+}
+
+function showClusterPopup(clusterData) {
     const popup = document.getElementById("node-popup");
     const popupImage = document.getElementById("popup-image");
-
-    popupImage.src = nodeData.image.toString().startsWith("http") ? nodeData.image : "/static/resource/avatar.png";
+    popupImage.src = "/static/resource/avatar.png";
 
     const tableBody = document.getElementById('popup-table-body');
     tableBody.innerHTML = '';
 
-    const loadingPopup = document.getElementById("loading-popup");
+    const formatCounts = (counts) => Object.entries(counts || {})
+        .sort((a, b) => b[1] - a[1])
+        .map(([rank, count]) => `${rank}: ${count}`)
+        .join(", ");
+
+    addPopupRow(tableBody, "Cluster", clusterData.id);
+    addPopupRow(tableBody, "Authors", clusterData.size);
+    addPopupRow(tableBody, "Main Authors", (clusterData.top_members || []).join(", "));
+    addPopupRow(tableBody, "Freq. Conference Rank", clusterData.freq_conf_rank);
+    addPopupRow(tableBody, "Conference Ranks", formatCounts(clusterData.conf_ranks));
+    addPopupRow(tableBody, "Freq. Journal Rank", clusterData.freq_journal_rank);
+    addPopupRow(tableBody, "Journal Ranks", formatCounts(clusterData.journal_ranks));
+
+    popup.style.display = "block";
+    resizePopup(popup, true);
+}
 
+function expandCluster(clusterData, conferenceRank, journalRank) {
+    if (!clusterToken) return;
+    const loadingPopup = document.getElementById("loading-popup");
     loadingPopup.style.display = "block";
 
-    fetch("/fetch-author-detail", {
+    fetch("/expand-cluster", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
-            author_id: nodeData.id
+            cluster_token: clusterToken,
+            cluster_id: clusterData.id
         }),
     })
         .then((response) => response.json())
-        .then(({author_data}) => {
+        .then(({ nodes, links, semi_weak_links, weak_links, error }) => {
+            if (error) {
+                alert(error);
+                return;
+            }
+            // Replace the cluster node and its links with its authors
+            const touchesCluster = (link) =>
+                linkEndpointId(link.source) === clusterData.id || linkEndpointId(link.target) === clusterData.id;
+            graphData.nodes = graphData.nodes.filter((node) => node.id !== clusterData.id);
+            graphData.links = graphData.links.filter((link) => !touchesCluster(link));
+            graphData.semi_weak_links = graphData.semi_weak_links.filter((link) => !touchesCluster(link));
+            graphData.weak_links = graphData.weak_links.filter((link) => !touchesCluster(link));
+
+            // Place the authors where the cluster was
+            nodes.forEach((node) => {
+                node.x = clusterData.x + (Math.random() - 0.5) * 50;
+                node.y = clusterData.y + (Math.random() - 0.5) * 50;
+            });
+            mergeGraphData(nodes, remapBoundaryLinks(links), semi_weak_links, weak_links);
+
+            const form = new FormData(document.getElementById("graph-form"));
+            updatePubCount(conferenceRank, journalRank, form.get("from_year"), form.get("to_year"));
+            updateNodeDropdown();
+            renderGraph(conferenceRank, journalRank);
+        })
+        .catch((error) => console.error("Error during cluster expansion:", error))
+        .finally(() => {
+            loadingPopup.style.display = "none";
+        });
+}
+
+// ======================================================
+// Author details, fetched in batches and kept for the page lifetime
+// ======================================================
+const AUTHOR_DETAILS_BATCH_DELAY = 25;
+const AUTHOR_DETAILS_BATCH_SIZE = 200;
+// Promise of the details of every author requested so far, by id
+const authorDetailsCache = new Map();
+// Requests waiting for the next batch, by id
+let pendingAuthorDetails = new Map();
+let authorDetailsTimer = null;
+
+/**
+ * Details of an author for the popup. Requests made within a few milliseconds
+ * are sent together to /fetch-author-details, each author is fetched once.
+ */
+function requestAuthorDetail(authorId) {
+    const key = String(authorId);
+    if (authorDetailsCache.has(key)) {
+        return authorDetailsCache.get(key);
+    }
+
+    const promise = new Promise((resolve, reject) => pendingAuthorDetails.set(key, {resolve, reject}));
+    authorDetailsCache.set(key, promise);
+    if (pendingAuthorDetails.size >= AUTHOR_DETAILS_BATCH_SIZE) {
+        flushAuthorDetails();
+    } else if (authorDetailsTimer === null) {
+        authorDetailsTimer = setTimeout(flushAuthorDetails, AUTHOR_DETAILS_BATCH_DELAY);
+    }
+    return promise;
+}
+
+function flushAuthorDetails() {
+    clearTimeout(authorDetailsTimer);
+    authorDetailsTimer = null;
+    const batch = pendingAuthorDetails;
+    pendingAuthorDetails = new Map();
+    if (!batch.size) {
+        return;
+    }
+
+    fetch("/fetch-author-details", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ author_ids: Array.from(batch.keys()) }),
+    })
+        .then((response) => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! Status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(({authors}) => {
+            batch.forEach(({resolve}, key) => resolve(authors[key] || null));
+        })
+        .catch((error) => {
+            // Failed requests are not cached, the next popup asks again
+            batch.forEach(({reject}, key) => {
+                authorDetailsCache.delete(key);
+                reject(error);
+            });
+        });
+}
+
+// ======================================================
+// Show Node Popup on right-click
+// ======================================================
+function showNodePopup(nodeData, x, y) {
+    const popup = document.getElementById("node-popup");
+    const popupImage = document.getElementById("popup-image");
+
+    popupImage.src = nodeData.image.toString().startsWith("http") ? nodeData.image : "/static/resource/avatar.png";
+
+    const tableBody = document.getElementById('popup-table-body');
+    tableBody.innerHTML = '';
+
+    const loadingPopup = document.getElementById("loading-popup");
+
+    loadingPopup.style.display = "block";
+
+    requestAuthorDetail(nodeData.id)
+        .then((author_data) => {
+            if (author_data === null) {
+                throw new Error(`Author ${nodeData.id} not found`);
+            }
             addPopupRow(tableBody, "Author ID", nodeData.id)
             addPopupRow(tableBody, "Name", nodeData.label)
             addPopupRow(tableBody, "Organization", author_data["Organization"])
@@ -614,11 +827,15 @@ function showNodePopup(nodeData, x, y) {
             addPopupRow(tableBody, "Publications Found", author_data["pubTotal"])
             addPopupRow(tableBody, "Freq. Conference Rank", author_data["avg_conference_rank"])
             addPopupRow(tableBody, "Freq. Journal Rank", author_data["avg_journal_rank"])
+            if (nodeData.pagerank !== undefined) {
+                addPopupRow(tableBody, "Co-authors", nodeData.degree)
+                addPopupRow(tableBody, "PageRank", nodeData.pagerank.toFixed(3))
+            }
 
             popup.style.display = "block";
             resizePopup(popup, true);
         })
-        .catch((error) => console.error("Error during graph generation:", error))
+        .catch((error) => console.error("Error fetching author details:", error))
         .finally(() => {
             if (loadingPopup != null){
                 loadingPopup.style.display = "none";
@@ -681,6 +898,92 @@ document.getElementById("zoom-out-btn").addEventListener("click", () => {
     svg.transition().duration(300).call(zoomBehavior.scaleTo, newScale);
 });
 
+// ======================================================
+// Decodes the columnar graph payload back into node/link objects
+// ======================================================
+const COLUMNAR_FORMAT = "columnar";
+const NODE_DICT_FIELDS = ["freq_conf_rank", "freq_journal_rank"];
+const LINK_DICT_FIELDS = ["avg_conf_rank", "avg_journal_rank"];
+
+function decodeColumnarGraph(payload) {
+    const dict = payload.dict;
+    const nodeColumns = payload.nodes;
+    const nodeFields = Object.keys(nodeColumns);
+    const nodeCount = nodeColumns.id ? nodeColumns.id.length : 0;
+
+    const nodes = new Array(nodeCount);
+    for (let i = 0; i < nodeCount; i++) {
+        const node = {};
+        nodeFields.forEach((field) => {
+            const value = nodeColumns[field][i];
+            if (value === null || value === undefined) return;
+            node[field] = NODE_DICT_FIELDS.includes(field) ? dict[value] : value;
+        });
+        nodes[i] = node;
+    }
+
+    function decodeLinks(columns) {
+        const linkCount = columns.source.length;
+        const links = new Array(linkCount);
+        for (let i = 0; i < linkCount; i++) {
+            const link = {
+                source: nodes[columns.source[i]].id,
+                target: nodes[columns.target[i]].id
+            };
+            LINK_DICT_FIELDS.forEach((field) => {
+                const value = columns[field][i];
+                if (value !== null && value !== undefined) link[field] = dict[value];
+            });
+            if (columns.root_counts[i] !== null && columns.root_counts[i] !== undefined) {
+                link.root_counts = columns.root_counts[i];
+            }
+            for (let c = columns.count_offsets[i]; c < columns.count_offsets[i + 1]; c++) {
+                link[dict[columns.count_keys[c]]] = columns.count_values[c];
+            }
+            links[i] = link;
+        }
+        return links;
+    }
+
+    return {
+        nodes: nodes,
+        links: decodeLinks(payload.links),
+        semi_weak_links: decodeLinks(payload.semi_weak_links),
+        weak_links: decodeLinks(payload.weak_links),
+        truncation: payload.truncation,
+        reach: payload.reach,
+        cluster_token: payload.cluster_token
+    };
+}
+
+// ======================================================
+// Tells the user when the server pruned the network to stay within budget
+// ======================================================
+function showTruncationNotice(truncation, reach) {
+    const notice = document.getElementById("graph-truncation");
+    if (!notice) return;
+
+    const messages = [];
+    if (reach && reach.action === "reduce") {
+        messages.push(`The network was estimated at about ${reach.estimate} authors, depth reduced to ${reach.depth}.`);
+    } else if (reach && reach.action === "cluster") {
+        messages.push(`The network was estimated at about ${reach.estimate} authors, showing communities.`);
+    }
+    if (truncation && truncation.truncated) {
+        messages.push(`Network reduced to the strongest collaborations: up to ${truncation.top_k} co-authors per author, `
+            + `${truncation.node_budget} authors and ${truncation.edge_budget} links `
+            + `(${truncation.neighbors_pruned} weaker co-authors pruned, ${truncation.nodes_dropped} authors `
+            + `and ${truncation.edges_dropped} links over budget).`);
+    }
+
+    if (messages.length === 0) {
+        notice.style.display = "none";
+        return;
+    }
+    notice.textContent = messages.join(" ");
+    notice.style.display = "block";
+}
+
 // ======================================================
 // Handles Graph API call
 // ======================================================
@@ -697,13 +1000,25 @@ function fetchGraphData(selectedNodeId, depth, conferenceRank, journalRank, from
             conference_rank: conferenceRank,
             journal_rank: journalRank,
             from_year: fromYear,
-            to_year: toYear
+            to_year: toYear,
+            format: COLUMNAR_FORMAT,
+            layout: true,
+            cluster: typeof clusterNetwork !== "undefined" && clusterNetwork
         }),
     })
         .then((response) => response.json())
-        .then(({ nodes, links, semi_weak_links, weak_links }) => {
-            console.log("API response received:", { nodes, links, semi_weak_links, weak_links });
+        .then((payload) => {
+            if (payload.error) {
+                alert(payload.error);
+                throw new Error(payload.error);
+            }
+            return payload.format === COLUMNAR_FORMAT ? decodeColumnarGraph(payload) : payload;
+        })
+        .then(({ nodes, links, semi_weak_links, weak_links, truncation, reach, cluster_token }) => {
+            console.log("API response received:", { nodes, links, semi_weak_links, weak_links, truncation });
+            clusterToken = cluster_token || null;
             mergeGraphData(nodes, links, semi_weak_links, weak_links);
+            showTruncationNotice(truncation, reach);
             updatePubCount(conferenceRank, journalRank, fromYear, toYear);
             updateNodeDropdown()
             if (render === true) {
@@ -714,6 +1029,8 @@ function fetchGraphData(selectedNodeId, depth, conferenceRank, journalRank, from
 
             prev_id = selectedNodeId;
             prev_depth = depth;
+            // The server traverses only links within the filters, so a filter change needs a new network
+            prev_filters = [conferenceRank, journalRank, fromYear, toYear].join("|");
         })
         .catch((error) => console.error("Error during graph generation:", error))
         .finally(() => {
@@ -727,6 +1044,68 @@ function fetchGraphData(selectedNodeId, depth, conferenceRank, journalRank, from
         });
 }
 
+// ======================================================
+// Shortest collaboration paths between two authors
+// ======================================================
+function fetchAuthorPath(sourceId, targetId, conferenceRank, journalRank, fromYear, toYear, loadingPopup) {
+    prevConfRank = conferenceRank;
+    prevJournalRank = journalRank;
+    fetch("/author_path", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+            source_author_id: sourceId,
+            target_author_id: targetId
+        }),
+    })
+        .then((response) => response.json())
+        .then(({ nodes, links, semi_weak_links, weak_links, paths, max_path_length }) => {
+            console.log("Path response received:", { nodes, links, paths });
+            const notice = document.getElementById("graph-truncation");
+            if (!paths || paths.length === 0) {
+                alert(`No collaboration path of at most ${max_path_length} links between the selected authors.`);
+                return;
+            }
+            mergeGraphData(nodes, links, semi_weak_links, weak_links);
+            if (notice) {
+                notice.textContent = `${paths.length} shortest collaboration path(s) of ${paths[0].length - 1} link(s).`;
+                notice.style.display = "block";
+            }
+            updatePubCount(conferenceRank, journalRank, fromYear, toYear);
+            updateNodeDropdown();
+            setTimeout(async () => {
+                renderGraph(conferenceRank, journalRank);
+            }, 1000);
+
+            // The next "Show" must regenerate the network
+            prev_id = null;
+            prev_depth = null;
+        })
+        .catch((error) => console.error("Error during path search:", error))
+        .finally(() => {
+            if (loadingPopup != null) {
+                loadingPopup.style.display = "none";
+            }
+        });
+}
+
+document.getElementById("path-button").addEventListener("click", function () {
+    const selectedNodeId = $('#node-label').val();
+    if (!selectedNodeId || selectedNodeId.length < 2) {
+        alert("Select two root authors to find the collaboration path between them.");
+        return;
+    }
+
+    const form = document.getElementById("graph-form");
+    const formData = new FormData(form);
+    const loadingPopup = document.getElementById("loading-popup");
+
+    clearGraph();
+    loadingPopup.style.display = "block";
+    fetchAuthorPath(selectedNodeId[0], selectedNodeId[1], formData.get("conference_rank"), formData.get("journal_rank"),
+        formData.get("from_year"), formData.get("to_year"), loadingPopup);
+});
+
 // ======================================================
 // Handles form submission for graph generation
 // ======================================================
@@ -764,8 +1143,10 @@ document.getElementById("graph-form").addEventListener("submit", function (event
 
     let selected = selectedNodeId.join(",");
 
-    if (prev_id === selected && prev_depth === depth) {
-        console.log("Skipping API call as prev_id and prev_depth match selectedNodeId and depth.");
+    const filters = [conferenceRank, journalRank, fromYear, toYear].join("|");
+
+    if (prev_id === selected && prev_depth === depth && prev_filters === filters) {
+        console.log("Skipping API call as prev_id, prev_depth and filters match the request.");
         updatePubCount(conferenceRank, journalRank, fromYear, toYear);
         setTimeout(async () => {
             renderGraph(conferenceRank, journalRank);
@@ -773,7 +1154,7 @@ document.getElementById("graph-form").addEventListener("submit", function (event
     } else {
         // clear the graph
         clearGraph();
-        console.log("Making API call as prev_id and prev_depth are different.");
+        console.log("Making API call as prev_id, prev_depth or filters are different.");
 
         // Show the loading popup and start the timer
         loadingPopup.style.display = "block";
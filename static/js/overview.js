@@ -49,6 +49,15 @@ function applyFilters() {
     fetchData(prev_order_by_type, prev_order_by_column);
 }
 
+/**
+ * Download every row of the table, with its filters and current order, as CSV or JSON lines
+ */
+function exportTable(format) {
+    const tableId = document.getElementById('tableId').value;
+    window.location.href = `/export?table_id=${encodeURIComponent(tableId)}&format=${format}` +
+        `&order_type=${encodeURIComponent(prev_order_by_type)}&order_column=${encodeURIComponent(prev_order_by_column)}`;
+}
+
 /**
  * Update page counter
  */
@@ -176,4 +185,108 @@ function handleHeaderClick(header, column) {
 
     console.log(`Sorting by ${column} in ${newOrder} order.`);
     fetchData(newOrder, column);
-}
\ No newline at end of file
+}
+
+/**
+ * Load the row counts per facet value for the current filters and list them under each facet
+ */
+async function loadFacets() {
+    const panel = document.getElementById('facet-panel');
+    if (!panel) {
+        return;
+    }
+    const tableId = document.getElementById('tableId').value;
+
+    try {
+        const response = await fetch(`/facets?table_id=${encodeURIComponent(tableId)}`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! Status: ${response.status}`);
+        }
+        const data = await response.json();
+
+        panel.querySelectorAll('.facet').forEach(facetEl => {
+            const valuesEl = facetEl.querySelector('.facet-values');
+            const values = (data.facets[facetEl.dataset.column] || [])
+                .filter(entry => entry.value !== null && entry.value !== '')
+                .sort((a, b) => String(a.value).localeCompare(String(b.value)));
+            valuesEl.textContent = values.length ? '' : 'No values';
+
+            values.forEach(entry => {
+                const button = document.createElement('button');
+                button.type = 'button';
+                button.className = 'btn btn-sm btn-outline-secondary me-1 mb-1';
+                button.textContent = `${entry.value} (${entry.count})`;
+                button.onclick = () => applyFacet(facetEl.dataset.filter, String(entry.value));
+                valuesEl.appendChild(button);
+            });
+        });
+    } catch (error) {
+        console.error('Error fetching facets:', error);
+        panel.querySelectorAll('.facet-values').forEach(el => el.textContent = 'Unavailable');
+    }
+}
+
+/**
+ * Set a filter to a facet value and search again
+ */
+function applyFacet(filterField, value) {
+    const filterForm = document.getElementById('filter-form');
+    const textInput = document.getElementById(`filter-${filterField}`);
+    if (textInput) {
+        textInput.value = value;
+    } else {
+        // Integer filters are ranges
+        filterForm.querySelector(`[name="${filterField}_from"]`).value = value;
+        filterForm.querySelector(`[name="${filterField}_to"]`).value = value;
+    }
+    filterForm.requestSubmit();
+}
+
+document.addEventListener("DOMContentLoaded", loadFacets);
+
+/**
+ * Offer indexed values while typing in a filter: ids for id filters, names otherwise.
+ * Comma separated filters complete their last value only.
+ */
+function setupSuggestions() {
+    document.querySelectorAll('#filter-form input[data-suggest]').forEach(input => {
+        const datalist = document.getElementById(input.getAttribute('list'));
+        let timer = null;
+
+        input.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(async () => {
+                const parts = input.value.split(',');
+                const prefix = parts.pop().trim();
+                const head = parts.map(part => part.trim()).filter(part => part).join(', ');
+                if (prefix.length < 2) {
+                    datalist.innerHTML = '';
+                    return;
+                }
+
+                try {
+                    const response = await fetch(
+                        `/suggest?kind=${encodeURIComponent(input.dataset.suggest)}&q=${encodeURIComponent(prefix)}`
+                    );
+                    if (!response.ok) {
+                        throw new Error(`HTTP error! Status: ${response.status}`);
+                    }
+                    const data = await response.json();
+
+                    datalist.innerHTML = '';
+                    data.suggestions.forEach(suggestion => {
+                        const value = input.dataset.suggestValue === 'id' ? String(suggestion.id) : suggestion.name;
+                        const option = document.createElement('option');
+                        option.value = head ? `${head}, ${value}` : value;
+                        option.label = suggestion.label;
+                        datalist.appendChild(option);
+                    });
+                } catch (error) {
+                    console.error('Error fetching suggestions:', error);
+                }
+            }, 150);
+        });
+    });
+}
+
+document.addEventListener("DOMContentLoaded", setupSuggestions);